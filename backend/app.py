@@ -1,15 +1,35 @@
-from flask import Flask
+import io
+import time
+from flask import Flask, Request
 from flask_socketio import SocketIO
+from config import Config
+from model import inference_wrapper
+from routes.health import health_bp
 from routes.predict import predict_bp
 from routes.socket import socketio  # import the SocketIO instance from socket.py
 
+class InMemoryRequest(Request):
+    """
+    Keeps uploaded files in memory. Werkzeug spills uploads over 500KB to a temp
+    file by default; the video decoder reads them from memory instead.
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
 def create_app():
     app = Flask(__name__)
     app.debug = True
+    app.request_class = InMemoryRequest
+    app.config['MAX_CONTENT_LENGTH'] = Config.MAX_UPLOAD_MB * 1024 * 1024
+    # Load the model (or start the inference workers), by default in the background
+    inference_wrapper.init()
+    app.register_blueprint(health_bp)
     app.register_blueprint(predict_bp)
     socketio.init_app(app, cors_allowed_origins="*")
     return app
     
 if __name__ == '__main__':
+    start = time.perf_counter()
     app = create_app()
+    print(f"[startup] app created in {time.perf_counter() - start:.2f}s")
     socketio.run(app, host='0.0.0.0', port=5000)
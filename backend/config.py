@@ -15,6 +15,64 @@ class Config:
     LM_ALPHA = 0.0
     IMG_SIZE = 96
     FRAME_SIZE = 160
+    # "vtp" serves the vtp_lipreading model, "lipnet" the in-repo LipNet, "onnx" LipNet
+    # exported by convert_pth_to_onnx.py, run with ONNX Runtime on CPU, and "torchscript"
+    # the frozen artifact from export_torchscript.py
+    # (all but vtp need the lip-read package installed: pip install -e <repo root>)
+    MODEL_BACKEND = "vtp"
+    # fp32 checkpoint, or int8 from scripts/quantize_lipnet.py (runs on CPU)
+    LIPNET_CKPT_PATH = "checkpoints/lipnet.pth"
+    # Autocast precision of the lipnet backend with an fp32 checkpoint: "fp32", "bf16"
+    # (CPUs with AVX512-BF16/AMX) or "fp16" (CUDA only)
+    PRECISION = "fp32"
+    ONNX_MODEL_PATH = "checkpoints/lipnet.onnx"
+    TORCHSCRIPT_PATH = "checkpoints/lipnet_ts.pt"
+    # "disable", "basic", "extended" or "all"; the session's thread counts follow INTRA_OP_THREADS / INTER_OP_THREADS
+    ONNX_GRAPH_OPTIMIZATION_LEVEL = "all"
+    # Crop the mouth region before the 50x100 resize (lipnet, onnx and torchscript backends), the same
+    # MouthCropper as scripts/preprocess_clips.py --crop_mouth; enable it for models trained on mouth crops.
+    # MOUTH_DETECTOR_PATH: local YuNet .onnx or Haar cascade .xml (None = OpenCV's bundled face cascade)
+    MOUTH_CROP = False
+    MOUTH_DETECTOR_PATH = None
+    MOUTH_DETECT_EVERY = 1
+    MOUTH_SMOOTHING_WINDOW = 5
+    # Streaming (lipnet backend only): decode the last STREAM_WINDOW frames every STREAM_HOP frames.
+    # With STREAMING off, socket clients get a transcript per 30-frame clip instead.
+    STREAMING = True
+    STREAM_WINDOW = 75
+    STREAM_HOP = 10
+    # Per-connection frame buffer: fixed capacity, frames stored at this size
+    SESSION_BUFFER_FRAMES = 75
+    SESSION_FRAME_HEIGHT = 240
+    SESSION_FRAME_WIDTH = 320
+    # What to do when a client sends frames faster than inference consumes them:
+    # "drop_oldest", "drop_nth" (drop one frame per overflow, every OVERFLOW_DROP_EVERY-th frame of the buffer)
+    # or "slow_down" (reject the frame and emit 'slow_down' to the client)
+    OVERFLOW_POLICY = "drop_oldest"
+    OVERFLOW_DROP_EVERY = 3
+    # Micro-batching of whole clips from /predict and the socket (all but the vtp backend):
+    # a batch runs once it has BATCH_MAX_SIZE clips or its oldest clip waited BATCH_MAX_WAIT_MS
+    BATCH_MAX_SIZE = 8
+    BATCH_MAX_WAIT_MS = 20
+    # /predict uploads are held and decoded in memory: reject bodies above MAX_UPLOAD_MB
+    # and stop decoding after MAX_UPLOAD_FRAMES frames
+    MAX_UPLOAD_MB = 64
+    MAX_UPLOAD_FRAMES = 75
+    # Inference worker processes, each loading its own copy of the model (0 = run the model
+    # in the server process). Streaming needs the model in the server process, so with
+    # workers socket clients get a transcript per 30-frame clip instead.
+    NUM_WORKERS = 0
+    # torch threads per worker, or for the server process without workers
+    # (0 = split the cores evenly between workers / torch's default without workers)
+    INTRA_OP_THREADS = 0
+    INTER_OP_THREADS = 1
+    # Pin each worker to its own disjoint set of cores
+    PIN_WORKER_CORES = False
+    # Load the model in the background so the server answers /healthz (and /ready with 503)
+    # while loading, and run one warm-up forward pass over WARMUP_FRAMES blank frames
+    BACKGROUND_LOAD = True
+    WARMUP = True
+    WARMUP_FRAMES = 75
 
 def create_args():
     parser = argparse.ArgumentParser()
@@ -32,4 +90,30 @@ def create_args():
     parser.add_argument("--lm_alpha", default=Config.LM_ALPHA, type=float)
     parser.add_argument("--img_size", default=Config.IMG_SIZE, type=int)
     parser.add_argument("--frame_size", default=Config.FRAME_SIZE, type=int)
+    parser.add_argument("--model_backend", default=Config.MODEL_BACKEND, choices=["vtp", "lipnet", "onnx", "torchscript"])
+    parser.add_argument("--lipnet_ckpt_path", default=Config.LIPNET_CKPT_PATH)
+    parser.add_argument("--precision", default=Config.PRECISION, choices=["fp32", "bf16", "fp16"])
+    parser.add_argument("--onnx_model_path", default=Config.ONNX_MODEL_PATH)
+    parser.add_argument("--torchscript_path", default=Config.TORCHSCRIPT_PATH)
+    parser.add_argument("--onnx_graph_optimization_level", default=Config.ONNX_GRAPH_OPTIMIZATION_LEVEL,
+                        choices=["disable", "basic", "extended", "all"])
+    parser.add_argument("--mouth_detector_path", default=Config.MOUTH_DETECTOR_PATH)
+    parser.add_argument("--mouth_detect_every", default=Config.MOUTH_DETECT_EVERY, type=int)
+    parser.add_argument("--mouth_smoothing_window", default=Config.MOUTH_SMOOTHING_WINDOW, type=int)
+    parser.add_argument("--stream_window", default=Config.STREAM_WINDOW, type=int)
+    parser.add_argument("--stream_hop", default=Config.STREAM_HOP, type=int)
+    parser.add_argument("--session_buffer_frames", default=Config.SESSION_BUFFER_FRAMES, type=int)
+    parser.add_argument("--session_frame_height", default=Config.SESSION_FRAME_HEIGHT, type=int)
+    parser.add_argument("--session_frame_width", default=Config.SESSION_FRAME_WIDTH, type=int)
+    parser.add_argument("--overflow_policy", default=Config.OVERFLOW_POLICY, choices=["drop_oldest", "drop_nth", "slow_down"])
+    parser.add_argument("--overflow_drop_every", default=Config.OVERFLOW_DROP_EVERY, type=int)
+    parser.add_argument("--batch_max_size", default=Config.BATCH_MAX_SIZE, type=int)
+    parser.add_argument("--batch_max_wait_ms", default=Config.BATCH_MAX_WAIT_MS, type=float)
+    parser.add_argument("--max_upload_mb", default=Config.MAX_UPLOAD_MB, type=int)
+    parser.add_argument("--max_upload_frames", default=Config.MAX_UPLOAD_FRAMES, type=int)
+    parser.add_argument("--num_workers", default=Config.NUM_WORKERS, type=int)
+    parser.add_argument("--intra_op_threads", default=Config.INTRA_OP_THREADS, type=int)
+    parser.add_argument("--inter_op_threads", default=Config.INTER_OP_THREADS, type=int)
+    parser.add_argument("--pin_worker_cores", default=Config.PIN_WORKER_CORES, action="store_true")
+    parser.add_argument("--warmup_frames", default=Config.WARMUP_FRAMES, type=int)
     return parser.parse_args([])
@@ -1,9 +1,25 @@
-from vtp_lipreading import inference  
-from vtp_lipreading.config import load_args 
-from importlib_resources import files
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+import numpy as np
+from config import Config
+from model.scheduler import MicroBatchScheduler
+from model.worker_pool import InferenceWorkerPool, set_thread_budget
+from model.video_io import read_video, write_video
+
+# Backends that run on decoded frame arrays; vtp only reads video files
+FRAME_BACKENDS = ("lipnet", "onnx", "torchscript")
 
 # Initialize your model and related components only once.
 def init_model():
+    from vtp_lipreading import inference
+    from vtp_lipreading.config import load_args
+    from importlib_resources import files
+
     # Create args from your package's config.
     args = load_args()
     # You can set default checkpoint paths if needed.
@@ -16,15 +32,234 @@ def init_model():
     model, video_loader, lm, lm_tokenizer = inference.main(args)
     return model, video_loader, lm, lm_tokenizer
 
-# Initialize the model at module level.
-_model, _video_loader, _lm, _lm_tokenizer = init_model()
+def init_lipnet(ckpt_path=None):
+    import torch
+    from model.lipnet_engine import load_lipnet
+
+    device = Config.DEVICE if torch.cuda.is_available() else "cpu"
+    return load_lipnet(ckpt_path or Config.LIPNET_CKPT_PATH, device)
+
+class ModelNotReady(RuntimeError):
+    """
+    Raised for requests that arrive while the model is still loading (or failed to load).
+    """
+
+def init_onnx(model_path=None):
+    import torch
+    from model.lipnet_engine import load_onnx
+
+    # Same thread budget torch got in this process (set_thread_budget / the worker's share of the cores)
+    return load_onnx(model_path or Config.ONNX_MODEL_PATH, intra_op_threads=torch.get_num_threads(),
+                     inter_op_threads=Config.INTER_OP_THREADS,
+                     graph_optimization_level=Config.ONNX_GRAPH_OPTIMIZATION_LEVEL), "cpu"
+
+def init_torchscript(model_path=None):
+    import torch
+    from model.lipnet_engine import load_torchscript
 
-def get_prediction(video_path):
+    device = Config.DEVICE if torch.cuda.is_available() else "cpu"
+    return load_torchscript(model_path or Config.TORCHSCRIPT_PATH, device), device
+
+def load_backend(backend, model_path=None, warmup_frames=0):
     """
-    Given a path to a video file, run inference using the lipreading model and return the predicted text.
+    Loads the given backend's model and optionally runs one warm-up forward pass over
+    warmup_frames blank frames, printing how long each phase took.
+    Returns the state _predict_batch runs on.
+    Runs in the server process, or once in every inference worker process.
     """
+    timings = {}
+    start = time.perf_counter()
+    if backend == "lipnet":
+        loaded = init_lipnet(model_path)
+    elif backend == "onnx":
+        loaded = init_onnx(model_path)
+    elif backend == "torchscript":
+        loaded = init_torchscript(model_path)
+    else:
+        loaded = init_model()
+    if backend in FRAME_BACKENDS and Config.MOUTH_CROP:
+        from model.lipnet_engine import enable_mouth_crop
+        enable_mouth_crop(Config.MOUTH_DETECTOR_PATH, Config.MOUTH_DETECT_EVERY, Config.MOUTH_SMOOTHING_WINDOW)
+    state = backend, loaded
+    timings["load"] = time.perf_counter() - start
+
+    if warmup_frames > 0:
+        start = time.perf_counter()
+        frames = np.zeros((warmup_frames, Config.FRAME_SIZE, Config.FRAME_SIZE, 3), dtype=np.uint8)
+        if backend in FRAME_BACKENDS:
+            _predict_batch(state, [frames])
+        else:
+            with _temp_video(frames) as video_path:
+                _predict_batch(state, [video_path])
+        timings["warmup"] = time.perf_counter() - start
+
+    startup_timings.update(timings)
+    print(f"[startup] {backend} model (pid {os.getpid()}): "
+          + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items()))
+    return state
+
+def _predict_batch(state, items):
+    """
+    Batch function. Items are (T, H, W, 3) RGB clips for the lipnet, onnx and
+    torchscript backends, which run them in one padded forward pass, and video paths for vtp,
+    which can only run them one at a time.
+    """
+    backend, loaded = state
+    if backend in FRAME_BACKENDS:
+        from model.lipnet_engine import predict_clips
+        lipnet, device = loaded
+        return predict_clips(lipnet, items, device, Config.PRECISION if backend == "lipnet" else "fp32")
+
+    from vtp_lipreading import inference
+    model, video_loader, lm, lm_tokenizer = loaded
     # 'run' is imported from vtp_lipreading.inference module
-    prediction = inference.run(
-        video_path, _video_loader, _model, _lm, _lm_tokenizer, display=False
-    )
-    return prediction
+    return [
+        inference.run(video_path, video_loader, model, lm, lm_tokenizer, display=False)
+        for video_path in items
+    ]
+
+_state = None
+_pool = None
+scheduler = None
+_ready = threading.Event()
+_load_error = None
+startup_timings = {}
+
+def _load():
+    global _state, _pool, scheduler, _load_error
+    try:
+        start = time.perf_counter()
+        model_path = {
+            "lipnet": Config.LIPNET_CKPT_PATH,
+            "onnx": Config.ONNX_MODEL_PATH,
+            "torchscript": Config.TORCHSCRIPT_PATH,
+        }.get(Config.MODEL_BACKEND)
+        load_fn = partial(load_backend, Config.MODEL_BACKEND, model_path,
+                          Config.WARMUP_FRAMES if Config.WARMUP else 0)
+        if Config.NUM_WORKERS > 0:
+            _pool = InferenceWorkerPool(
+                Config.NUM_WORKERS, load_fn, _predict_batch,
+                intra_op_threads=Config.INTRA_OP_THREADS,
+                inter_op_threads=Config.INTER_OP_THREADS,
+                pin_cores=Config.PIN_WORKER_CORES
+            )
+            # One dispatcher per worker, so every idle worker can take the next batch
+            batch_fn, num_threads = _pool.run, Config.NUM_WORKERS
+        else:
+            set_thread_budget(Config.INTRA_OP_THREADS, Config.INTER_OP_THREADS)
+            _state = load_fn()
+            batch_fn, num_threads = partial(_predict_batch, _state), 1
+        startup_timings["model"] = time.perf_counter() - start
+
+        scheduler = MicroBatchScheduler(
+            batch_fn,
+            max_batch_size=Config.BATCH_MAX_SIZE if Config.MODEL_BACKEND in FRAME_BACKENDS else 1,
+            max_wait_ms=Config.BATCH_MAX_WAIT_MS,
+            num_threads=num_threads
+        )
+        print(f"[startup] ready: {Config.MODEL_BACKEND} backend, {max(Config.NUM_WORKERS, 1)} model "
+              f"instance(s) loaded in {startup_timings['model']:.2f}s")
+        _ready.set()
+    except Exception as e:
+        _load_error = f"{type(e).__name__}: {e}"
+        print(f"[startup] model loading failed: {_load_error}")
+
+def init(background=None):
+    """
+    Loads the model, in this process or in Config.NUM_WORKERS worker processes, and
+    starts the batching queue every clip from /predict and the socket goes through.
+    In the background (Config.BACKGROUND_LOAD) the server comes up right away and
+    serves /healthz while loading; requests are refused until status() is "ready".
+    """
+    if background is None:
+        background = Config.BACKGROUND_LOAD
+    if background:
+        threading.Thread(target=_load, name="model-loader", daemon=True).start()
+    else:
+        _load()
+
+def status():
+    """
+    "loading", "ready" or "failed" (see load_error()).
+    """
+    if _ready.is_set():
+        return "ready"
+    return "failed" if _load_error is not None else "loading"
+
+def load_error():
+    return _load_error
+
+def is_ready():
+    return _ready.is_set()
+
+def _require_ready():
+    if not _ready.is_set():
+        raise ModelNotReady(f"Model failed to load: {_load_error}" if _load_error else "Model is still loading")
+
+def get_scheduler_stats(reset=False):
+    _require_ready()
+    return scheduler.stats(reset=reset)
+
+def supports_streaming():
+    # Streaming state lives next to the model, so it needs the model in the server process
+    return Config.MODEL_BACKEND == "lipnet" and Config.STREAMING and Config.NUM_WORKERS == 0
+
+def create_stream():
+    """
+    New per-client incremental inference state (lipnet backend only).
+    """
+    _require_ready()
+    from model.lipnet_engine import create_stream as _create_stream
+    lipnet, device = _state[1]
+    return _create_stream(lipnet, Config.STREAM_WINDOW, Config.STREAM_HOP, device, Config.PRECISION)
+
+def predict_frames(frames):
+    """
+    Predicted text for a (T, H, W, 3) array of BGR frames, e.g. from cv2.imdecode.
+    """
+    return get_prediction(frames[..., ::-1])
+
+def get_prediction(frames):
+    """
+    Predicted text for a (T, H, W, 3) uint8 array of RGB frames, e.g. from video_io.read_video.
+    """
+    _require_ready()
+    if Config.MODEL_BACKEND in FRAME_BACKENDS:
+        return scheduler.predict(np.ascontiguousarray(frames))
+
+    # vtp only reads from files
+    with _temp_video(frames) as video_path:
+        return scheduler.predict(video_path)
+
+def predict_upload(stream):
+    """
+    Predicted text for an uploaded video file, given as a seekable binary stream.
+    The frame backends decode it in memory (up to Config.MAX_UPLOAD_FRAMES frames); vtp
+    gets the upload's bytes written unchanged to a temp file, so it decodes the exact
+    video the client sent instead of a re-encoded copy.
+    Raises ValueError if the frame backends can't decode the video.
+    """
+    _require_ready()
+    if Config.MODEL_BACKEND in FRAME_BACKENDS:
+        return get_prediction(read_video(stream, Config.MAX_UPLOAD_FRAMES))
+
+    stream.seek(0)
+    with _temp_path() as video_path:
+        with open(video_path, "wb") as f:
+            shutil.copyfileobj(stream, f)
+        return scheduler.predict(video_path)
+
+@contextmanager
+def _temp_path(suffix='.mp4'):
+    fd, temp_path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        yield temp_path
+    finally:
+        os.remove(temp_path)
+
+@contextmanager
+def _temp_video(frames):
+    with _temp_path() as temp_video_path:
+        write_video(temp_video_path, frames)
+        yield temp_video_path
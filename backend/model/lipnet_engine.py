@@ -0,0 +1,90 @@
+import torch
+from src.dataset.mouth_crop import MouthCropper
+from src.dataset.transforms import ClipTransform
+from src.models.lipnet import LipNet
+from src.models.quantization import is_quantized_checkpoint, load_checkpoint, load_quantized_lipnet
+from src.training.precision import autocast
+from src.training.streaming import StreamingLipNet
+from src.utils.ctc_decode import greedy_decode_ctc
+from src.utils.tokenizer import int_to_text_sequence
+
+# LipNet expects 50x100 (H, W) RGB frames
+transform = ClipTransform((50, 100))
+
+def enable_mouth_crop(detector_path=None, detect_every=1, smoothing_window=5):
+    """
+    Crops every clip (and streamed chunk) to the mouth region before the resize, with the
+    same MouthCropper used to preprocess the training clips. Every stream from create_stream
+    keeps its own box, smoothed over the recent frames across chunks.
+    """
+    global transform
+    cropper = MouthCropper(detector_path, size=(50, 100), detect_every=detect_every,
+                           smoothing_window=smoothing_window)
+    cropper.detector  # fail at load time if the detector model isn't available
+    transform = ClipTransform((50, 100), crop=cropper)
+
+def load_lipnet(ckpt_path, device="cpu"):
+    """
+    Loads an in-repo LipNet checkpoint (as saved by train() or a bare state dict, or an
+    int8 checkpoint from scripts/quantize_lipnet.py) in eval mode.
+    Weights are memory-mapped from the checkpoint file and used in place on CPU
+    instead of being read into memory and copied into a freshly initialized model.
+    Returns (model, device); quantized models always run on CPU.
+    """
+    try:
+        checkpoint = load_checkpoint(ckpt_path, mmap=True)
+    except RuntimeError:
+        # Legacy (pre zipfile) checkpoints can't be memory-mapped
+        checkpoint = load_checkpoint(ckpt_path)
+    if is_quantized_checkpoint(checkpoint):
+        return load_quantized_lipnet(checkpoint), "cpu"
+
+    if isinstance(checkpoint, dict) and "model_state_dict" in checkpoint:
+        checkpoint = checkpoint["model_state_dict"]
+    with torch.device("meta"):
+        model = LipNet()
+    model.load_state_dict(checkpoint, assign=True)
+    return model.to(device).eval(), device
+
+def load_onnx(model_path, intra_op_threads=0, inter_op_threads=0, graph_optimization_level="all"):
+    """
+    LipNet exported by scripts/convert_pth_to_onnx.py, run with ONNX Runtime on CPU.
+    Callable like the PyTorch model, so predict_clips works with either.
+    """
+    from src.training.onnx_runtime import OnnxLipNet
+    return OnnxLipNet(model_path, intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads,
+                      graph_optimization_level=graph_optimization_level)
+
+def load_torchscript(model_path, device="cpu"):
+    """
+    Frozen LipNet artifact from scripts/export_torchscript.py; loads without the model classes.
+    """
+    from src.models.torchscript import TorchScriptLipNet
+    return TorchScriptLipNet.load(model_path, device)
+
+@torch.no_grad()
+def predict_clips(model, clips, device="cpu", precision="fp32"):
+    """
+    Greedy transcripts for a list of (T, H, W, 3) uint8 RGB clips of any lengths,
+    in one padded forward pass. Padding is excluded from the BiGRU and the decoding.
+    precision: "fp32", "bf16" or "fp16" autocast (eager LipNet only)
+    """
+    tensors = [transform(clip) for clip in clips]  # (T, 3, 50, 100) each
+    lengths = torch.tensor([t.shape[0] for t in tensors], dtype=torch.long)
+
+    batch = torch.zeros((len(tensors), int(lengths.max())) + tuple(tensors[0].shape[1:]))
+    for i, t in enumerate(tensors):
+        batch[i, :t.shape[0]] = t
+
+    # (B, T, C, H, W) => (B, C, T, H, W)
+    with autocast(device, precision):
+        logits = model(batch.permute(0, 2, 1, 3, 4).to(device), lengths)
+    logits = logits.float()
+    decoded = greedy_decode_ctc(logits, blank=0, input_lengths=lengths)
+    return [int_to_text_sequence(ids) for ids in decoded]
+
+def create_stream(model, window, hop, device="cpu", precision="fp32"):
+    """
+    New per-client streaming state sharing the loaded model.
+    """
+    return StreamingLipNet(model, window=window, hop=hop, device=device, transform=transform, precision=precision)
@@ -0,0 +1,124 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class MicroBatchScheduler:
+    """
+    Collects inference requests from every caller into one queue and runs them in
+    batches: a batch is dispatched once it holds max_batch_size items, or once its
+    oldest item has waited max_wait_ms, whichever comes first.
+
+    batch_fn(items) -> results is called with a list of items and must return one result
+    per item, in order. It runs on num_threads dispatcher threads, so up to num_threads
+    batches are in flight at once (e.g. one per inference worker process); batches are
+    still formed one at a time.
+    """
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=20, num_threads=1):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._collect_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"micro-batch-scheduler-{i}", daemon=True)
+            for i in range(num_threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _reset_stats(self):
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._compute_total = 0.0
+        self._depth_max = 0
+
+    def submit(self, item):
+        """
+        Queues an item and returns a Future resolving to its result.
+        """
+        future = Future()
+        self._queue.put((item, future, time.monotonic()))
+        return future
+
+    def predict(self, item, timeout=None):
+        """
+        Queues an item and blocks until its result is ready.
+        """
+        return self.submit(item).result(timeout)
+
+    def _collect(self):
+        # Block for the first item, then fill the batch until it is full or the
+        # first item's deadline passes. Items that queued up while the previous
+        # batch was running are always taken, even past the deadline.
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Only an idle dispatcher forms the next batch
+            with self._collect_lock:
+                batch = self._collect()
+                depth = self._queue.qsize()
+            start = time.monotonic()
+            items = [item for item, _, _ in batch]
+            try:
+                results = list(self.batch_fn(items))
+                if len(results) != len(items):
+                    raise RuntimeError(f"batch_fn returned {len(results)} results for {len(items)} items")
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                # Never leave a caller waiting, and don't touch futures that already resolved
+                # (set_exception on those would raise and kill this dispatcher thread)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            compute = time.monotonic() - start
+
+            with self._stats_lock:
+                waits = [start - enqueued for _, _, enqueued in batch]
+                self._batches += 1
+                self._items += len(batch)
+                self._max_batch = max(self._max_batch, len(batch))
+                self._wait_total += sum(waits)
+                self._wait_max = max(self._wait_max, max(waits))
+                self._compute_total += compute
+                self._depth_max = max(self._depth_max, depth)
+
+    def stats(self, reset=False):
+        """
+        Queue depth, batch sizes, queue wait and compute times since start (or the last reset).
+        """
+        with self._stats_lock:
+            batches = max(self._batches, 1)
+            items = max(self._items, 1)
+            stats = {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._depth_max,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": self._items / batches,
+                "max_batch_size": self._max_batch,
+                "avg_wait_ms": self._wait_total / items * 1000.0,
+                "max_wait_ms": self._wait_max * 1000.0,
+                "avg_batch_compute_ms": self._compute_total / batches * 1000.0,
+            }
+            if reset:
+                self._reset_stats()
+        return stats
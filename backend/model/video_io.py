@@ -0,0 +1,58 @@
+import os
+import cv2
+import numpy as np
+
+def open_capture(source):
+    """
+    cv2.VideoCapture over a file path, or over a seekable binary stream (e.g. an
+    upload held in memory), which is demuxed and decoded without touching disk.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return cv2.VideoCapture(os.fspath(source))
+    source.seek(0)
+    return cv2.VideoCapture(source, cv2.CAP_FFMPEG, [])
+
+def read_video(source, max_frames=75):
+    """
+    Decodes up to max_frames frames from a path or binary stream into a (T, H, W, 3)
+    uint8 RGB array. Decoding stops as soon as max_frames frames have been read.
+    """
+    cap = open_capture(source)
+    try:
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        if not cap.isOpened() or height <= 0 or width <= 0:
+            raise ValueError("Could not open video")
+        num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if num_frames <= 0:
+            num_frames = max_frames
+        frames = np.empty((min(num_frames, max_frames), height, width, 3), dtype=np.uint8)
+
+        count = 0
+        while count < max_frames:
+            if count == frames.shape[0]:
+                # Container under-reported its frame count
+                frames = np.concatenate([frames, np.empty_like(frames)], axis=0)[:max_frames]
+            ret, _ = cap.read(frames[count])
+            if not ret:
+                break
+            cv2.cvtColor(frames[count], cv2.COLOR_BGR2RGB, dst=frames[count])
+            count += 1
+    finally:
+        cap.release()
+
+    if count == 0:
+        raise ValueError("Could not decode any frames from the video")
+    return frames[:count]
+
+def write_video(path, frames, fps=25):
+    """
+    Writes a (T, H, W, 3) uint8 RGB array to an mp4 file.
+    """
+    height, width, _ = frames[0].shape
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    try:
+        for frame in frames:
+            out.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+    finally:
+        out.release()
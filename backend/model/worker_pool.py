@@ -0,0 +1,278 @@
+import collections
+import itertools
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+
+def set_thread_budget(intra_op_threads=0, inter_op_threads=0):
+    """
+    Caps torch's intra-op / inter-op thread pools for this process (0 keeps torch's default).
+    Must run before the process does any parallel torch work.
+    """
+    import torch
+    if intra_op_threads > 0:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads > 0 and inter_op_threads != torch.get_num_interop_threads():
+        torch.set_num_interop_threads(inter_op_threads)
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def split_cores(num_workers, cores=None):
+    """
+    Disjoint, equally sized core sets, one per worker (shared round-robin if there are more workers than cores).
+    """
+    cores = available_cores() if cores is None else list(cores)
+    if num_workers > len(cores):
+        return [[cores[i % len(cores)]] for i in range(num_workers)]
+    per_worker = len(cores) // num_workers
+    return [cores[i * per_worker:(i + 1) * per_worker] for i in range(num_workers)]
+
+def _worker_main(index, load_fn, run_fn, conn, intra_op_threads, inter_op_threads, cores):
+    # Tasks arrive on this worker's own pipe, addressed to it by the pool; replies are
+    # (task id, status, payload). Nothing is shared with the other workers, so a worker
+    # killed at any point can't leave a lock held that they would wait on
+    if cores is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    try:
+        set_thread_budget(intra_op_threads, inter_op_threads)
+        state = load_fn()
+    except Exception as e:
+        conn.send((None, "failed", f"{type(e).__name__}: {e}"))
+        return
+    conn.send((None, "ready", None))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        task_id, items = task
+        try:
+            conn.send((task_id, "ok", run_fn(state, items)))
+        except Exception as e:
+            conn.send((task_id, "error", f"{type(e).__name__}: {e}"))
+
+class InferenceWorkerPool:
+    """
+    N worker processes, each loading the model once at startup (load_fn() -> state) and
+    then running run_fn(state, items) -> results for every task it is given. The pool
+    hands each task to an idle worker over that worker's own pipe; tasks wait in the
+    pool while every worker is busy.
+
+    Each worker gets its own torch thread budget and, with pin_cores, its own set of
+    cores, so workers don't oversubscribe the CPU or fight the web server for it.
+    A worker that dies is respawned with the same settings; only the task assigned to
+    it fails. The pool is broken only once no worker can be brought back.
+    load_fn and run_fn must be picklable (module-level functions or partials of them).
+    """
+    def __init__(self, num_workers, load_fn, run_fn, intra_op_threads=0, inter_op_threads=1,
+                 pin_cores=False, start_method="spawn"):
+        """
+        :param num_workers: number of worker processes
+        :param intra_op_threads: torch threads per worker (0 splits the available cores evenly between workers)
+        :param inter_op_threads: torch inter-op threads per worker (0 keeps torch's default)
+        :param pin_cores: pin each worker to its own disjoint set of cores
+        :param start_method: multiprocessing start method; "spawn" is safe with CUDA and threads
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        ctx = mp.get_context(start_method)
+        core_sets = split_cores(num_workers)
+        if intra_op_threads <= 0:
+            intra_op_threads = len(core_sets[0])
+
+        self.num_workers = num_workers
+        self.respawns = 0
+        self._ctx = ctx
+        self._load_fn = load_fn
+        self._run_fn = run_fn
+        self._intra_op_threads = intra_op_threads
+        self._inter_op_threads = inter_op_threads
+        self._core_sets = [core_sets[i] if pin_cores else None for i in range(num_workers)]
+        self._futures = {}
+        self._pending = collections.deque()  # (task id, items) waiting for an idle worker
+        self._idle = []  # workers with their model loaded and no task
+        self._running = {}  # worker index -> id of the task assigned to it
+        self._retired = set()  # workers that are shut down or whose replacement couldn't load the model
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._broken = None
+        self._closing = False
+        self._collector = None
+        # One duplex pipe per worker, for its tasks and its results
+        self._conns = [None] * num_workers
+        self._workers = [self._spawn(i) for i in range(num_workers)]
+
+        # Block until every worker has its model loaded
+        starting = set(range(num_workers))
+        while starting:
+            for conn in wait([self._conns[i] for i in starting]):
+                index = self._conns.index(conn)
+                try:
+                    _, status, error = conn.recv()
+                except EOFError:
+                    self.close()
+                    raise RuntimeError(f"Inference worker {index} exited during startup "
+                                       f"(exit code {self._workers[index].exitcode})")
+                if status == "failed":
+                    self.close()
+                    raise RuntimeError(f"Inference worker {index} failed to start: {error}")
+                starting.discard(index)
+        self._idle = list(range(num_workers))
+
+        self._collector = threading.Thread(target=self._collect_results, name="inference-pool-results", daemon=True)
+        self._collector.start()
+
+    def _spawn(self, index):
+        conn, worker_conn = self._ctx.Pipe()
+        worker = self._ctx.Process(
+            target=_worker_main,
+            args=(index, self._load_fn, self._run_fn, worker_conn, self._intra_op_threads,
+                  self._inter_op_threads, self._core_sets[index]),
+            name=f"inference-worker-{index}",
+            daemon=True
+        )
+        worker.start()
+        # Only the worker holds its end now, so its exit shows up as EOF on ours
+        worker_conn.close()
+        self._conns[index] = conn
+        return worker
+
+    def submit(self, items):
+        """
+        Queues a task for the next idle worker and returns a Future resolving to run_fn's results.
+        """
+        future = Future()
+        with self._lock:
+            if self._broken is not None:
+                raise RuntimeError(self._broken)
+            if self._closing:
+                raise RuntimeError("Inference worker pool is closed")
+            task_id = next(self._ids)
+            self._futures[task_id] = future
+            self._pending.append((task_id, items))
+        self._dispatch()
+        return future
+
+    def run(self, items):
+        """
+        Runs one task on an idle worker and blocks until its results are ready.
+        """
+        return self.submit(items).result()
+
+    def _dispatch(self):
+        # The assignment is recorded before the task is sent, so if the worker dies at any
+        # point from here on _replace_worker finds the task and fails it
+        with self._lock:
+            assigned = []
+            while self._idle and self._pending:
+                index = self._idle.pop()
+                task_id, items = self._pending.popleft()
+                self._running[index] = task_id
+                assigned.append((self._conns[index], task_id, items))
+        for conn, task_id, items in assigned:
+            try:
+                conn.send((task_id, items))
+            except OSError:
+                pass  # the worker is gone; its EOF fails the task
+
+    def _collect_results(self):
+        while self._broken is None:
+            conns = {self._conns[i]: i for i in range(self.num_workers) if i not in self._retired}
+            if not conns:
+                return
+            for conn in wait(list(conns), timeout=1.0):
+                index = conns[conn]
+                try:
+                    task_id, status, payload = conn.recv()
+                except (EOFError, OSError):
+                    self._replace_worker(index)
+                    continue
+
+                if status == "failed":
+                    # A replacement couldn't load the model, don't keep respawning it
+                    conn.close()
+                    with self._lock:
+                        self._retired.add(index)
+                    if len(self._retired) == self.num_workers:
+                        self._fail_all(f"No inference worker could be restarted: {payload}")
+                    continue
+                if status != "ready":
+                    with self._lock:
+                        self._running.pop(index, None)
+                    self._resolve(task_id, status == "ok", payload)
+                with self._lock:
+                    if not self._closing:
+                        self._idle.append(index)
+                self._dispatch()
+
+    def _resolve(self, task_id, ok, result):
+        with self._lock:
+            future = self._futures.pop(task_id, None)
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result(result)
+        else:
+            future.set_exception(RuntimeError(result))
+
+    def _replace_worker(self, index):
+        worker = self._workers[index]
+        worker.join(1.0)
+        self._conns[index].close()
+        with self._lock:
+            if index in self._idle:
+                self._idle.remove(index)
+            task_id = self._running.pop(index, None)
+            if self._closing:
+                self._retired.add(index)
+        if task_id is not None:
+            self._resolve(task_id, False, f"Inference worker {index} died (exit code {worker.exitcode})")
+        if self._closing:
+            return
+        self._workers[index] = self._spawn(index)
+        self.respawns += 1
+
+    def _fail_all(self, message):
+        with self._lock:
+            self._broken = message
+            futures, self._futures = self._futures, {}
+            self._pending.clear()
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(RuntimeError(message))
+
+    def close(self, timeout=5.0):
+        """
+        Lets the workers finish the tasks they were given, stops them, the result thread and
+        the pipes. Tasks still waiting for a worker fail.
+        """
+        with self._lock:
+            self._closing = True
+            self._idle = []
+            conns = [self._conns[i] for i in range(self.num_workers) if i not in self._retired]
+        for conn in conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join(timeout)
+        if self._collector is not None:
+            # Exits once it has read every worker's EOF
+            self._collector.join(timeout)
+        for conn in self._conns:
+            if conn is not None:
+                conn.close()
+        if self._broken is None:
+            self._fail_all("Inference worker pool is closed")
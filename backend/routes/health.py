@@ -0,0 +1,18 @@
+from flask import Blueprint, jsonify
+from model import inference_wrapper
+
+health_bp = Blueprint('health_bp', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    # Liveness: the server is up, whether or not the model has finished loading
+    return jsonify({'status': 'ok'})
+
+@health_bp.route('/ready', methods=['GET'])
+def ready():
+    # Readiness: only route traffic here once the model is loaded
+    status = inference_wrapper.status()
+    body = {'status': status, 'startup_timings': inference_wrapper.startup_timings}
+    if status == 'failed':
+        body['error'] = inference_wrapper.load_error()
+    return jsonify(body), 200 if status == 'ready' else 503
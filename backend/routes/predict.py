@@ -1,8 +1,5 @@
-import os
-import tempfile
 from flask import Blueprint, request, jsonify
-from werkzeug.utils import secure_filename
-from model.inference_wrapper import get_prediction
+from model.inference_wrapper import ModelNotReady, get_scheduler_stats, predict_upload
 
 predict_bp = Blueprint('predict_bp', __name__)
 
@@ -10,6 +7,14 @@ predict_bp = Blueprint('predict_bp', __name__)
 def index():
     return "Lipreading Model API is running!"
 
+@predict_bp.route('/scheduler/stats', methods=['GET'])
+def scheduler_stats():
+    # Queue depth, batch sizes and wait times of the inference batching queue
+    try:
+        return jsonify(get_scheduler_stats(reset=request.args.get('reset') == '1'))
+    except ModelNotReady as e:
+        return jsonify({'error': str(e)}), 503
+
 @predict_bp.route('/predict', methods=['POST'])
 def predict():
     if 'file' not in request.files:
@@ -19,16 +24,17 @@ def predict():
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
 
-    # Save the uploaded video to a temporary file.
-    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp:
-        file.save(tmp)
-        temp_path = tmp.name
-
+    # The upload stays in memory (see InMemoryRequest in app.py); the frame backends decode it
+    # from there, vtp gets its original bytes
     try:
-        prediction = get_prediction(temp_path)
+        prediction = predict_upload(file.stream)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ModelNotReady as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
-        os.remove(temp_path)
         return jsonify({'error': str(e)}), 500
+    finally:
+        file.close()
 
-    os.remove(temp_path)
     return jsonify({'prediction': prediction})
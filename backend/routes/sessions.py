@@ -0,0 +1,173 @@
+import threading
+import cv2
+import numpy as np
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_nth", "slow_down")
+
+class FrameRingBuffer:
+    """
+    Fixed-capacity ring buffer of decoded frames, preallocated as one
+    (capacity, height, width, 3) uint8 array so a session's memory never grows.
+    Incoming frames are resized straight into their slot.
+    """
+    def __init__(self, capacity, height, width):
+        self.capacity = capacity
+        self.frames = np.empty((capacity, height, width, 3), dtype=np.uint8)
+        self.start = 0  # slot of the oldest frame
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def is_full(self):
+        return self.size == self.capacity
+
+    def push(self, frame):
+        """
+        Appends a frame, overwriting the oldest one if the buffer is full.
+        """
+        if self.is_full():
+            self.start = (self.start + 1) % self.capacity
+            self.size -= 1
+        slot = self.frames[(self.start + self.size) % self.capacity]
+        if frame.shape == slot.shape:
+            slot[...] = frame
+        else:
+            cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot, interpolation=cv2.INTER_AREA)
+        self.size += 1
+
+    def _order(self):
+        return (self.start + np.arange(self.size)) % self.capacity
+
+    def drop(self, index):
+        """
+        Removes the frame at position index (0 = oldest); the older frames move up one slot.
+        """
+        order = self._order()
+        # Fancy-indexed RHS is a copy, so the overlapping shift is safe
+        self.frames[order[1:index + 1]] = self.frames[order[:index]]
+        self.start = (self.start + 1) % self.capacity
+        self.size -= 1
+
+    def pop(self, n=None):
+        """
+        Removes and returns the n oldest frames (all if None) as a (n, height, width, 3) copy.
+        """
+        n = self.size if n is None else min(n, self.size)
+        frames = self.frames[(self.start + np.arange(n)) % self.capacity]
+        self.start = (self.start + n) % self.capacity
+        self.size -= n
+        return frames
+
+class Session:
+    """
+    State of one connected socket client: its frame buffer, optional streaming
+    inference state and whether an inference task is currently draining it.
+    """
+    def __init__(self, sid, buffer, overflow_policy, drop_every, stream=None):
+        self.sid = sid
+        self.buffer = buffer
+        self.overflow_policy = overflow_policy
+        self.drop_every = drop_every
+        self.stream = stream
+        self.dropped = 0
+        # Position of the next frame drop_nth removes; it walks through the buffer drop_every frames
+        # at a time, so sustained overflow thins the frames evenly instead of cutting a gap
+        self._drop_cursor = drop_every - 1
+        self.lock = threading.Lock()
+        self._processing = False
+
+    def add_frame(self, frame):
+        """
+        Buffers a frame according to the overflow policy.
+        Returns False if the frame was rejected and the client should slow down.
+        """
+        with self.lock:
+            if self.buffer.is_full():
+                if self.overflow_policy == "slow_down":
+                    self.dropped += 1
+                    return False
+                if self.overflow_policy == "drop_nth":
+                    # One frame per overflow
+                    if self._drop_cursor >= len(self.buffer):
+                        # Wraps to the oldest frame in a buffer smaller than drop_every
+                        self._drop_cursor = (self.drop_every - 1) % len(self.buffer)
+                    self.buffer.drop(self._drop_cursor)
+                    self._drop_cursor += self.drop_every - 1
+                # drop_oldest: push overwrites the oldest frame
+                self.dropped += 1
+            self.buffer.push(frame)
+            return True
+
+    def take_frames(self, min_frames=1, max_frames=None):
+        """
+        Pops up to max_frames buffered frames if at least min_frames are available, else None.
+        """
+        with self.lock:
+            if len(self.buffer) < min_frames:
+                return None
+            frames = self.buffer.pop(max_frames)
+            self._drop_cursor = max(self._drop_cursor - len(frames), self.drop_every - 1)
+            return frames
+
+    def start_processing(self, min_frames=1):
+        """
+        Claims the session for an inference task if at least min_frames are buffered.
+        Returns False if there is not enough to do or a task is already running.
+        """
+        with self.lock:
+            if self._processing or len(self.buffer) < min_frames:
+                return False
+            self._processing = True
+            return True
+
+    def finish_processing(self, min_frames=1, force=False):
+        """
+        Releases the session, unless frames arrived meanwhile (then the task should keep going).
+        """
+        with self.lock:
+            if not force and len(self.buffer) >= min_frames:
+                return False
+            self._processing = False
+            return True
+
+class SessionManager:
+    """
+    Sessions keyed by socket id. Every session gets its own preallocated frame buffer,
+    so memory per connected client is fixed at capacity * height * width * 3 bytes.
+    """
+    def __init__(self, capacity, height, width, overflow_policy="drop_oldest", drop_every=3, stream_factory=None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow_policy!r}, expected one of {OVERFLOW_POLICIES}")
+        if overflow_policy == "drop_nth" and drop_every < 2:
+            raise ValueError("drop_every must be at least 2")
+        if overflow_policy == "drop_nth" and drop_every > capacity:
+            raise ValueError(f"drop_every ({drop_every}) can't exceed the buffer capacity ({capacity})")
+        self.capacity = capacity
+        self.height = height
+        self.width = width
+        self.overflow_policy = overflow_policy
+        self.drop_every = drop_every
+        self.stream_factory = stream_factory
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, sid):
+        """
+        Returns the session for sid, creating it on first use.
+        """
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                stream = self.stream_factory() if self.stream_factory is not None else None
+                session = Session(sid, FrameRingBuffer(self.capacity, self.height, self.width),
+                                  self.overflow_policy, self.drop_every, stream)
+                self._sessions[sid] = session
+            return session
+
+    def remove(self, sid):
+        with self._lock:
+            return self._sessions.pop(sid, None)
@@ -1,32 +1,83 @@
 import base64
-import os
-import tempfile
 import cv2
 import numpy as np
+from flask import request
 from flask_socketio import SocketIO, emit
-from model.inference_wrapper import get_prediction
+from config import Config
+from model.inference_wrapper import create_stream, is_ready, predict_frames, supports_streaming
+from routes.sessions import SessionManager
 
 # Create a SocketIO instance.
 socketio = SocketIO(cors_allowed_origins="*")
 
-# Global frame buffer to accumulate video frames.
-frame_buffer = []
+# Number of frames per transcript for backends that run on whole clips.
+CLIP_FRAMES = 30
+
+# One session (frame buffer + inference state) per connected client, keyed by socket id.
+sessions = SessionManager(
+    capacity=Config.SESSION_BUFFER_FRAMES,
+    height=Config.SESSION_FRAME_HEIGHT,
+    width=Config.SESSION_FRAME_WIDTH,
+    overflow_policy=Config.OVERFLOW_POLICY,
+    drop_every=Config.OVERFLOW_DROP_EVERY,
+    stream_factory=create_stream if supports_streaming() else None
+)
 
 @socketio.on('connect')
 def handle_connect():
     print("Client connected via WebSocket")
+    if not is_ready():
+        # The session is created with the first frame once the model is loaded
+        emit('response', {'message': 'Connected to Lipreading WebSocket, model is still loading'})
+        return
+    sessions.get(request.sid)
     emit('response', {'message': 'Connected to Lipreading WebSocket'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    sessions.remove(request.sid)
     print("Client disconnected")
 
+def min_frames_per_step():
+    # Streaming consumes any number of frames, whole-clip backends need a full clip
+    return 1 if supports_streaming() else CLIP_FRAMES
+
+def process_session(session):
+    """
+    Background task draining one client's frame buffer through the model.
+    Only one task runs per session; it exits once the buffer is drained.
+    """
+    min_frames = min_frames_per_step()
+    try:
+        while True:
+            frames = session.take_frames(min_frames, None if session.stream is not None else CLIP_FRAMES)
+            if frames is None:
+                if session.finish_processing(min_frames):
+                    return
+                continue
+
+            if session.stream is not None:
+                # Frames are BGR from cv2.imdecode
+                transcript = session.stream.push(np.ascontiguousarray(frames[..., ::-1]))
+            else:
+                transcript = predict_frames(frames)
+
+            if transcript is not None:
+                socketio.emit('transcript', {'text': transcript}, to=session.sid)
+    except Exception as e:
+        session.finish_processing(force=True)
+        socketio.emit('error', {'message': str(e)}, to=session.sid)
+
 @socketio.on('video_frame')
 def handle_video_frame(data):
     """
     Expecting data as a dictionary with a key 'frame' containing a base64-encoded image.
     """
     try:
+        if not is_ready():
+            emit('error', {'message': 'Model is still loading'})
+            return
+
         frame_data = data.get('frame')
         if not frame_data:
             emit('error', {'message': 'No frame data provided'})
@@ -36,36 +87,21 @@ def handle_video_frame(data):
         img_bytes = base64.b64decode(frame_data)
         np_arr = np.frombuffer(img_bytes, np.uint8)
         img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        frame_buffer.append(img)
+        if img is None:
+            emit('error', {'message': 'Could not decode frame'})
+            return
 
-        # Process when buffer reaches 30 frames (adjust threshold as needed).
-        if len(frame_buffer) >= 30:
-            # Create a temporary video file.
-            temp_video = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
-            temp_video_path = temp_video.name
-            temp_video.close()
-            
-            # Get frame dimensions.
-            height, width, _ = frame_buffer[0].shape
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(temp_video_path, fourcc, 25, (width, height))
-            
-            # Write frames into the video file.
-            for frame in frame_buffer:
-                out.write(frame)
-            out.release()
+        session = sessions.get(request.sid)
+        if not session.add_frame(img):
+            # Buffer full and the policy is to push back on the client
+            emit('slow_down', {'message': 'Frame buffer full, reduce the frame rate', 'dropped': session.dropped})
+            return
 
-            # Run inference on the temporary video file.
-            transcript = get_prediction(temp_video_path)
-            
-            # Clean up temporary file and reset buffer.
-            os.remove(temp_video_path)
-            frame_buffer.clear()
+        # Hand the buffer to a background inference task if none is draining it yet
+        if session.start_processing(min_frames_per_step()):
+            socketio.start_background_task(process_session, session)
 
-            # Emit the transcript back to the client.
-            emit('transcript', {'text': transcript})
-        else:
-            # Optionally, acknowledge receipt of the frame.
-            emit('response', {'message': f'Received frame. Buffer size: {len(frame_buffer)}'})
+        # Optionally, acknowledge receipt of the frame.
+        emit('response', {'message': f'Received frame. Buffer size: {len(session.buffer)}', 'dropped': session.dropped})
     except Exception as e:
         emit('error', {'message': str(e)})
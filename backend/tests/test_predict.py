@@ -0,0 +1,66 @@
+import io
+import os
+import threading
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from app import InMemoryRequest
+from config import Config
+from model import inference_wrapper
+from model.video_io import write_video
+from routes.predict import predict_bp
+
+
+class RecordingScheduler:
+    def __init__(self):
+        self.items = []
+
+    def predict(self, item):
+        # vtp items are paths that only exist during the request
+        self.items.append(open(item, "rb").read() if isinstance(item, str) else item)
+        return "HELLO"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    ready = threading.Event()
+    ready.set()
+    monkeypatch.setattr(inference_wrapper, "_ready", ready)
+    monkeypatch.setattr(inference_wrapper, "scheduler", RecordingScheduler())
+    app = Flask(__name__)
+    app.request_class = InMemoryRequest
+    app.register_blueprint(predict_bp)
+    return app.test_client()
+
+
+def upload(client, data):
+    return client.post("/predict", data={"file": (io.BytesIO(data), "clip.mp4")},
+                       content_type="multipart/form-data")
+
+
+def test_vtp_gets_the_uploaded_bytes_unchanged(client, monkeypatch):
+    monkeypatch.setattr(Config, "MODEL_BACKEND", "vtp")
+
+    def no_reencode(*args, **kwargs):
+        raise AssertionError("the upload was re-encoded")
+    monkeypatch.setattr(inference_wrapper, "write_video", no_reencode)
+
+    data = os.urandom(4096)
+    response = upload(client, data)
+    assert response.status_code == 200 and response.get_json() == {"prediction": "HELLO"}
+    assert inference_wrapper.scheduler.items == [data]
+
+
+def test_frame_backends_decode_the_upload_in_memory(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "MODEL_BACKEND", "lipnet")
+    path = str(tmp_path / "clip.mp4")
+    write_video(path, np.full((5, 48, 64, 3), 128, dtype=np.uint8))
+
+    response = upload(client, open(path, "rb").read())
+    assert response.status_code == 200
+    (frames,) = inference_wrapper.scheduler.items
+    assert frames.shape == (5, 48, 64, 3)
+
+    assert upload(client, b"not a video").status_code == 400
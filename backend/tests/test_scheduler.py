@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from model.scheduler import MicroBatchScheduler
+
+
+def test_items_are_batched_and_results_returned_in_order():
+    release = threading.Event()
+    batches = []
+
+    def batch_fn(items):
+        release.wait(5)
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    scheduler = MicroBatchScheduler(batch_fn, max_batch_size=3, max_wait_ms=1000)
+    futures = [scheduler.submit(i) for i in range(5)]
+    release.set()
+    assert [future.result(5) for future in futures] == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2], [3, 4]]
+    assert scheduler.stats()["max_batch_size"] == 3
+
+
+def test_short_result_list_fails_every_item_of_the_batch():
+    scheduler = MicroBatchScheduler(lambda items: items[:1], max_batch_size=3, max_wait_ms=200)
+    futures = [scheduler.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="1 results for 3 items"):
+            future.result(5)
+
+
+def test_batch_fn_error_fails_the_batch_and_keeps_the_dispatcher_alive():
+    def batch_fn(items):
+        raise ValueError("decode failed")
+
+    scheduler = MicroBatchScheduler(batch_fn, max_batch_size=2, max_wait_ms=200)
+    futures = [scheduler.submit(i) for i in range(2)]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(5)
+
+    # The dispatcher thread survived and serves the next batch
+    scheduler.batch_fn = lambda items: items
+    assert scheduler.predict(7, timeout=5) == 7
+
+
+def test_set_result_failure_spares_resolved_futures():
+    scheduler = MicroBatchScheduler(lambda items: items, max_batch_size=2, max_wait_ms=200)
+    first, second = scheduler.submit(1), scheduler.submit(2)
+    second.cancel()  # set_result on a cancelled future raises InvalidStateError
+    assert first.result(5) == 1
+    assert scheduler.predict(3, timeout=5) == 3
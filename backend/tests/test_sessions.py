@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from routes.sessions import FrameRingBuffer, Session, SessionManager
+
+
+def frame(value, height=2, width=3):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def values(frames):
+    return frames[:, 0, 0, 0].tolist()
+
+
+def fill(session, count, first=0):
+    return [session.add_frame(frame(first + i)) for i in range(count)]
+
+
+def test_ring_buffer_wraps_and_resizes_into_its_slots():
+    buffer = FrameRingBuffer(capacity=3, height=2, width=3)
+    for i in range(5):
+        buffer.push(frame(i))
+    buffer.push(frame(5, height=4, width=6))  # resized on the way in
+    assert len(buffer) == 3 and buffer.is_full()
+    assert values(buffer.pop(2)) == [3, 4]
+    assert values(buffer.pop()) == [5]
+    assert len(buffer) == 0
+
+
+def test_ring_buffer_drop_keeps_the_order_across_the_wrap():
+    buffer = FrameRingBuffer(capacity=4, height=2, width=3)
+    for i in range(6):
+        buffer.push(frame(i))  # slots hold [4, 5, 2, 3], oldest first is 2, 3, 4, 5
+    buffer.drop(2)
+    assert values(buffer.pop()) == [2, 3, 5]
+
+
+def test_drop_oldest_overwrites_one_frame_per_overflow():
+    session = SessionManager(capacity=4, height=2, width=3, overflow_policy="drop_oldest").get("sid")
+    assert all(fill(session, 6))
+    assert session.dropped == 2
+    assert values(session.take_frames()) == [2, 3, 4, 5]
+
+
+def test_drop_nth_drops_a_single_frame_per_overflow_spread_over_the_buffer():
+    session = SessionManager(capacity=6, height=2, width=3, overflow_policy="drop_nth", drop_every=3).get("sid")
+    assert all(fill(session, 6))
+
+    session.add_frame(frame(6))
+    assert session.dropped == 1
+    assert values(session.buffer.frames[session.buffer._order()]) == [0, 1, 3, 4, 5, 6]
+
+    session.add_frame(frame(7))
+    assert session.dropped == 2
+    # The next drop is drop_every frames further on: 5, not a neighbour of 2
+    assert values(session.buffer.frames[session.buffer._order()]) == [0, 1, 3, 4, 6, 7]
+
+    # Past the end of the buffer the walk starts over at the oldest frames
+    session.add_frame(frame(8))
+    assert session.dropped == 3
+    assert values(session.take_frames()) == [0, 1, 4, 6, 7, 8]
+
+
+def test_drop_nth_with_a_buffer_smaller_than_drop_every():
+    with pytest.raises(ValueError, match="can't exceed the buffer capacity"):
+        SessionManager(capacity=2, height=4, width=4, overflow_policy="drop_nth", drop_every=3)
+
+    # Built directly, the walk wraps to the oldest frame instead of indexing past the buffer
+    session = Session("sid", FrameRingBuffer(2, 2, 3), "drop_nth", drop_every=3)
+    assert all(fill(session, 5))
+    assert session.dropped == 3
+    assert values(session.take_frames()) == [3, 4]
+
+
+def test_backpressure_rejects_frames_until_drained():
+    session = SessionManager(capacity=2, height=2, width=3, overflow_policy="slow_down").get("sid")
+    assert fill(session, 3) == [True, True, False]
+    assert session.dropped == 1
+    assert values(session.take_frames()) == [0, 1]
+    assert session.add_frame(frame(9))
+
+
+def test_take_frames_waits_for_min_frames_and_caps_at_max_frames():
+    session = SessionManager(capacity=8, height=2, width=3).get("sid")
+    fill(session, 3)
+    assert session.take_frames(min_frames=4) is None
+    assert values(session.take_frames(min_frames=2, max_frames=2)) == [0, 1]
+    assert values(session.take_frames()) == [2]
+
+
+def test_processing_claim_is_held_while_frames_keep_arriving():
+    session = SessionManager(capacity=8, height=2, width=3).get("sid")
+    assert not session.start_processing()  # nothing buffered
+    fill(session, 1)
+    assert session.start_processing()
+    assert not session.start_processing()  # already claimed
+
+    assert not session.finish_processing()  # a frame is still waiting, keep draining
+    session.take_frames()
+    assert session.finish_processing()
+    fill(session, 1)
+    assert session.start_processing()
+    assert session.finish_processing(force=True)
+
+
+def test_session_manager_validates_the_policy_and_reuses_sessions():
+    with pytest.raises(ValueError):
+        SessionManager(capacity=4, height=2, width=3, overflow_policy="drop_newest")
+    with pytest.raises(ValueError):
+        SessionManager(capacity=4, height=2, width=3, overflow_policy="drop_nth", drop_every=1)
+
+    manager = SessionManager(capacity=4, height=2, width=3, stream_factory=object)
+    session = manager.get("a")
+    assert manager.get("a") is session and session.stream is not None
+    assert manager.remove("a") is session and len(manager) == 0
@@ -0,0 +1,110 @@
+import os
+import signal
+import time
+from functools import partial
+
+import pytest
+
+from model.worker_pool import InferenceWorkerPool
+
+
+def load_state():
+    return {"pid": os.getpid()}
+
+
+def load_unless_blocked(block_path):
+    if os.path.exists(block_path):
+        raise OSError("model file went missing")
+    return load_state()
+
+
+def run_items(state, items):
+    if items == "crash":
+        os._exit(1)
+    if items == "raise":
+        raise ValueError("bad input")
+    if items == "slow":
+        time.sleep(1.0)
+    return state["pid"]
+
+
+@pytest.fixture
+def pool():
+    pool = InferenceWorkerPool(2, load_state, run_items, intra_op_threads=1)
+    yield pool
+    pool.close()
+
+
+def test_task_errors_fail_only_that_task(pool):
+    with pytest.raises(RuntimeError, match="ValueError: bad input"):
+        pool.run("raise")
+    assert isinstance(pool.run("ok"), int)
+
+
+def test_dead_worker_is_respawned_and_only_its_task_fails(pool):
+    slow = pool.submit("slow")
+    crashed = pool.submit("crash")
+    with pytest.raises(RuntimeError, match="died"):
+        crashed.result(30)
+    assert isinstance(slow.result(30), int)  # the other worker's task is unaffected
+
+    deadline = time.monotonic() + 30
+    while pool.respawns < 1 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert pool.respawns == 1
+    # Both workers serve tasks again, the pool isn't broken
+    pids = {pool.submit("slow").result(30) for _ in range(2)} | {pool.run("ok") for _ in range(4)}
+    assert pids and all(pid != os.getpid() for pid in pids)
+    assert sum(worker.is_alive() for worker in pool._workers) == 2
+
+
+def test_worker_killed_while_idle_does_not_hang_the_pool(pool):
+    os.kill(pool._workers[0].pid, signal.SIGKILL)
+    # Tasks handed to the dead worker before its exit is noticed fail, none is lost
+    futures = [pool.submit("ok") for _ in range(4)]
+    for future in futures:
+        try:
+            assert isinstance(future.result(30), int)
+        except RuntimeError as e:
+            assert "died" in str(e)
+
+    deadline = time.monotonic() + 30
+    while pool.respawns < 1 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert pool.respawns == 1
+    pids = {pool.submit("slow").result(30) for _ in range(2)}
+    assert pids and pool._workers[0].is_alive() and pool._workers[1].is_alive()
+
+
+def test_close_stops_the_collector_and_fails_waiting_tasks():
+    pool = InferenceWorkerPool(1, load_state, run_items, intra_op_threads=1)
+    running = pool.submit("slow")
+    waiting = pool.submit("ok")
+    pool.close()
+    assert isinstance(running.result(30), int)  # given to the worker before close
+    with pytest.raises(RuntimeError, match="closed"):
+        waiting.result(30)
+    assert not pool._collector.is_alive()
+    assert all(conn.closed for conn in pool._conns)
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.submit("ok")
+
+
+def test_pool_breaks_once_no_worker_can_be_restarted(tmp_path):
+    block_path = str(tmp_path / "block")
+    pool = InferenceWorkerPool(2, partial(load_unless_blocked, block_path), run_items, intra_op_threads=1)
+    try:
+        open(block_path, "w").close()  # replacements can't load the model from now on
+        with pytest.raises(RuntimeError, match="died"):
+            pool.run("crash")
+        assert isinstance(pool.run("ok"), int)  # the surviving worker keeps serving
+
+        with pytest.raises(RuntimeError, match="died|could be restarted"):
+            pool.run("crash")
+        deadline = time.monotonic() + 30
+        while pool._broken is None and time.monotonic() < deadline:
+            time.sleep(0.1)
+        with pytest.raises(RuntimeError, match="No inference worker could be restarted"):
+            pool.submit("ok")
+    finally:
+        pool.close()
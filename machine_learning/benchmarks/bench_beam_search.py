@@ -0,0 +1,49 @@
+import argparse
+import time
+
+import torch
+
+from src.utils.char_lm import CharNGramLM
+from src.utils.ctc_beam_search import ctc_prefix_beam_search
+from src.utils.ctc_decode import greedy_decode_ctc
+
+
+def time_fn(fn, repeats):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def synthetic_logits(batch_size, num_frames, vocab_size=28, seed=0):
+    # Mostly-blank, fairly peaked outputs like a trained CTC model produces
+    g = torch.Generator().manual_seed(seed)
+    logits = torch.randn(batch_size, num_frames, vocab_size, generator=g)
+    logits[:, :, 0] += 2.0
+    peaks = torch.randint(1, vocab_size, (batch_size, num_frames), generator=g)
+    logits.scatter_add_(2, peaks.unsqueeze(2), torch.full((batch_size, num_frames, 1), 3.0))
+    return logits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CTC prefix beam search latency vs beam width.")
+    parser.add_argument("--batch_size", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=75)
+    parser.add_argument("--beam_widths", type=int, nargs="+", default=[1, 2, 4, 8, 16, 30])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    logits = synthetic_logits(args.batch_size, args.frames)
+    lm = CharNGramLM.train(["THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG"] * 10, order=4)
+
+    greedy_ms = time_fn(lambda: greedy_decode_ctc(logits), args.repeats)
+    print(f"greedy: {greedy_ms / args.batch_size:8.3f} ms/utterance")
+
+    print(f"{'beam':>6} {'no LM ms/utt':>14} {'4-gram LM ms/utt':>18}")
+    for beam_width in args.beam_widths:
+        plain_ms = time_fn(lambda: ctc_prefix_beam_search(logits, beam_width=beam_width), args.repeats)
+        lm_ms = time_fn(lambda: ctc_prefix_beam_search(logits, beam_width=beam_width, lm=lm), args.repeats)
+        print(f"{beam_width:>6} {plain_ms / args.batch_size:>14.3f} {lm_ms / args.batch_size:>18.3f}")
+
+# python machine_learning/benchmarks/bench_beam_search.py --beam_widths 1 4 8 16 30
@@ -0,0 +1,71 @@
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import torch
+import torchvision.transforms as T
+
+from src.dataset.BBC_dataset import BBCNewsVideoDataset
+from src.dataset.transforms import ClipTransform
+
+
+def time_fn(fn, repeats):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def write_fixture(root, num_frames, size):
+    # One mvlrs-style clip: root/main/spk/00001.{mp4,txt}
+    folder = os.path.join(root, "main", "spk")
+    os.makedirs(folder, exist_ok=True)
+    writer = cv2.VideoWriter(os.path.join(folder, "00001.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 25, (size, size))
+    rng = np.random.default_rng(0)
+    for _ in range(num_frames):
+        writer.write(rng.integers(0, 255, (size, size, 3), dtype=np.uint8))
+    writer.release()
+    with open(os.path.join(folder, "00001.txt"), "w", encoding="utf-8") as f:
+        f.write("Text:  BENCHMARK CLIP\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-frame PIL pipeline vs ClipTransform.")
+    parser.add_argument("--frames", type=int, default=75)
+    parser.add_argument("--size", type=int, default=160, help="Source frame height/width (mvlrs is 160x160)")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)  # one DataLoader worker's worth of CPU
+
+    pil_transform = T.Compose([
+        T.ToPILImage(),
+        T.Resize((50,100)),
+        T.ToTensor()
+    ])
+    clip_transform = ClipTransform((50, 100))
+
+    clip = np.random.default_rng(0).integers(0, 255, (args.frames, args.size, args.size, 3), dtype=np.uint8)
+    frames = list(clip)
+
+    pil_ms = time_fn(lambda: torch.stack([pil_transform(f) for f in frames], dim=0).float(), args.repeats)
+    clip_ms = time_fn(lambda: clip_transform(clip), args.repeats)
+    print(f"transform only   per-frame PIL: {pil_ms:8.2f} ms   ClipTransform: {clip_ms:8.2f} ms   speedup: {pil_ms / clip_ms:.2f}x")
+
+    with tempfile.TemporaryDirectory() as root:
+        write_fixture(root, args.frames, args.size)
+        pil_dataset = BBCNewsVideoDataset(root, mode="main", transform=pil_transform, max_frames=args.frames)
+        clip_dataset = BBCNewsVideoDataset(root, mode="main", transform=clip_transform, max_frames=args.frames)
+
+        pil_ms = time_fn(lambda: pil_dataset[0], args.repeats)
+        clip_ms = time_fn(lambda: clip_dataset[0], args.repeats)
+        print(f"decode+transform per-frame PIL: {pil_ms:8.2f} ms   ClipTransform: {clip_ms:8.2f} ms   speedup: {pil_ms / clip_ms:.2f}x")
+
+        diff = (pil_dataset[0][0] - clip_dataset[0][0]).abs().max().item()
+        print(f"max abs difference: {diff:.4f} (1/255 = {1 / 255:.4f})")
+
+# python machine_learning/benchmarks/bench_clip_transform.py --frames 75 --size 160
@@ -0,0 +1,79 @@
+import argparse
+import os
+import socket
+import time
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import wandb
+from torch.nn.parallel import DistributedDataParallel
+
+from src.models.lipnet import LipNet
+from src.training.train_loop import train_one_epoch
+from src.utils.ctc_loss import Criterion
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def synthetic_batches(num_batches, batch_size, num_frames, seed, target_length=20):
+    # Same layout as collate_fn_ctc: frames (B, T, C, H, W), flat targets, lengths
+    g = torch.Generator().manual_seed(seed)
+    return [(
+        torch.rand(batch_size, num_frames, 3, 50, 100, generator=g),
+        torch.randint(1, 28, (batch_size * target_length,), generator=g),
+        torch.full((batch_size,), num_frames, dtype=torch.long),
+        torch.full((batch_size,), target_length, dtype=torch.long),
+    ) for _ in range(num_batches)]
+
+
+def worker(rank, world_size, port, args, results):
+    os.environ["MASTER_ADDR"] = "127.0.0.1"
+    os.environ["MASTER_PORT"] = str(port)
+    torch.set_num_threads(args.threads_per_process)
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+    wandb.init(mode="disabled")
+
+    torch.manual_seed(0)
+    model = DistributedDataParallel(LipNet())
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-4)
+    # Every rank trains on its own shard, as with a DistributedSampler
+    batches = synthetic_batches(args.steps + 1, args.batch_size, args.frames, seed=rank)
+
+    train_one_epoch(model, optimizer, batches[:1], Criterion(), 0, "cpu")  # warm-up
+    dist.barrier()
+    start = time.perf_counter()
+    train_one_epoch(model, optimizer, batches[1:], Criterion(), 1, "cpu")
+    dist.barrier()
+    if rank == 0:
+        results.put(world_size * args.steps * args.batch_size / (time.perf_counter() - start))
+    dist.destroy_process_group()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DDP (gloo, CPU) training throughput against the number of processes.")
+    parser.add_argument("--num_processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads_per_process", type=int, default=1)
+    parser.add_argument("--batch_size", type=int, default=4, help="Clips per process per step")
+    parser.add_argument("--frames", type=int, default=75)
+    parser.add_argument("--steps", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.threads_per_process} threads per process")
+    print(f"{'processes':>10} {'samples/s':>10} {'speedup':>8} {'efficiency':>11}")
+    per_process = None
+    context = mp.get_context("spawn")
+    for world_size in args.num_processes:
+        results = context.SimpleQueue()
+        mp.spawn(worker, args=(world_size, free_port(), args, results), nprocs=world_size)
+        samples_per_second = results.get()
+        # Speedup over one process, extrapolated from the first run's per-process throughput
+        per_process = per_process or samples_per_second / world_size
+        speedup = samples_per_second / per_process
+        print(f"{world_size:>10} {samples_per_second:10.2f} {speedup:8.2f} {speedup / world_size:11.2f}")
+
+# python machine_learning/benchmarks/bench_ddp_scaling.py --num_processes 1 2 4 --threads_per_process 1
@@ -0,0 +1,73 @@
+import argparse
+import time
+
+import torch
+import wandb
+
+from src.models.lipnet import LipNet
+from src.training.train_loop import train_one_epoch
+from src.utils.ctc_loss import Criterion
+from src.utils.memory import memory_mb, peak_memory_mb, reset_peak_memory
+
+
+def parse_config(config):
+    # "BxA" or "BxA+ckpt": batch size B, A accumulation steps, optional STCNN activation checkpointing
+    sizes, _, checkpointing = config.partition("+")
+    batch_size, accumulation_steps = (int(v) for v in sizes.split("x"))
+    return batch_size, accumulation_steps, checkpointing == "ckpt"
+
+
+def synthetic_batches(num_batches, batch_size, num_frames, target_length=20, seed=0):
+    # Same layout as collate_fn_ctc: frames (B, T, C, H, W), flat targets, lengths
+    g = torch.Generator().manual_seed(seed)
+    return [(
+        torch.rand(batch_size, num_frames, 3, 50, 100, generator=g),
+        torch.randint(1, 28, (batch_size * target_length,), generator=g),
+        torch.full((batch_size,), num_frames, dtype=torch.long),
+        torch.full((batch_size,), target_length, dtype=torch.long),
+    ) for _ in range(num_batches)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Peak memory and throughput of LipNet training for batch size / "
+                                                 "gradient accumulation / activation checkpointing configurations.")
+    parser.add_argument("--configs", type=str, nargs="+", default=["8x1", "8x1+ckpt", "2x4", "2x4+ckpt"],
+                        help="BxA[+ckpt]: batch size B, A accumulation steps, +ckpt for STCNN activation checkpointing")
+    parser.add_argument("--frames", type=int, default=75)
+    parser.add_argument("--optimizer_steps", type=int, default=2, help="Optimizer steps timed per configuration")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    wandb.init(mode="disabled")
+
+    # "training MB": peak above the memory in use before the epoch (model, optimizer state and data included)
+    print(f"{'config':>10} {'effective batch':>16} {'peak MB':>9} {'training MB':>12} {'samples/s':>10}")
+    for config in args.configs:
+        batch_size, accumulation_steps, checkpointing = parse_config(config)
+        torch.manual_seed(0)
+        model = LipNet(checkpoint_stcnn=checkpointing).to(args.device)
+        optimizer = torch.optim.Adam(model.parameters(), lr=1e-4)
+        batches = synthetic_batches(accumulation_steps * args.optimizer_steps, batch_size, args.frames)
+
+        # Warm-up step, also allocates the optimizer state
+        train_one_epoch(model, optimizer, batches[:accumulation_steps], Criterion(), 0, args.device,
+                        accumulation_steps=accumulation_steps)
+
+        baseline = memory_mb(args.device)
+        reset_peak_memory(args.device)
+        start = time.perf_counter()
+        train_one_epoch(model, optimizer, batches, Criterion(), 1, args.device, accumulation_steps=accumulation_steps)
+        peak = peak_memory_mb(args.device)
+        samples_per_second = len(batches) * batch_size / (time.perf_counter() - start)
+
+        if peak is None or baseline is None:
+            memory = f"{'n/a':>9} {'n/a':>12}"
+        else:
+            memory = f"{peak:9.1f} {peak - baseline:12.1f}"
+        print(f"{config:>10} {batch_size * accumulation_steps:>16} {memory} {samples_per_second:10.2f}")
+        del model, optimizer, batches
+
+# python machine_learning/benchmarks/bench_memory.py --configs 8x1 8x1+ckpt 2x4 2x4+ckpt --frames 75
@@ -0,0 +1,54 @@
+import argparse
+import os
+import tempfile
+import time
+
+import torch
+
+from src.models.lipnet import LipNet
+from src.training.onnx_runtime import GRAPH_OPTIMIZATION_LEVELS, OnnxLipNet, check_onnx_parity, export_onnx
+
+
+def time_fn(fn, repeats):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LipNet forward latency: eager PyTorch vs ONNX Runtime on CPU.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="LipNet checkpoint (random weights if not given)")
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[30, 75])
+    parser.add_argument("--threads", type=int, default=1, help="Threads for both PyTorch and ONNX Runtime")
+    parser.add_argument("--graph_optimization_level", type=str, default="all", choices=GRAPH_OPTIMIZATION_LEVELS)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    model = LipNet()
+    if args.checkpoint:
+        checkpoint = torch.load(args.checkpoint, map_location="cpu", weights_only=True)
+        model.load_state_dict(checkpoint.get("model_state_dict", checkpoint))
+    model.eval()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        onnx_path = os.path.join(tmp, "lipnet.onnx")
+        export_onnx(model, onnx_path)
+        onnx_model = OnnxLipNet(onnx_path, intra_op_threads=args.threads, inter_op_threads=1,
+                                graph_optimization_level=args.graph_optimization_level)
+        diffs = check_onnx_parity(model, onnx_model, lengths=args.lengths)
+        print(f"max abs diff vs PyTorch: {max(diffs.values()):.2e}")
+
+        for batch_size in args.batch_sizes:
+            for length in args.lengths:
+                x = torch.rand(batch_size, 3, length, 50, 100)
+                with torch.no_grad():
+                    torch_ms = time_fn(lambda: model(x), args.repeats)
+                onnx_ms = time_fn(lambda: onnx_model(x), args.repeats)
+                print(f"B={batch_size:2d} T={length:3d}   eager PyTorch: {torch_ms:8.2f} ms   "
+                      f"ONNX Runtime: {onnx_ms:8.2f} ms   speedup: {torch_ms / onnx_ms:.2f}x")
+
+# python machine_learning/benchmarks/bench_onnx_runtime.py --batch_sizes 1 4 --lengths 30 75 --threads 1
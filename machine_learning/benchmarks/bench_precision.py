@@ -0,0 +1,104 @@
+import argparse
+import multiprocessing as mp
+import time
+
+import torch
+
+from src.models.lipnet import LipNet
+from src.training.precision import PRECISIONS, autocast, grad_scaler
+from src.utils.ctc_loss import Criterion
+from src.utils.memory import memory_mb, peak_memory_mb, reset_peak_memory
+
+
+class SavedActivations:
+    # Bytes of the tensors autograd keeps for the backward pass (peak of one step)
+    def __init__(self):
+        self.bytes = 0
+        self._seen = set()
+
+    def pack(self, tensor):
+        key = (tensor.untyped_storage().data_ptr(), tensor.dtype)
+        if key not in self._seen:
+            self._seen.add(key)
+            self.bytes += tensor.untyped_storage().nbytes()
+        return tensor
+
+    def __enter__(self):
+        self._hooks = torch.autograd.graph.saved_tensors_hooks(self.pack, lambda tensor: tensor)
+        self._hooks.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._hooks.__exit__(*exc)
+
+
+def train_step(model, criterion, optimizer, scaler, batch, device, precision):
+    frames, targets, input_lengths, target_lengths = batch
+    with autocast(device, precision):
+        logits = model(frames)
+        loss = criterion((logits, input_lengths), (targets, target_lengths))["overall"]
+    scaler.scale(loss).backward()
+    scaler.step(optimizer)
+    scaler.update()
+    optimizer.zero_grad()
+
+
+def run_precision(args, precision):
+    # Runs in a fresh process, so the CPU peak RSS isn't inflated by what an earlier precision left allocated
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    g = torch.Generator().manual_seed(0)
+    batch = (
+        torch.rand(args.batch_size, 3, args.frames, 50, 100, generator=g).to(args.device),
+        torch.randint(1, 28, (args.batch_size * 20,), generator=g).to(args.device),
+        torch.full((args.batch_size,), args.frames, dtype=torch.long),
+        torch.full((args.batch_size,), 20, dtype=torch.long),
+    )
+
+    torch.manual_seed(0)
+    model = LipNet().to(args.device).train()
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-4)
+    criterion = Criterion()
+    scaler = grad_scaler(args.device, precision)
+    step = lambda: train_step(model, criterion, optimizer, scaler, batch, args.device, precision)
+
+    step()  # warm-up
+    # Separate, untimed step: the hooks would add their overhead to the step time
+    with SavedActivations() as saved:
+        step()
+
+    reset_peak_memory(args.device)
+    before_mb = memory_mb(args.device)
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        step()
+    if args.device.startswith("cuda"):
+        torch.cuda.synchronize()
+    step_ms = (time.perf_counter() - start) / args.repeats * 1000.0
+    return {"step_ms": step_ms, "saved_mb": saved.bytes / 2**20, "before_mb": before_mb,
+            "peak_mb": peak_memory_mb(args.device)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LipNet training step time and peak memory per autocast precision.")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--precisions", type=str, nargs="+", default=None, choices=PRECISIONS,
+                        help="Default: fp32 and bf16, plus fp16 on CUDA (CPUs have no fast fp16 Conv3d)")
+    parser.add_argument("--batch_size", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=75)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    precisions = args.precisions or (["fp32", "bf16", "fp16"] if args.device.startswith("cuda") else ["fp32", "bf16"])
+
+    # Peak memory: allocated tensors on CUDA, the process' peak RSS on CPU
+    with mp.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        for precision in precisions:
+            result = pool.apply(run_precision, (args, precision))
+            peak = "n/a" if result["peak_mb"] is None else (
+                f"{result['peak_mb']:8.1f} MB (+{result['peak_mb'] - result['before_mb']:.1f} MB during the steps)")
+            print(f"{precision:>5}   step: {result['step_ms']:9.2f} ms   "
+                  f"saved activations: {result['saved_mb']:8.1f} MB   peak memory: {peak}")
+
+# python machine_learning/benchmarks/bench_precision.py --batch_size 8 --frames 75
@@ -0,0 +1,257 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from src.dataset.BBC_dataset import BBCNewsVideoDataset, collate_fn_ctc
+from src.dataset.transforms import ClipTransform
+from src.models.lipnet import LipNet
+from src.models.stcnn import STCNN
+from src.utils.ctc_decode import greedy_decode_ctc
+from src.utils.metrics import levenshtein_distance
+from src.utils.tokenizer import text_to_int_sequence
+from tests.fixtures import WORDS, write_mvlrs_tree
+
+
+def time_fn(fn, repeats, min_time=0.0):
+    # Per-call times in ms after one warm-up call; keeps going past `repeats` until min_time seconds
+    fn()
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeats or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return times
+
+
+def model_cases(batch_sizes, frame_counts):
+    def forward(model_class, shape):
+        module = model_class().eval()
+        x = torch.rand(shape, generator=torch.Generator().manual_seed(0))
+
+        def fn():
+            with torch.no_grad():
+                module(x)
+        return fn
+
+    def forward_backward(shape):
+        model = LipNet().train()
+        x = torch.rand(shape, generator=torch.Generator().manual_seed(0))
+
+        def fn():
+            model.zero_grad(set_to_none=True)
+            model(x).logsumexp(-1).mean().backward()
+        return fn
+
+    cases = {}
+    for batch_size in batch_sizes:
+        for num_frames in frame_counts:
+            shape = (batch_size, 3, num_frames, 50, 100)
+            suffix = f"b{batch_size}_t{num_frames}"
+            cases[f"stcnn_forward/{suffix}"] = lambda shape=shape: forward(STCNN, shape)
+            cases[f"lipnet_forward/{suffix}"] = lambda shape=shape: forward(LipNet, shape)
+            cases[f"lipnet_forward_backward/{suffix}"] = lambda shape=shape: forward_backward(shape)
+    return cases
+
+
+def data_cases(root, batch_size):
+    def dataset():
+        return BBCNewsVideoDataset(root, mode="main", transform=ClipTransform((50, 100)))
+
+    def getitem():
+        data = dataset()
+        return lambda: data[0]
+
+    def collate():
+        data = dataset()
+        items = [data[idx] for idx in range(batch_size)]
+        # collate_fn_ctc sorts its argument in place
+        return lambda: collate_fn_ctc(list(items))
+
+    return {
+        "dataset_getitem/clip_transform": getitem,
+        f"collate_fn_ctc/b{batch_size}": collate,
+    }
+
+
+def decoding_cases(batch_size):
+    rng = np.random.default_rng(0)
+    sentences = [" ".join(rng.choice(WORDS, 8)) for _ in range(64)]
+
+    def greedy():
+        logits = torch.randn(batch_size, 75, 28, generator=torch.Generator().manual_seed(0))
+        input_lengths = torch.randint(40, 76, (batch_size,), generator=torch.Generator().manual_seed(1))
+        return lambda: greedy_decode_ctc(logits, input_lengths=input_lengths)
+
+    def levenshtein():
+        id_pairs = [(text_to_int_sequence(a), text_to_int_sequence(b)) for a, b in zip(sentences, sentences[1:])]
+        return lambda: [levenshtein_distance(ref, hyp) for ref, hyp in id_pairs]
+
+    return {
+        f"greedy_decode_ctc/b{batch_size}_t75": greedy,
+        "levenshtein_distance/63_pairs": levenshtein,
+        "text_to_int_sequence/64_sentences": lambda: lambda: [text_to_int_sequence(text) for text in sentences],
+    }
+
+
+def build_cases(args, root):
+    # name -> factory building the timed function, so only the selected benchmarks are set up
+    cases = {}
+    cases.update(model_cases(args.batch_sizes, args.frames))
+    cases.update(data_cases(root, args.batch_size))
+    cases.update(decoding_cases(args.batch_size))
+    return cases
+
+
+def run_case(args, root, name):
+    # Runs in a fresh process, so no benchmark sees the allocator / cache state another one left behind
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    times = time_fn(build_cases(args, root)[name](), args.repeats, args.min_time)
+    return {
+        "median_ms": statistics.median(times),
+        "min_ms": min(times),
+        "stdev_ms": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "runs": len(times),
+    }
+
+
+def environment(threads):
+    return {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "threads": threads or torch.get_num_threads(),
+    }
+
+
+def run_suite(args):
+    with tempfile.TemporaryDirectory() as root:
+        write_mvlrs_tree(root, num_speakers=2, clips_per_speaker=args.batch_size // 2 + 1, num_frames=(60, 75))
+        names = [name for name in build_cases(args, root)
+                 if not args.filter or any(pattern in name for pattern in args.filter)]
+
+        results = {}
+        # A new worker process per benchmark
+        with mp.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+            for name in names:
+                results[name] = pool.apply(run_case, (args, root, name))
+                print(f"{name:45s} {results[name]['median_ms']:10.3f} ms  (min {results[name]['min_ms']:.3f}, "
+                      f"{results[name]['runs']} runs)", flush=True)
+
+    report = {"environment": environment(args.threads), "results": results}
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+    return report
+
+
+def compare_reports(baseline, current, threshold, statistic="min_ms"):
+    """
+    Compares two run_suite reports on one statistic ("min_ms", the least noisy on a busy
+    machine, or "median_ms"). Returns rows (name, baseline ms, current ms, relative change, status),
+    status being "regression" / "improvement" beyond threshold (0.2 = 20%), "ok", or "missing" / "new".
+    """
+    rows = []
+    base, curr = baseline["results"], current["results"]
+    for name in sorted(set(base) | set(curr)):
+        if name not in curr:
+            rows.append((name, base[name][statistic], None, None, "missing"))
+            continue
+        if name not in base:
+            rows.append((name, None, curr[name][statistic], None, "new"))
+            continue
+        before, after = base[name][statistic], curr[name][statistic]
+        change = after / before - 1.0 if before > 0 else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, change, status))
+    return rows
+
+
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        current = run_suite(args)
+
+    for key, value in baseline["environment"].items():
+        if current["environment"].get(key) != value:
+            print(f"warning: {key} differs from the baseline ({value} -> {current['environment'].get(key)}), "
+                  "timings may not be comparable")
+
+    if args.filter:
+        # Benchmarks left out of this run aren't missing
+        baseline["results"] = {name: result for name, result in baseline["results"].items()
+                               if any(pattern in name for pattern in args.filter)}
+    rows = compare_reports(baseline, current, args.threshold, f"{args.statistic}_ms")
+    print(f"\n{'benchmark (' + args.statistic + ')':45s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, before, after, change, status in rows:
+        before = f"{before:9.3f} ms" if before is not None else "-"
+        after = f"{after:9.3f} ms" if after is not None else "-"
+        change = f"{change:+7.1%}" if change is not None else "-"
+        flag = "" if status == "ok" else f"  {status.upper()}"
+        print(f"{name:45s} {before:>12s} {after:>12s} {change:>8s}{flag}")
+
+    regressions = [row[0] for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU microbenchmarks of the model, data and decoding hot paths "
+                                                 "on synthetic mvlrs-style fixtures, with JSON baselines.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_options = argparse.ArgumentParser(add_help=False)
+    run_options.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 4], help="Model benchmark batch sizes")
+    run_options.add_argument("--frames", type=int, nargs="+", default=[25, 75], help="Model benchmark clip lengths")
+    run_options.add_argument("--batch_size", type=int, default=8, help="Batch size of the collate / decoding benchmarks")
+    run_options.add_argument("--repeats", type=int, default=5, help="Minimum timed calls per benchmark")
+    run_options.add_argument("--min_time", type=float, default=0.5, help="Minimum seconds spent timing each benchmark")
+    run_options.add_argument("--threads", type=int, default=1, help="torch threads (0 = torch's default)")
+    run_options.add_argument("--filter", type=str, nargs="+", default=None,
+                             help="Only run benchmarks whose name contains one of these")
+    run_options.add_argument("--output", type=str, default=None, help="JSON file the results are written to")
+
+    run_parser = subparsers.add_parser("run", parents=[run_options], help="Run the suite")
+    run_parser.set_defaults(func=run_suite)
+
+    compare_parser = subparsers.add_parser("compare", parents=[run_options],
+                                           help="Compare against a baseline, exit 1 on regressions")
+    compare_parser.add_argument("baseline", type=str, help="JSON written by `run --output`")
+    compare_parser.add_argument("current", type=str, nargs="?", default=None,
+                                help="JSON to compare; the suite is run now if omitted")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="Relative slowdown flagged as a regression")
+    compare_parser.add_argument("--statistic", type=str, default="min", choices=["min", "median"],
+                                help="Per-benchmark time compared (min is the most stable on shared machines)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+# python machine_learning/benchmarks/bench_suite.py run --output machine_learning/benchmarks/baseline.json
+# python machine_learning/benchmarks/bench_suite.py compare machine_learning/benchmarks/baseline.json --threshold 0.2
@@ -0,0 +1,16 @@
+import argparse
+
+from src.dataset.manifest import build_manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or incrementally refresh a dataset manifest.")
+    parser.add_argument("--root_dir", type=str, default="machine_learning/data/mvlrs_v1", help="Path to dataset")
+    parser.add_argument("--mode", type=str, default="main", help="Which subdir to index: pretrain or main")
+    parser.add_argument("--manifest_path", type=str, required=True, help="Manifest file to create or refresh")
+    parser.add_argument("--num_workers", type=int, default=None, help="Indexing processes (default: all cores)")
+    args = parser.parse_args()
+
+    build_manifest(args.root_dir, args.mode, args.manifest_path, num_workers=args.num_workers)
+
+# python machine_learning/scripts/build_manifest.py --root_dir machine_learning/data/mvlrs_v1 --mode main --manifest_path machine_learning/data/main_manifest.json
+# then: BBCNewsVideoDataset(root_dir, mode='main', manifest_path="machine_learning/data/main_manifest.json")
@@ -1,6 +1,7 @@
 import torch
 import argparse
 from src.models.lipnet import LipNet
+from src.training.onnx_runtime import check_onnx_parity, export_onnx
 
 def main():
     parser = argparse.ArgumentParser(description="Export LipNet model to ONNX format.")
@@ -8,13 +9,19 @@ def main():
                         help="Path to the LipNet .pth checkpoint file.")
     parser.add_argument("--output", type=str, default="lipnet.onnx",
                         help="Path to save the exported ONNX model.")
+    parser.add_argument("--opset", type=int, default=17,
+                        help="ONNX opset version.")
+    parser.add_argument("--verify_lengths", type=int, nargs="*", default=[20, 50, 75, 100],
+                        help="Clip lengths to check ONNX Runtime against PyTorch on (none to skip).")
+    parser.add_argument("--atol", type=float, default=1e-4,
+                        help="Maximum allowed absolute difference of the logits.")
     args = parser.parse_args()
 
     # Instantiate the LipNet model.
     model = LipNet()
 
     # Load the checkpoint.
-    checkpoint = torch.load(args.checkpoint, map_location=torch.device("cpu"))
+    checkpoint = torch.load(args.checkpoint, map_location=torch.device("cpu"), weights_only=True)
 
     # If the checkpoint contains a "model_state_dict" key, extract it.
     if isinstance(checkpoint, dict) and "model_state_dict" in checkpoint:
@@ -26,23 +33,14 @@ def main():
     model.load_state_dict(state_dict)
     model.eval()  # Set model to evaluation mode
 
-    # Create a dummy input tensor with the expected shape: (batch, channels, T, H, W)
-    dummy_input = torch.randn(1, 3, 75, 50, 100)
-
-    # Export the model to ONNX format.
-    torch.onnx.export(
-        model,                      # model being exported
-        dummy_input,                # dummy input tensor
-        args.output,                # output file path
-        export_params=True,         # store the trained parameter weights inside the model file
-        opset_version=11,           # ONNX version to export the model to
-        input_names=["input"],      # model input name
-        output_names=["output"],    # model output name
-        dynamic_axes={
-            "input": {0: "batch_size"},
-            "output": {0: "batch_size"}
-        }                           # support variable batch size
-    )
+    # Export with dynamic batch and time axes: input (batch, channels, T, H, W)
+    export_onnx(model, args.output, opset_version=args.opset)
+
+    # Check the exported graph against PyTorch on clips of several lengths
+    if args.verify_lengths:
+        diffs = check_onnx_parity(model, args.output, lengths=args.verify_lengths, atol=args.atol)
+        for length, diff in diffs.items():
+            print(f"T={length:4d}  max abs diff vs PyTorch: {diff:.2e}")
 
     print(f"LipNet model has been successfully exported to {args.output}")
 
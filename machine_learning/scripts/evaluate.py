@@ -0,0 +1,58 @@
+import argparse
+
+import torch
+from torch.utils.data import Subset
+
+from src.dataset.BBC_dataset import BBCNewsVideoDataset
+from src.dataset.transforms import ClipTransform
+from src.models.lipnet import LipNet
+from src.models.quantization import is_quantized_checkpoint, load_checkpoint, load_quantized_lipnet
+from src.training.evaluate import evaluate, make_eval_loader
+from src.training.precision import PRECISIONS
+from src.utils.char_lm import CharNGramLM
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched CER/WER evaluation of a LipNet checkpoint over a dataset split.")
+    parser.add_argument("--checkpoint", type=str, required=True, help="LipNet checkpoint (fp32 or from quantize_lipnet.py)")
+    parser.add_argument("--root_dir", type=str, default="machine_learning/data/mvlrs_v1", help="Path to dataset")
+    parser.add_argument("--mode", type=str, default="test", help="Which subdir to evaluate")
+    parser.add_argument("--manifest_path", type=str, default=None, help="Manifest of the split, enables length-sorted batches")
+    parser.add_argument("--cache_dir", type=str, default=None, help="Clip cache of the split from preprocess_clips.py")
+    parser.add_argument("--max_clips", type=int, default=None, help="Only evaluate the first N clips")
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--num_workers", type=int, default=4, help="DataLoader workers")
+    parser.add_argument("--decode_workers", type=int, default=2, help="Decode pool size")
+    parser.add_argument("--decode_processes", action="store_true", help="Decode in processes (for beam search)")
+    parser.add_argument("--beam_width", type=int, default=1, help="1 = greedy decoding")
+    parser.add_argument("--lm_path", type=str, default=None, help="Character n-gram LM from scripts/train_char_lm.py")
+    parser.add_argument("--lm_alpha", type=float, default=0.5)
+    parser.add_argument("--precision", type=str, default="fp32", choices=PRECISIONS)
+    parser.add_argument("--output_path", type=str, default="eval_results.json")
+    args = parser.parse_args()
+
+    checkpoint = load_checkpoint(args.checkpoint)
+    if is_quantized_checkpoint(checkpoint):
+        # int8 model, CPU only
+        model = load_quantized_lipnet(checkpoint)
+        device = "cpu"
+    else:
+        model = LipNet()
+        model.load_state_dict(checkpoint["model_state_dict"] if "model_state_dict" in checkpoint else checkpoint)
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model.to(device)
+
+    dataset = BBCNewsVideoDataset(args.root_dir, mode=args.mode, transform=ClipTransform((50, 100)),
+                                  manifest_path=args.manifest_path, cache_dir=args.cache_dir)
+    loader_dataset = dataset
+    if args.max_clips is not None:
+        loader_dataset = Subset(dataset, range(min(args.max_clips, len(dataset))))
+    loader = make_eval_loader(loader_dataset, batch_size=args.batch_size, num_workers=args.num_workers)
+
+    lm = CharNGramLM.load(args.lm_path) if args.lm_path else None
+    results = evaluate(model, loader, device, precision=args.precision, beam_width=args.beam_width, lm=lm,
+                       lm_alpha=args.lm_alpha, decode_workers=args.decode_workers,
+                       decode_processes=args.decode_processes, output_path=args.output_path)
+    print(f"{results['num_utterances']} utterances - CER: {results['cer']:.4f}, WER: {results['wer']:.4f}")
+    print(f"Per-utterance hypotheses written to {args.output_path}")
+
+# python machine_learning/scripts/evaluate.py --checkpoint machine_learning/checkpoints/lipnet_epoch_100.pth --mode test --manifest_path machine_learning/data/test_manifest.json
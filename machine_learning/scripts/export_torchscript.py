@@ -0,0 +1,46 @@
+import argparse
+import time
+
+import torch
+
+from src.models.lipnet import LipNet
+from src.models.torchscript import TorchScriptLipNet, export_torchscript
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export LipNet as a frozen TorchScript artifact.")
+    parser.add_argument("--checkpoint", type=str, required=True, help="Path to the LipNet .pth checkpoint file.")
+    parser.add_argument("--output", type=str, default="lipnet_ts.pt", help="Path to save the TorchScript artifact.")
+    parser.add_argument("--channels_last", type=str, default="auto", choices=["auto", "on", "off"],
+                        help="channels_last_3d memory format; auto times both on CPU and keeps the faster one")
+    parser.add_argument("--verify_lengths", type=int, nargs="*", default=[20, 50, 75, 100],
+                        help="Clip lengths to check the artifact against the eager model on (none to skip).")
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    model = LipNet()
+    checkpoint = torch.load(args.checkpoint, map_location="cpu", weights_only=True)
+    if isinstance(checkpoint, dict) and "model_state_dict" in checkpoint:
+        checkpoint = checkpoint["model_state_dict"]
+    model.load_state_dict(checkpoint)
+    model.eval()
+
+    channels_last = {"auto": "auto", "on": True, "off": False}[args.channels_last]
+    result = export_torchscript(model, args.output, channels_last=channels_last)
+    for option, latency in result["latency_ms"].items():
+        print(f"channels_last={option}: {latency:.2f} ms per 75-frame clip")
+    print(f"channels_last_3d: {'on' if result['channels_last'] else 'off'}")
+
+    start = time.perf_counter()
+    scripted = TorchScriptLipNet.load(args.output)
+    print(f"Artifact loads in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for length in args.verify_lengths:
+        x = torch.rand(2, 3, length, 50, 100)
+        with torch.no_grad():
+            diff = (scripted(x) - model(x)).abs().max().item()
+        print(f"T={length:4d}  max abs diff vs eager: {diff:.2e}")
+        assert diff <= args.atol, f"TorchScript output differs from eager by {diff} at T={length}"
+
+    print(f"LipNet TorchScript artifact saved to {args.output}")
+
+# python machine_learning/scripts/export_torchscript.py --checkpoint machine_learning/checkpoints/lipnet_epoch_100.pth --output machine_learning/lipnet_ts.pt
@@ -0,0 +1,47 @@
+import argparse
+
+from src.dataset.BBC_dataset import BBCNewsVideoDataset
+from src.dataset.clip_cache import build_clip_cache
+from src.dataset.mouth_crop import MouthCropper
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Decode and resize every clip once into a memory-mapped cache.")
+    parser.add_argument("--root_dir", type=str, default="machine_learning/data/mvlrs_v1", help="Path to dataset")
+    parser.add_argument("--mode", type=str, default="main", help="Which subdir to cache: pretrain or main")
+    parser.add_argument("--out_dir", type=str, required=True, help="Where to write the shards and index.json")
+    parser.add_argument("--max_frames", type=int, default=75, help="Frames kept per clip")
+    parser.add_argument("--height", type=int, default=50, help="Cached frame height")
+    parser.add_argument("--width", type=int, default=100, help="Cached frame width")
+    parser.add_argument("--shard_size_mb", type=int, default=1024, help="Maximum size of a single shard file")
+    parser.add_argument("--crop_mouth", action="store_true", help="Store mouth crops instead of whole resized frames")
+    parser.add_argument("--detector_path", type=str, default=None,
+                        help="Local YuNet face detection .onnx model or Haar cascade .xml "
+                             "(default: OpenCV's bundled frontal-face cascade)")
+    parser.add_argument("--detect_every", type=int, default=1, help="Run the face detector on every n-th frame")
+    parser.add_argument("--smoothing_window", type=int, default=5, help="Frames the mouth box is averaged over")
+    parser.add_argument("--num_workers", type=int, default=0, help="Processes decoding (and cropping) clips")
+    args = parser.parse_args()
+
+    dataset = BBCNewsVideoDataset(args.root_dir, mode=args.mode, transform=None, max_frames=args.max_frames)
+    print(f"Caching {len(dataset)} clips from {dataset.root_dir}")
+
+    crop = None
+    if args.crop_mouth:
+        crop = MouthCropper(args.detector_path, size=(args.height, args.width), detect_every=args.detect_every,
+                            smoothing_window=args.smoothing_window)
+        crop.detector  # fail fast if the detector model isn't available
+
+    index = build_clip_cache(
+        dataset,
+        args.out_dir,
+        height=args.height,
+        width=args.width,
+        shard_size_mb=args.shard_size_mb,
+        crop=crop,
+        num_workers=args.num_workers
+    )
+    print(f"Wrote {len(index['clips'])} clips in {len(index['shards'])} shards to {args.out_dir}")
+
+# python machine_learning/scripts/preprocess_clips.py --root_dir machine_learning/data/mvlrs_v1 --mode main --out_dir machine_learning/data/cache/main
+# python machine_learning/scripts/preprocess_clips.py --root_dir machine_learning/data/mvlrs_v1 --mode main --out_dir machine_learning/data/cache/main_mouth --crop_mouth --detector_path face_detection_yunet_2023mar.onnx --num_workers 8
+# then: BBCNewsVideoDataset(root_dir, mode='main', cache_dir="machine_learning/data/cache/main")
@@ -0,0 +1,131 @@
+import argparse
+import io
+import json
+import time
+
+import torch
+from torch.utils.data import DataLoader, Subset
+
+from src.dataset.BBC_dataset import BBCNewsVideoDataset, collate_fn_ctc
+from src.dataset.transforms import ClipTransform
+from src.models.lipnet import LipNet
+from src.models.quantization import quantize_lipnet, save_quantized_lipnet
+from src.utils.metrics import compute_accuracy
+
+# name => (dynamic GRU/Linear, static Conv3d)
+VARIANTS = {
+    "fp32": None,
+    "dynamic": (True, False),
+    "static": (False, True),
+    "dynamic+static": (True, True),
+}
+
+
+def model_size_mb(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 2**20
+
+
+def latency_ms(model, num_frames, repeats):
+    x = torch.rand(1, 3, num_frames, 50, 100)
+    with torch.no_grad():
+        model(x)  # warm-up
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(x)
+            timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000.0
+
+
+def evaluate_cer(model, loader):
+    total_distance, total_chars = 0, 0
+    with torch.no_grad():
+        for frames, targets, input_lengths, target_lengths in loader:
+            logits = model(frames.permute(0, 2, 1, 3, 4), input_lengths)
+            _, distances = compute_accuracy(logits, targets, input_lengths, target_lengths, return_details=True)
+            total_distance += sum(distances)
+            total_chars += int(target_lengths.sum())
+    return total_distance / max(total_chars, 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="int8 post-training quantization of LipNet, with a size/latency/CER report.")
+    parser.add_argument("--checkpoint", type=str, required=True, help="fp32 LipNet checkpoint")
+    parser.add_argument("--root_dir", type=str, default="machine_learning/data/mvlrs_v1", help="Path to dataset")
+    parser.add_argument("--mode", type=str, default="main", help="Which subdir to calibrate and evaluate on")
+    parser.add_argument("--manifest_path", type=str, default=None)
+    parser.add_argument("--calibration_clips", type=int, default=256, help="Clips used to calibrate the Conv3d activation ranges")
+    parser.add_argument("--eval_clips", type=int, default=512, help="Held-out clips (disjoint from calibration) for the CER")
+    parser.add_argument("--batch_size", type=int, default=16)
+    parser.add_argument("--num_workers", type=int, default=4)
+    parser.add_argument("--variant", type=str, default="dynamic+static", choices=[v for v in VARIANTS if v != "fp32"],
+                        help="Which quantized model to save")
+    parser.add_argument("--engine", type=str, default="x86", help="Quantized backend: x86, fbgemm or qnnpack (ARM)")
+    parser.add_argument("--threads", type=int, default=1, help="CPU threads for the latency measurement")
+    parser.add_argument("--latency_frames", type=int, default=75)
+    parser.add_argument("--latency_repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out_path", type=str, default="lipnet_int8.pth")
+    parser.add_argument("--report_path", type=str, default="quantization_report.json")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    # Latency and CER of the quantized variants are measured on this engine
+    torch.backends.quantized.engine = args.engine
+
+    model = LipNet()
+    checkpoint = torch.load(args.checkpoint, map_location="cpu", weights_only=True)
+    if isinstance(checkpoint, dict) and "model_state_dict" in checkpoint:
+        checkpoint = checkpoint["model_state_dict"]
+    model.load_state_dict(checkpoint)
+    model.eval()
+
+    # Disjoint random calibration and held-out evaluation clips
+    dataset = BBCNewsVideoDataset(args.root_dir, mode=args.mode, transform=ClipTransform((50, 100)),
+                                  manifest_path=args.manifest_path)
+    order = torch.randperm(len(dataset), generator=torch.Generator().manual_seed(args.seed)).tolist()
+    calibration_set = Subset(dataset, order[:args.calibration_clips])
+    eval_set = Subset(dataset, order[args.calibration_clips:args.calibration_clips + args.eval_clips])
+    calibration_loader = DataLoader(calibration_set, batch_size=args.batch_size, collate_fn=collate_fn_ctc,
+                                    num_workers=args.num_workers)
+    eval_loader = DataLoader(eval_set, batch_size=args.batch_size, collate_fn=collate_fn_ctc,
+                             num_workers=args.num_workers)
+    print(f"Calibrating on {len(calibration_set)} clips, evaluating on {len(eval_set)} held-out clips")
+
+    report = {"checkpoint": args.checkpoint, "engine": args.engine, "threads": args.threads,
+              "latency_frames": args.latency_frames, "eval_clips": len(eval_set), "variants": {}}
+    models = {}
+    for name, settings in VARIANTS.items():
+        if settings is None:
+            models[name] = model
+        else:
+            dynamic, static_stcnn = settings
+            # Streamed from the loader, one batch in memory at a time; (B, T, C, H, W) => (B, C, T, H, W)
+            calibration_batches = (frames.permute(0, 2, 1, 3, 4) for frames, _, _, _ in calibration_loader)
+            models[name] = quantize_lipnet(model, dynamic=dynamic, static_stcnn=static_stcnn,
+                                           calibration_batches=calibration_batches if static_stcnn else None,
+                                           engine=args.engine)
+        report["variants"][name] = {
+            "size_mb": model_size_mb(models[name]),
+            "latency_ms": latency_ms(models[name], args.latency_frames, args.latency_repeats),
+            "cer": evaluate_cer(models[name], eval_loader),
+        }
+
+    baseline = report["variants"]["fp32"]
+    print(f"{'variant':>15} {'size MB':>9} {'latency ms':>11} {'CER':>7} {'dCER':>7}")
+    for name, result in report["variants"].items():
+        result["cer_change"] = result["cer"] - baseline["cer"]
+        result["speedup"] = baseline["latency_ms"] / result["latency_ms"]
+        print(f"{name:>15} {result['size_mb']:9.2f} {result['latency_ms']:11.2f} "
+              f"{result['cer']:7.4f} {result['cer_change']:+7.4f}")
+
+    dynamic, static_stcnn = VARIANTS[args.variant]
+    save_quantized_lipnet(models[args.variant], args.out_path, dynamic=dynamic, static_stcnn=static_stcnn,
+                          engine=args.engine)
+    with open(args.report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {args.variant} model to {args.out_path}, report to {args.report_path}")
+
+# python machine_learning/scripts/quantize_lipnet.py --checkpoint machine_learning/checkpoints/lipnet_epoch_100.pth --calibration_clips 256 --eval_clips 512
@@ -1,25 +1,22 @@
 import argparse
 import torch
-import torchvision.transforms as T
 import cv2
 
+from src.dataset.transforms import ClipTransform, read_clip
 from src.training.inference import run_inference_single
+from src.training.long_form import transcribe_long_video
+from src.utils.char_lm import CharNGramLM
 from src.utils.tokenizer import int_to_text_sequence
 from src.models.lipnet import LipNet
+from src.models.quantization import is_quantized_checkpoint, load_checkpoint, load_quantized_lipnet
+from src.models.torchscript import TorchScriptLipNet
+from src.training.onnx_runtime import GRAPH_OPTIMIZATION_LEVELS, OnnxLipNet
+from src.training.precision import PRECISIONS
 
 def load_video_frames(path, max_frames=75):
-    frames = []
+    # => (T, H, W, 3) uint8 RGB
     cap = cv2.VideoCapture(path)
-    count = 0
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frames.append(frame)
-        count += 1
-        if count >= max_frames:
-            break
+    frames = read_clip(cap, max_frames)
     cap.release()
     return frames
 
@@ -27,27 +24,69 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--video_path", type=str, required=True)
     parser.add_argument("--model_ckpt", type=str, default="checkpoints/lipnet_epoch_1.pth")
+    parser.add_argument("--beam_width", type=int, default=1, help="1 = greedy decoding")
+    parser.add_argument("--lm_path", type=str, default=None, help="Character n-gram LM from scripts/train_char_lm.py")
+    parser.add_argument("--lm_alpha", type=float, default=0.5)
+    parser.add_argument("--backend", type=str, default="torch", choices=["torch", "onnx", "torchscript"],
+                        help="onnx runs --onnx_path (from convert_pth_to_onnx.py) with ONNX Runtime on CPU, "
+                             "torchscript runs --torchscript_path (from export_torchscript.py)")
+    parser.add_argument("--onnx_path", type=str, default="lipnet.onnx")
+    parser.add_argument("--torchscript_path", type=str, default="lipnet_ts.pt")
+    parser.add_argument("--intra_op_threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = default)")
+    parser.add_argument("--inter_op_threads", type=int, default=0, help="ONNX Runtime inter-op threads (0 = default)")
+    parser.add_argument("--precision", type=str, default="fp32", choices=PRECISIONS,
+                        help="Autocast precision for the torch backend (bf16 for CPUs that support it)")
+    parser.add_argument("--graph_optimization_level", type=str, default="all", choices=GRAPH_OPTIMIZATION_LEVELS)
+    parser.add_argument("--long_form", action="store_true",
+                        help="Transcribe the whole video in overlapping chunks with constant memory "
+                             "(greedy decoding) instead of only its first 75 frames")
+    parser.add_argument("--chunk_size", type=int, default=75, help="Frames per chunk for --long_form")
+    parser.add_argument("--chunk_overlap", type=int, default=24, help="Frames shared by consecutive chunks")
     args = parser.parse_args()
+    if args.long_form and (args.beam_width > 1 or args.lm_path):
+        parser.error("--long_form only supports greedy decoding (--beam_width 1, no --lm_path)")
 
     # Load model
-    model = LipNet()
-    model.load_state_dict(torch.load(args.model_ckpt, weights_only=True)["model_state_dict"])
-    model.cuda()
-
-    # Prep frames
-    raw_frames = load_video_frames(args.video_path, max_frames=75)
-    # apply transform:
-    transform = T.Compose([
-        T.ToPILImage(),
-        T.Resize((50,100)),
-        T.ToTensor()
-    ])
-    frames_tensor = [transform(f) for f in raw_frames]
-    frames_tensor = torch.stack(frames_tensor, dim=0)  # => (T, C, H, W)
-
-    # Run inference
-    pred = run_inference_single(model, frames_tensor, idx2char=None, blank_idx=0, device='cuda')
-    print("Prediction:", int_to_text_sequence(pred[0]))
+    if args.backend == "onnx":
+        model = OnnxLipNet(args.onnx_path, intra_op_threads=args.intra_op_threads,
+                           inter_op_threads=args.inter_op_threads,
+                           graph_optimization_level=args.graph_optimization_level)
+        device = 'cpu'
+    elif args.backend == "torchscript":
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        model = TorchScriptLipNet.load(args.torchscript_path, device)
+    else:
+        checkpoint = load_checkpoint(args.model_ckpt)
+        if is_quantized_checkpoint(checkpoint):
+            # int8 model from scripts/quantize_lipnet.py, CPU only
+            model = load_quantized_lipnet(checkpoint)
+            device = 'cpu'
+        else:
+            model = LipNet()
+            model.load_state_dict(checkpoint["model_state_dict"])
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            model.to(device)
+
+    precision = args.precision if args.backend == "torch" else "fp32"
+    if args.long_form:
+        # Streams the video chunk by chunk, so memory doesn't grow with its length
+        pred = transcribe_long_video(model, args.video_path, chunk_size=args.chunk_size, overlap=args.chunk_overlap,
+                                     device=device, precision=precision)
+    else:
+        # Prep frames
+        raw_frames = load_video_frames(args.video_path, max_frames=75)
+        # apply transform:
+        transform = ClipTransform((50, 100))
+        frames_tensor = transform(raw_frames)  # => (T, C, H, W)
+
+        # Run inference
+        lm = CharNGramLM.load(args.lm_path) if args.lm_path else None
+        pred = run_inference_single(model, frames_tensor, idx2char=None, blank_idx=0, device=device,
+                                    beam_width=args.beam_width, lm=lm, lm_alpha=args.lm_alpha,
+                                    precision=precision)[0]
+    print("Prediction:", int_to_text_sequence(pred))
 
 
 # python machine_learning/scripts/run_inference.py --video_path machine_learning/data/mvlrs_v1/main/5535415699068794046/00001.mp4 --model_ckpt machine_learning/checkpoints/lipnet_epoch_100.pth
+# python machine_learning/scripts/run_inference.py --video_path machine_learning/data/mvlrs_v1/main/5535415699068794046/00001.mp4 --backend onnx --onnx_path machine_learning/lipseek_onnx_model.onnx --intra_op_threads 4
+# python machine_learning/scripts/run_inference.py --video_path lecture.mp4 --long_form --chunk_size 75 --chunk_overlap 24
@@ -1,49 +1,114 @@
+import argparse
 import torch
-import torch.nn as nn
 import torch.optim as optim
-import torchvision.transforms as T
 import os
 import wandb
 from dotenv import load_dotenv
 
-from torch.utils.data import DataLoader
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, DistributedSampler, Subset
 
 from src.utils.ctc_loss import Criterion
 from src.dataset.BBC_dataset import BBCNewsVideoDataset, collate_fn_ctc
+from src.dataset.sampler import BucketBatchSampler
+from src.dataset.transforms import ClipTransform
 from src.models.lipnet import LipNet
+from src.training.distributed import cleanup_distributed, init_distributed, launched_with_torchrun
+from src.training.evaluate import make_eval_loader
+from src.training.precision import PRECISIONS
 from src.training.train_loop import train
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--precision", type=str, default="fp32", choices=PRECISIONS,
+                        help="Autocast precision: bf16 on CPUs/GPUs that support it, fp16 (with loss scaling) on CUDA")
+    parser.add_argument("--batch_size", type=int, default=256, help="Clips per forward/backward pass")
+    parser.add_argument("--accumulation_steps", type=int, default=1,
+                        help="Batches accumulated per optimizer step (effective batch = batch_size * accumulation_steps)")
+    parser.add_argument("--checkpoint_activations", action="store_true",
+                        help="Recompute the STCNN conv blocks in backward instead of storing their activations")
+    parser.add_argument("--num_workers", type=int, default=12, help="DataLoader workers per process")
+    parser.add_argument("--checkpoint_dir", type=str, default="machine_learning/checkpoints")
+    parser.add_argument("--keep_last", type=int, default=3, help="Most recent epoch checkpoints kept (0 keeps all)")
+    parser.add_argument("--keep_best", type=int, default=1, help="Lowest-loss checkpoints kept on top of those")
+    parser.add_argument("--resume", type=str, default=None,
+                        help="Checkpoint to resume from, or 'latest' for the newest one in --checkpoint_dir")
+    parser.add_argument("--profile_every", type=int, default=50,
+                        help="Steps between per-phase timings (data wait and throughput are measured every step)")
+    parser.add_argument("--perf_log", type=str, default=None,
+                        help="Append per-epoch throughput summaries to this .csv or .jsonl file")
+    parser.add_argument("--eval_mode", type=str, default=None, help="Held-out subdir evaluated during training (e.g. test)")
+    parser.add_argument("--eval_manifest", type=str, default=None, help="Manifest of the held-out split")
+    parser.add_argument("--eval_max_clips", type=int, default=None, help="Only evaluate the first N held-out clips")
+    parser.add_argument("--eval_every", type=int, default=5, help="Epochs between evaluations")
+    parser.add_argument("--eval_max_batches", type=int, default=50,
+                        help="Held-out batches evaluated per process at each evaluation (0 = the whole split)")
+    parser.add_argument("--dist_backend", type=str, default=None, choices=["nccl", "gloo"],
+                        help="Process group backend under torchrun (default: nccl with CUDA, gloo on CPU)")
+    args = parser.parse_args()
+
     # Load .env file
     load_dotenv()
 
-    # Define model and training parameters
-    model = LipNet()
+    # torchrun sets RANK/WORLD_SIZE: one process per GPU (nccl) or per CPU worker group (gloo)
+    distributed = launched_with_torchrun()
+    if distributed:
+        rank, world_size, device = init_distributed(args.dist_backend)
+    else:
+        rank, world_size = 0, 1
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    main_process = rank == 0
 
-    if torch.cuda.device_count() > 1:
-        print("Using DataParallel on", torch.cuda.device_count(), "GPUs!")
-        model = torch.nn.DataParallel(model)
-    
-    model = model.cuda()
-    ctc_loss = nn.CTCLoss(blank=0, reduction='mean', zero_infinity=True)
-    optimizer = optim.Adam(model.parameters(), lr=1e-4)
+    # Define model and training parameters
+    model = LipNet(checkpoint_stcnn=args.checkpoint_activations)
 
     # Generate DataLoader
     root_dir = "machine_learning/data/mvlrs_v1"
-    transform = T.Compose([
-        T.ToPILImage(),
-        T.Resize((50,100)),  # (H, W)
-        T.ToTensor()
-    ])
+    transform = ClipTransform((50, 100))  # (H, W)
     
     # Set up dataloader
     criterion = Criterion()
-    
-    device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    main_dataset = BBCNewsVideoDataset(root_dir, mode='main', transform=transform)
-    print("Main dataset size:", len(main_dataset))
-    main_loader = DataLoader(main_dataset, batch_size=256, shuffle=True, collate_fn=collate_fn_ctc, num_workers=12)
+    # Built with scripts/build_manifest.py, lets us bucket batches by clip length
+    manifest_path = "machine_learning/data/main_manifest.json"
+    if not os.path.exists(manifest_path):
+        manifest_path = None
+
+    main_dataset = BBCNewsVideoDataset(root_dir, mode='main', transform=transform, manifest_path=manifest_path,
+                                       tokenized=True)
+    if main_process:
+        print("Main dataset size:", len(main_dataset))
+        print(f"Batch size {args.batch_size} x {args.accumulation_steps} accumulation steps x {world_size} processes "
+              f"= effective batch {args.batch_size * args.accumulation_steps * world_size}")
+
+    # Each rank trains on its own shard of the batches
+    clip_lengths = main_dataset.clip_lengths()
+    if clip_lengths is not None:
+        batch_sampler = BucketBatchSampler(clip_lengths, batch_size=args.batch_size, shuffle=True,
+                                           num_replicas=world_size, rank=rank)
+        if main_process:
+            print(f"Bucketed batches, padding ratio: {batch_sampler.padding_ratio():.3f}")
+        main_loader = DataLoader(main_dataset, batch_sampler=batch_sampler, collate_fn=collate_fn_ctc,
+                                 num_workers=args.num_workers)
+    elif distributed:
+        sampler = DistributedSampler(main_dataset, num_replicas=world_size, rank=rank, shuffle=True)
+        main_loader = DataLoader(main_dataset, batch_size=args.batch_size, sampler=sampler, collate_fn=collate_fn_ctc,
+                                 num_workers=args.num_workers)
+    else:
+        main_loader = DataLoader(main_dataset, batch_size=args.batch_size, shuffle=True, collate_fn=collate_fn_ctc,
+                                 num_workers=args.num_workers)
+
+    eval_loader = None
+    if args.eval_mode is not None:
+        # Every rank evaluates its own shard of the batches
+        eval_dataset = BBCNewsVideoDataset(root_dir, mode=args.eval_mode, transform=transform,
+                                           manifest_path=args.eval_manifest)
+        if args.eval_max_clips is not None:
+            eval_dataset = Subset(eval_dataset, range(min(args.eval_max_clips, len(eval_dataset))))
+        eval_loader = make_eval_loader(eval_dataset, batch_size=args.batch_size, num_workers=4,
+                                       num_replicas=world_size, rank=rank)
+        if main_process:
+            print("Eval dataset size:", len(eval_dataset))
 
     # Load Pretrained Parameters if available
     pretrained_dict = {}
@@ -52,10 +117,11 @@ if __name__ == "__main__":
     if os.path.exists(pretrained_path):
         try:
             pretrained_dict = torch.load(pretrained_path)
-            print(f"Loaded pretrained weights from {pretrained_path}")
+            if main_process:
+                print(f"Loaded pretrained weights from {pretrained_path}")
         except Exception as e:
             print(f"Failed to load pretrained weights: {e}")
-    else:
+    elif main_process:
         print(f"No pretrained weights found at {pretrained_path}. Using random initialization.")
 
     model_dict = model.state_dict()
@@ -71,8 +137,16 @@ if __name__ == "__main__":
 
     model.load_state_dict(filtered_dict, strict=False)
 
-    # Init wandb
-    wandb.init(project="LipRead", name="100 Epoch no pretrain", tags=("Main"))
+    # Wrap after loading the weights so the state dict keys have no "module." prefix;
+    # DDP broadcasts rank 0's parameters to the other ranks
+    model = model.to(device)
+    if distributed:
+        model = DistributedDataParallel(model, device_ids=[device.index] if device.type == "cuda" else None)
+    optimizer = optim.Adam(model.parameters(), lr=1e-4)
+
+    # Init wandb, only rank 0 logs
+    if main_process:
+        wandb.init(project="LipRead", name="100 Epoch no pretrain", tags=("Main"))
     
     # Train
     train(
@@ -82,7 +156,24 @@ if __name__ == "__main__":
         criterion=criterion,
         num_epochs=100,
         device=device,
-        log_accuracy=True
+        checkpoint_dir=args.checkpoint_dir,
+        log_accuracy=True,
+        precision=args.precision,
+        accumulation_steps=args.accumulation_steps,
+        keep_last=args.keep_last,
+        keep_best=args.keep_best,
+        resume_from=args.resume,
+        profile_every=args.profile_every,
+        perf_log_path=args.perf_log,
+        eval_dataloader=eval_loader,
+        eval_every=args.eval_every,
+        eval_max_batches=args.eval_max_batches or None
     )
-    
-# python scripts/run_train.py
\ No newline at end of file
+
+    if distributed:
+        cleanup_distributed()
+
+# python scripts/run_train.py --precision bf16 --batch_size 32 --accumulation_steps 8 --checkpoint_activations
+# torchrun --nproc_per_node 4 scripts/run_train.py --dist_backend gloo --batch_size 64
+# python scripts/run_train.py --resume latest --keep_last 3 --keep_best 1 --perf_log machine_learning/checkpoints/perf.csv
+# python scripts/run_train.py --eval_mode test --eval_manifest machine_learning/data/test_manifest.json --eval_every 5 --eval_max_batches 50
\ No newline at end of file
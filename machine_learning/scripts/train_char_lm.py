@@ -0,0 +1,26 @@
+import argparse
+
+from src.dataset.BBC_dataset import BBCNewsVideoDataset
+from src.utils.char_lm import CharNGramLM
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a character n-gram LM on dataset transcripts.")
+    parser.add_argument("--root_dir", type=str, default="machine_learning/data/mvlrs_v1", help="Path to dataset")
+    parser.add_argument("--mode", type=str, default="pretrain", help="Which subdir's transcripts to use")
+    parser.add_argument("--manifest_path", type=str, default=None, help="Optional manifest, avoids reading every .txt")
+    parser.add_argument("--order", type=int, default=4, help="n-gram order")
+    parser.add_argument("--smoothing", type=float, default=0.1, help="Add-k smoothing constant")
+    parser.add_argument("--out_path", type=str, default="char_lm.npz", help="Where to save the LM")
+    args = parser.parse_args()
+
+    dataset = BBCNewsVideoDataset(args.root_dir, mode=args.mode, manifest_path=args.manifest_path)
+    if dataset.transcripts is not None:
+        texts = dataset.transcripts
+    else:
+        texts = [dataset.parse_transcript(txt_path) for _, txt_path in dataset.data]
+
+    lm = CharNGramLM.train(texts, order=args.order, smoothing=args.smoothing)
+    lm.save(args.out_path)
+    print(f"Trained {args.order}-gram LM on {len(texts)} transcripts, saved to {args.out_path}")
+
+# python machine_learning/scripts/train_char_lm.py --mode pretrain --order 4 --out_path machine_learning/char_lm.npz
@@ -4,7 +4,10 @@ import os
 import cv2
 import torch
 from torch.utils.data import Dataset
-from src.utils.tokenizer import text_to_int_sequence
+from src.dataset.clip_cache import ClipCache
+from src.dataset.manifest import load_manifest, parse_transcript
+from src.dataset.transforms import ClipTransform, read_clip
+from src.utils.tokenizer import text_to_int_sequence, tokenizer_fingerprint
     
 class BBCNewsVideoDataset(Dataset):
     """
@@ -18,17 +21,65 @@ class BBCNewsVideoDataset(Dataset):
                  root_dir,        # e.g. "/kaggle/input/my_data"
                  mode='pretrain', # or 'main'
                  transform=None,  # optional transforms on frames
-                 max_frames=75):
+                 max_frames=75,
+                 cache_dir=None,  # optional clip cache built by scripts/preprocess_clips.py
+                 manifest_path=None,  # optional manifest built by scripts/build_manifest.py
+                 tokenized=False):    # return target ids instead of transcript strings
         """
         :param root_dir: path to the folder containing 'pretrain' and 'main' subdirs
         :param mode: which subdir to read from ('pretrain' or 'main')
-        :param transform: optional torchvision transforms for the frames
+        :param transform: optional torchvision transforms for the frames,
+                          or a ClipTransform applied to the whole clip at once
         :param max_frames: if you want to limit frames per clip (just an example)
+        :param cache_dir: if set, serve pre-resized clips from this memory-mapped cache
+                          instead of decoding the mp4 files
+        :param manifest_path: if set, take the clip list and transcripts from this manifest
+                              instead of scanning root_dir and reading every .txt
+        :param tokenized: return each transcript as its list of target ids; taken as is from
+                          the manifest when it was built with the current tokenizer
         """
         super().__init__()
         self.root_dir = os.path.join(root_dir, mode)
+        self.mode = mode
+        self.tokenized = tokenized
         self.transform = transform
         self.max_frames = max_frames
+        self.cache = None
+        self.transcripts = None
+        self.num_frames = None
+        self.target_ids = None
+
+        if cache_dir is not None:
+            # Everything we need is in the cache index, skip the directory scan
+            self.cache = ClipCache(cache_dir)
+            if self.cache.mode is not None and self.cache.mode != mode:
+                raise ValueError(f"Clip cache {cache_dir} holds '{self.cache.mode}' clips, not '{mode}'")
+            if self.cache.root_dir is not None and \
+                    os.path.abspath(self.cache.root_dir) != os.path.abspath(self.root_dir):
+                raise ValueError(f"Clip cache {cache_dir} was built from {self.cache.root_dir}, not {self.root_dir}")
+            if self.cache.crop is not None and getattr(transform, "crop", None) is not None:
+                raise ValueError(f"Clips in {cache_dir} are already cropped ({self.cache.crop}), "
+                                 "use a ClipTransform without crop")
+            self.video_paths = [clip["video_path"] for clip in self.cache.clips]
+            self.data = [(vp, vp.replace('.mp4', '.txt')) for vp in self.video_paths]
+            return
+
+        if manifest_path is not None:
+            manifest = load_manifest(manifest_path)
+            if manifest["mode"] != mode:
+                raise ValueError(f"Manifest {manifest_path} lists '{manifest['mode']}' clips, not '{mode}'")
+            clips = manifest["clips"]
+            self.video_paths = [os.path.join(self.root_dir, clip["video"]) for clip in clips]
+            self.data = [(vp, vp.replace('.mp4', '.txt')) for vp in self.video_paths]
+            self.transcripts = [clip["transcript"] for clip in clips]
+            self.num_frames = [clip["num_frames"] for clip in clips]
+            if tokenized:
+                if manifest.get("tokenizer") == tokenizer_fingerprint():
+                    self.target_ids = [clip["target_ids"] for clip in clips]
+                else:
+                    # Built with another tokenizer, the stored ids are stale
+                    self.target_ids = [text_to_int_sequence(transcript) for transcript in self.transcripts]
+            return
         
         # Gather all mp4 files recursively
         # For example: root_dir/mode/*/*.mp4
@@ -47,24 +98,29 @@ class BBCNewsVideoDataset(Dataset):
                 
     def __len__(self):
         return len(self.data)
+
+    def clip_lengths(self):
+        """
+        Number of frames __getitem__ will return for every clip, without decoding anything.
+        Only known when the dataset was built from a clip cache or a manifest, otherwise None.
+        """
+        if self.cache is not None:
+            lengths = [clip["num_frames"] for clip in self.cache.clips]
+        elif self.num_frames is not None:
+            lengths = self.num_frames
+        else:
+            return None
+
+        if self.max_frames is not None:
+            lengths = [min(n, self.max_frames) for n in lengths]
+        return lengths
     
     def parse_transcript(self, txt_path):
         """
         Reads the .txt file to extract the transcript text after 'Text:' line.
         For your example, we ignore Conf, WORD lines, etc.
         """
-        transcript = ""
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("Text:"):
-                    # Everything after "Text:" is the transcript
-                    transcript = line.replace("Text:", "").strip()
-                    # remove trailing "Conf:" if it's on the same line (some are multiline)
-                    if "Conf:" in transcript:
-                        transcript = transcript.split("Conf:")[0].strip()
-                    break
-        return transcript
+        return parse_transcript(txt_path)
     
     def read_video(self, video_path):
         """
@@ -87,12 +143,61 @@ class BBCNewsVideoDataset(Dataset):
         cap.release()
         return frames
     
+    def read_video_array(self, video_path):
+        """
+        Reads frames from mp4 into a single preallocated (T, H, W, 3) uint8 RGB array.
+        Optionally limit to self.max_frames frames.
+        """
+        cap = cv2.VideoCapture(video_path)
+        clip = read_clip(cap, self.max_frames)
+        cap.release()
+        return clip
+
+    def _target(self, idx, transcript):
+        # Transcript string, or its target ids with tokenized=True
+        if not self.tokenized:
+            return transcript
+        if self.target_ids is not None:
+            return self.target_ids[idx]
+        return text_to_int_sequence(transcript)
+
+    def _get_cached_item(self, idx):
+        """
+        Serves clip idx from the memory-mapped cache. Frames are already resized,
+        so without a transform the uint8 clip is only scaled to [0, 1] floats,
+        matching the Resize + ToTensor pipeline used for training.
+        """
+        clip = torch.from_numpy(self.cache.get_clip(idx, self.max_frames))  # (T, H, W, 3) uint8
+        transcript = self._target(idx, self.cache.clips[idx]["transcript"])
+
+        if isinstance(self.transform, ClipTransform):
+            video_tensor = self.transform(clip)
+        elif self.transform:
+            frames = [self.transform(img) for img in clip.numpy()]
+            video_tensor = torch.stack(frames, dim=0).float()
+        else:
+            video_tensor = clip.permute(0, 3, 1, 2).float().div_(255.0)
+
+        return video_tensor, transcript
+
     def __getitem__(self, idx):
+        if self.cache is not None:
+            return self._get_cached_item(idx)
+
         video_path, txt_path = self.data[idx]
         
-        # Parse transcript
-        transcript = self.parse_transcript(txt_path)
+        # Parse transcript (already parsed, and tokenized, if we were built from a manifest)
+        if self.transcripts is not None:
+            transcript = self.transcripts[idx]
+        else:
+            transcript = self.parse_transcript(txt_path)
+        transcript = self._target(idx, transcript)
         
+        if isinstance(self.transform, ClipTransform):
+            # Whole clip in one buffer, one resize and one float conversion
+            video_tensor = self.transform(self.read_video_array(video_path))
+            return video_tensor, transcript
+
         # Read frames
         frames = self.read_video(video_path)  # list of np arrays, shape (H, W, 3)
         
@@ -110,14 +215,14 @@ class BBCNewsVideoDataset(Dataset):
 
         # Return
         #   video_tensor: shape (T, 3, H, W)
-        #   transcript: a string
+        #   transcript: a string (list of target ids with tokenized=True)
         return video_tensor, transcript
 
 # For padding the videos to have the same number of frames and converting the chars into nums for ctc
 def collate_fn_ctc(batch):
     """
-    batch: list of (frames, transcript_str)
-        1) Convert transcript_str -> numeric
+    batch: list of (frames, transcript_str) or (frames, target ids)
+        1) Convert transcript_str -> numeric (target ids are used as they are)
         2) Pad frames in time dimension
         3) Flatten targets
         4) Return (frames, targets, input_lengths, target_lengths)
@@ -125,37 +230,31 @@ def collate_fn_ctc(batch):
     # Sort by descending frames length
     batch.sort(key=lambda x: x[0].shape[0], reverse=True)
 
-    frames_list, targets_list = [], []
+    targets_list = []
     input_lengths, target_lengths = [], []
-    max_len = 0
 
+    # Convert text -> numeric
     for (video_tensor, txt) in batch:
-        T = video_tensor.shape[0]
-        if T > max_len:
-            max_len = T
-        
-    # Convert text -> numeric, build up final batch
-    for (video_tensor, txt) in batch:
-        frames_list.append(video_tensor)
         input_lengths.append(video_tensor.shape[0])
 
-        numeric_seq = text_to_int_sequence(txt)
+        numeric_seq = txt if isinstance(txt, list) else text_to_int_sequence(txt)
         target_lengths.append(len(numeric_seq))
         targets_list.append(torch.tensor(numeric_seq, dtype=torch.long))
 
-    # Pad frames to max_len
-    padded_frames = []
-    for vid in frames_list:
-        T = vid.shape[0]
+    # Write every clip once into a single preallocated (B, max_len, C, H, W) tensor,
+    # only the padded tail of each clip gets zeroed
+    max_len = input_lengths[0]
+    first = batch[0][0]
+    frames_tensor = torch.empty((len(batch), max_len) + tuple(first.shape[1:]), dtype=first.dtype)
+    for i, (video_tensor, _) in enumerate(batch):
+        T = video_tensor.shape[0]
+        frames_tensor[i, :T].copy_(video_tensor)
         if T < max_len:
-            pad_amt = max_len - T
-            vid = torch.nn.functional.pad(vid, (0,0,0,0,0,0,0,pad_amt))  # pad time dim
-        padded_frames.append(vid)
-    
-    frames_tensor = torch.stack(padded_frames, dim=0)  # => (B, max_len, C, H, W)
+            frames_tensor[i, T:].zero_()  # pad time dim
+
     concat_targets = torch.cat(targets_list, dim=0)
     
     input_lengths = torch.tensor(input_lengths, dtype=torch.long)
     target_lengths = torch.tensor(target_lengths, dtype=torch.long)
     
-    return frames_tensor, concat_targets, input_lengths, target_lengths
\ No newline at end of file
+    return frames_tensor, concat_targets, input_lengths, target_lengths
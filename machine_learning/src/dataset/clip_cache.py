@@ -0,0 +1,194 @@
+import json
+import os
+from multiprocessing import get_context
+
+import numpy as np
+from tqdm import tqdm
+
+from src.dataset.transforms import ClipTransform
+
+INDEX_FILENAME = "index.json"
+SHARD_TEMPLATE = "shard_{:05d}.bin"
+
+
+def resize_clip(clip, height=50, width=100):
+    """
+    Resizes a (T, H, W, 3) uint8 clip to a (T, height, width, 3) uint8 array,
+    using the same resize as ClipTransform so cached and decoded clips match.
+    """
+    resized = ClipTransform((height, width)).resize(clip)  # (T, 3, height, width)
+    return np.ascontiguousarray(resized.permute(0, 2, 3, 1).numpy())
+
+
+def _prepare_clip(dataset, video_path, txt_path, height, width, crop):
+    """
+    Decodes one clip and returns (uint8 (T, height, width, 3) clip, transcript), or None if
+    nothing could be decoded. With crop (e.g. a MouthCropper) the crop replaces the plain resize.
+    """
+    frames = dataset.read_video_array(video_path)
+    if frames.shape[0] == 0:
+        return None
+    if crop is not None:
+        clip = np.ascontiguousarray(crop(frames))
+        if clip.shape[1:3] != (height, width):
+            clip = resize_clip(clip, height, width)
+    else:
+        clip = resize_clip(frames, height, width)
+    return clip, dataset.parse_transcript(txt_path)
+
+
+# Set once per worker process by _init_worker, so the dataset and cropper are pickled once per worker
+_worker_args = None
+
+
+def _init_worker(dataset, height, width, crop):
+    global _worker_args
+    _worker_args = (dataset, height, width, crop)
+
+
+def _prepare_clip_in_worker(paths):
+    dataset, height, width, crop = _worker_args
+    return _prepare_clip(dataset, *paths, height, width, crop)
+
+
+def build_clip_cache(dataset, out_dir, height=50, width=100, shard_size_mb=1024, crop=None, num_workers=0):
+    """
+    Decodes every clip of a BBCNewsVideoDataset once, resizes it to (height, width)
+    and appends it as raw uint8 to sharded binary files in out_dir.
+
+    Writes an index.json next to the shards holding the dataset's root_dir / mode and,
+    for every clip, the shard it lives in, its byte offset, its frame count and its transcript, so the dataset
+    can later serve clips straight from np.memmap views without touching the mp4/txt files.
+
+    :param crop: optional callable turning a (T, H, W, 3) clip into (T, height, width, 3) crops,
+                 e.g. a MouthCropper; recorded in the index as "crop"
+    :param num_workers: decode (and crop) clips in this many processes; the clips are still
+                        written in dataset order by this process
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    shard_size = shard_size_mb * 1024 * 1024
+    frame_bytes = height * width * 3
+
+    shards, clips = [], []
+    shard_file = None
+    shard_offset = 0
+    skipped = 0
+
+    pool = None
+    if num_workers > 0:
+        pool = get_context("spawn").Pool(num_workers, initializer=_init_worker,
+                                         initargs=(dataset, height, width, crop))
+        prepared = pool.imap(_prepare_clip_in_worker, dataset.data, chunksize=4)
+    else:
+        prepared = (_prepare_clip(dataset, video_path, txt_path, height, width, crop)
+                    for video_path, txt_path in dataset.data)
+
+    try:
+        for (video_path, _), result in tqdm(zip(dataset.data, prepared), total=len(dataset.data),
+                                            desc="Caching clips", dynamic_ncols=True):
+            if result is None:
+                # Undecodable clip, nothing to serve
+                skipped += 1
+                continue
+            clip, transcript = result
+
+            # Roll over to a new shard once the current one is full
+            if shard_file is None or shard_offset + clip.nbytes > shard_size:
+                if shard_file is not None:
+                    shard_file.close()
+                shards.append(SHARD_TEMPLATE.format(len(shards)))
+                shard_file = open(os.path.join(out_dir, shards[-1]), "wb")
+                shard_offset = 0
+
+            shard_file.write(clip.tobytes())
+            clips.append({
+                "video_path": video_path,
+                "shard": len(shards) - 1,
+                "offset": shard_offset,
+                "num_frames": clip.shape[0],
+                "transcript": transcript,
+            })
+            shard_offset += clip.shape[0] * frame_bytes
+    finally:
+        if shard_file is not None:
+            shard_file.close()
+        if pool is not None:
+            pool.terminate()
+
+    index = {
+        "root_dir": getattr(dataset, "root_dir", None),
+        "mode": getattr(dataset, "mode", None),
+        "height": height,
+        "width": width,
+        "channels": 3,
+        "max_frames": dataset.max_frames,
+        "crop": type(crop).__name__ if crop is not None else None,
+        "shards": shards,
+        "clips": clips,
+    }
+    # Write the index last so a half-built cache is never picked up
+    with open(os.path.join(out_dir, INDEX_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+
+    if skipped:
+        print(f"Skipped {skipped} clips with no decodable frames")
+    return index
+
+
+class ClipCache:
+    """
+    Read-only view over a cache written by build_clip_cache.
+
+    Shards are memory-mapped lazily (once per process, so it is safe to use from
+    DataLoader workers) and clips are returned as (T, H, W, 3) uint8 views into the
+    mapping, so reading a clip does not copy it.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, INDEX_FILENAME), "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+        # root_dir/mode the clips were read from (None in caches built before they were recorded)
+        self.root_dir = index.get("root_dir")
+        self.mode = index.get("mode")
+        self.height = index["height"]
+        self.width = index["width"]
+        self.channels = index["channels"]
+        self.max_frames = index["max_frames"]
+        # Name of the crop applied when the cache was built (e.g. "MouthCropper"), None for plain resizes
+        self.crop = index.get("crop")
+        self.shard_names = index["shards"]
+        self.clips = index["clips"]
+        self._shards = [None] * len(self.shard_names)
+
+    def __len__(self):
+        return len(self.clips)
+
+    def __getstate__(self):
+        # Never pickle the mappings into worker processes, each worker maps its own
+        state = self.__dict__.copy()
+        state["_shards"] = [None] * len(self.shard_names)
+        return state
+
+    def _get_shard(self, shard_idx):
+        if self._shards[shard_idx] is None:
+            path = os.path.join(self.cache_dir, self.shard_names[shard_idx])
+            # Copy-on-write mapping: pages stay shared with the page cache,
+            # but torch.from_numpy gets a writable array
+            self._shards[shard_idx] = np.memmap(path, dtype=np.uint8, mode="c")
+        return self._shards[shard_idx]
+
+    def get_clip(self, idx, max_frames=None):
+        """
+        Returns clip idx as a (T, H, W, 3) uint8 view, optionally limited to max_frames.
+        """
+        clip = self.clips[idx]
+        num_frames = clip["num_frames"]
+        if max_frames is not None:
+            num_frames = min(num_frames, max_frames)
+
+        frame_bytes = self.height * self.width * self.channels
+        start = clip["offset"]
+        end = start + num_frames * frame_bytes
+        shard = self._get_shard(clip["shard"])
+        return shard[start:end].reshape(num_frames, self.height, self.width, self.channels)
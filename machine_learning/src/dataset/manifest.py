@@ -0,0 +1,134 @@
+import glob
+import json
+import os
+from multiprocessing import Pool
+
+import cv2
+from tqdm import tqdm
+
+from src.utils.tokenizer import text_to_int_sequence, tokenizer_fingerprint
+
+MANIFEST_VERSION = 1
+
+
+def parse_transcript(txt_path):
+    """
+    Reads the .txt file to extract the transcript text after 'Text:' line.
+    Conf, WORD lines, etc. are ignored.
+    """
+    transcript = ""
+    with open(txt_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("Text:"):
+                # Everything after "Text:" is the transcript
+                transcript = line.replace("Text:", "").strip()
+                # remove trailing "Conf:" if it's on the same line (some are multiline)
+                if "Conf:" in transcript:
+                    transcript = transcript.split("Conf:")[0].strip()
+                break
+    return transcript
+
+
+def _file_stamp(path):
+    # (mtime_ns, size) is enough to notice a re-encoded or edited file
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _index_clip(job):
+    """
+    Pool worker: returns the manifest entry for one clip, reusing the previous
+    entry untouched if neither the mp4 nor the txt changed since it was built.
+    """
+    clip_dir, rel_path, previous = job
+    video_path = os.path.join(clip_dir, rel_path)
+    txt_path = video_path.replace('.mp4', '.txt')
+    if not os.path.exists(txt_path):
+        return None
+
+    video_stamp, txt_stamp = _file_stamp(video_path), _file_stamp(txt_path)
+    if previous is not None and previous["video_stamp"] == video_stamp and previous["txt_stamp"] == txt_stamp:
+        return previous
+
+    # Only the container header is read, no frames are decoded
+    cap = cv2.VideoCapture(video_path)
+    num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+
+    transcript = parse_transcript(txt_path)
+    return {
+        "video": rel_path,
+        "video_stamp": video_stamp,
+        "txt_stamp": txt_stamp,
+        "num_frames": num_frames,
+        "width": width,
+        "height": height,
+        "transcript": transcript,
+        "target_ids": text_to_int_sequence(transcript),
+    }
+
+
+def load_manifest(manifest_path):
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version in {manifest_path}: {manifest.get('version')}")
+    return manifest
+
+
+def build_manifest(root_dir, mode, manifest_path, num_workers=None):
+    """
+    Scans root_dir/mode/*/*.mp4 and writes a manifest holding, per clip, the video
+    path (relative to root_dir/mode), frame count, resolution, transcript and its
+    tokenized target ids. The header records the tokenizer's fingerprint; when it
+    changed, the target ids of every clip are rebuilt from the stored transcripts.
+
+    If manifest_path already exists, only clips that were added or whose mp4/txt
+    changed are probed again; clips that disappeared are dropped.
+    Probing runs in a process pool over num_workers processes (default: all cores).
+    """
+    clip_dir = os.path.join(root_dir, mode)
+
+    previous, previous_tokenizer = {}, None
+    if os.path.exists(manifest_path):
+        previous_manifest = load_manifest(manifest_path)
+        previous = {clip["video"]: clip for clip in previous_manifest["clips"]}
+        previous_tokenizer = previous_manifest.get("tokenizer")
+
+    rel_paths = sorted(
+        os.path.relpath(vp, clip_dir) for vp in glob.glob(os.path.join(clip_dir, '*', '*.mp4'))
+    )
+    jobs = [(clip_dir, rel, previous.get(rel)) for rel in rel_paths]
+
+    with Pool(num_workers) as pool:
+        results = list(tqdm(
+            pool.imap(_index_clip, jobs, chunksize=64),
+            total=len(jobs), desc="Indexing clips", dynamic_ncols=True
+        ))
+
+    clips = [clip for clip in results if clip is not None]
+    reused = sum(1 for clip in clips if previous.get(clip["video"]) == clip)
+    fingerprint = tokenizer_fingerprint()
+    if previous_tokenizer != fingerprint:
+        # Reused entries were tokenized with another vocabulary
+        for clip in clips:
+            clip["target_ids"] = text_to_int_sequence(clip["transcript"])
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "mode": mode,
+        "tokenizer": fingerprint,
+        "clips": clips,
+    }
+    # Write to a temp file first so an interrupted refresh keeps the old manifest
+    os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+    print(f"Manifest: {len(clips)} clips ({len(clips) - reused} probed, {reused} unchanged)")
+    return manifest
@@ -0,0 +1,242 @@
+import os
+from collections import deque
+
+import cv2
+import numpy as np
+
+HAAR_FACE_CASCADE = "haarcascade_frontalface_default.xml"
+
+# Mouth box relative to a detected face box: centered horizontally, at 78% of the face
+# height, half the face wide
+MOUTH_CENTER_Y = 0.78
+MOUTH_WIDTH = 0.5
+
+
+class HaarMouthDetector:
+    """
+    Mouth region from OpenCV's bundled frontal-face Haar cascade (cv2.data.haarcascades):
+    the largest face, with the mouth placed by face geometry.
+    Called on a BGR frame, returns (center_x, center_y, width) or None.
+    """
+    def __init__(self, cascade_path=None, scale_factor=1.1, min_neighbors=5):
+        if not hasattr(cv2, "CascadeClassifier"):
+            raise RuntimeError("This OpenCV build has no Haar cascades (moved out of the main package in "
+                               "OpenCV 5); pass a YuNet face detection .onnx model instead")
+        if cascade_path is None:
+            cascade_path = os.path.join(cv2.data.haarcascades, HAAR_FACE_CASCADE)
+        if not os.path.exists(cascade_path):
+            raise FileNotFoundError(f"Haar cascade not found: {cascade_path}")
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def __call__(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        min_size = max(gray.shape) // 5
+        faces = self.cascade.detectMultiScale(gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                                              minSize=(min_size, min_size))
+        if len(faces) == 0:
+            return None
+        x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+        return x + w / 2, y + MOUTH_CENTER_Y * h, MOUTH_WIDTH * w
+
+
+class YuNetMouthDetector:
+    """
+    Mouth region from OpenCV's YuNet face detector (cv2.FaceDetectorYN) and a local
+    face_detection_yunet .onnx model: centered between the two mouth-corner landmarks
+    of the highest-scoring face, half the face wide.
+    Called on a BGR frame, returns (center_x, center_y, width) or None.
+    """
+    def __init__(self, model_path, score_threshold=0.6):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"YuNet model not found: {model_path}")
+        self.model_path = model_path
+        self.score_threshold = score_threshold
+        self._detector = None
+        self._input_size = None
+
+    def __call__(self, frame):
+        input_size = (frame.shape[1], frame.shape[0])
+        if self._detector is None:
+            self._detector = cv2.FaceDetectorYN.create(self.model_path, "", input_size, self.score_threshold)
+        elif input_size != self._input_size:
+            self._detector.setInputSize(input_size)
+        self._input_size = input_size
+
+        _, faces = self._detector.detect(frame)
+        if faces is None or len(faces) == 0:
+            return None
+        # [x, y, w, h, 5 landmarks (x, y): right eye, left eye, nose, right and left mouth corner, score]
+        face = max(faces, key=lambda face: face[14])
+        center_x = (face[10] + face[12]) / 2
+        center_y = (face[11] + face[13]) / 2
+        return center_x, center_y, MOUTH_WIDTH * face[2]
+
+
+def load_mouth_detector(model_path=None):
+    """
+    YuNet for a .onnx model path, otherwise the Haar cascade at model_path
+    (default: OpenCV's bundled frontal-face cascade). Only local files are used.
+    """
+    if model_path is not None and model_path.endswith(".onnx"):
+        return YuNetMouthDetector(model_path)
+    return HaarMouthDetector(model_path)
+
+
+def smooth(values, window):
+    """
+    Centered moving average over time, holding the first / last value at the edges.
+    """
+    if window <= 1 or len(values) < 2:
+        return values
+    padded = np.pad(values, (window // 2, window - 1 - window // 2), mode="edge")
+    return np.convolve(padded, np.ones(window) / window, mode="valid")
+
+
+class MouthCropper:
+    """
+    Crops a (T, H, W, 3) uint8 RGB clip to (T, height, width) mouth crops.
+
+    The mouth is detected every detect_every frames, missed / skipped frames are
+    interpolated from their neighbours and the box (center and width) is smoothed
+    with a moving average over smoothing_window frames, so the crop doesn't jitter.
+    The box keeps the output's aspect ratio (2:1 for 50x100). Clips without any
+    detection fall back to a fixed box relative to the frame: LRS2-style clips are
+    already centered on the face.
+
+    Used by the offline preprocessing (scripts/preprocess_clips.py --crop_mouth) and,
+    through ClipTransform(crop=...), by the dataset and the serving path, so training
+    and inference see the same crops (live streams crop through stream(), which keeps the
+    box state between chunks). Picklable: a detector loaded from detector_path is
+    rebuilt in each process (an injected detector is pickled as is).
+    """
+    def __init__(self, detector_path=None, size=(50, 100), detect_every=1, smoothing_window=5,
+                 fallback=(0.5, 0.72, 0.5), detector=None):
+        """
+        :param detector_path: YuNet .onnx model or Haar cascade .xml (default: OpenCV's bundled face cascade)
+        :param size: output (height, width)
+        :param detect_every: run the detector on every n-th frame only
+        :param smoothing_window: frames averaged when smoothing the box
+        :param fallback: (center x, center y, width) as fractions of the frame width / height
+        :param detector: callable(bgr_frame) -> (center_x, center_y, width) or None,
+                         used instead of loading one from detector_path
+        """
+        self.detector_path = detector_path
+        self.size = tuple(size)
+        self.detect_every = max(1, detect_every)
+        self.smoothing_window = smoothing_window
+        self.fallback = fallback
+        self._detector = detector
+        self._loaded_detector = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_loaded_detector"] = None
+        return state
+
+    @property
+    def detector(self):
+        if self._detector is not None:
+            return self._detector
+        if self._loaded_detector is None:
+            self._loaded_detector = load_mouth_detector(self.detector_path)
+        return self._loaded_detector
+
+    def boxes(self, clip):
+        """
+        Smoothed (T, 3) array of (center_x, center_y, width) mouth boxes for a (T, H, W, 3) RGB clip.
+        """
+        num_frames, height, width = clip.shape[:3]
+        detected_at, detections = [], []
+        for t in range(0, num_frames, self.detect_every):
+            box = self.detector(cv2.cvtColor(clip[t], cv2.COLOR_RGB2BGR))
+            if box is not None:
+                detected_at.append(t)
+                detections.append(box)
+
+        if not detections:
+            cx, cy, w = self.fallback
+            return np.tile([cx * width, cy * height, w * width], (num_frames, 1)).astype(np.float64)
+
+        detections = np.asarray(detections, dtype=np.float64)
+        frames = np.arange(num_frames)
+        boxes = np.stack([np.interp(frames, detected_at, detections[:, i]) for i in range(3)], axis=1)
+        for i in range(3):
+            boxes[:, i] = smooth(boxes[:, i], self.smoothing_window)
+        return boxes
+
+    def crop(self, clip, boxes):
+        """
+        Cuts the given (T, 3) boxes out of a (T, H, W, 3) clip, resized to self.size.
+        Parts of a box outside the frame repeat the border pixels.
+        """
+        out_h, out_w = self.size
+        crops = np.empty((clip.shape[0], out_h, out_w, 3), dtype=np.uint8)
+        for t, (cx, cy, box_w) in enumerate(boxes):
+            scale = out_w / box_w
+            box_h = out_h / scale
+            # Maps the box's top-left corner to (0, 0) and its width to out_w
+            matrix = np.array([[scale, 0.0, -(cx - box_w / 2) * scale],
+                               [0.0, scale, -(cy - box_h / 2) * scale]])
+            cv2.warpAffine(clip[t], matrix, (out_w, out_h), dst=crops[t], flags=cv2.INTER_LINEAR,
+                           borderMode=cv2.BORDER_REPLICATE)
+        return crops
+
+    def stream(self):
+        """
+        New per-stream cropper for frames arriving in chunks (see StreamingMouthCropper).
+        """
+        return StreamingMouthCropper(self)
+
+    def __call__(self, clip):
+        clip = np.asarray(clip)
+        if clip.shape[0] == 0:
+            return np.empty((0,) + self.size + (3,), dtype=np.uint8)
+        return self.crop(clip, self.boxes(clip))
+
+
+class StreamingMouthCropper:
+    """
+    MouthCropper state for one live stream, called on consecutive chunks of its frames.
+
+    Future frames aren't available, so the box is causal: the detector runs on every
+    detect_every-th frame of the stream (whatever the chunk sizes), missed / skipped
+    frames hold the last detection, and the box is a moving average over the last
+    smoothing_window frames, carried across chunks. Frames before the first detection
+    use the fallback box. Same crops as MouthCropper on a steady face; on a moving one
+    the box trails by about smoothing_window / 2 frames.
+    """
+    def __init__(self, cropper):
+        self.cropper = cropper
+        self.size = cropper.size
+        self.reset()
+
+    def reset(self):
+        self._frame_index = 0
+        self._last_detection = None
+        self._recent = deque(maxlen=max(1, self.cropper.smoothing_window))
+
+    def boxes(self, clip):
+        """
+        (T, 3) array of (center_x, center_y, width) mouth boxes for the next (T, H, W, 3) RGB chunk.
+        """
+        num_frames, height, width = clip.shape[:3]
+        cx, cy, w = self.cropper.fallback
+        boxes = np.tile([cx * width, cy * height, w * width], (num_frames, 1)).astype(np.float64)
+        for t in range(num_frames):
+            if (self._frame_index + t) % self.cropper.detect_every == 0:
+                box = self.cropper.detector(cv2.cvtColor(clip[t], cv2.COLOR_RGB2BGR))
+                if box is not None:
+                    self._last_detection = box
+            if self._last_detection is not None:
+                self._recent.append(self._last_detection)
+                boxes[t] = np.mean(self._recent, axis=0)
+        self._frame_index += num_frames
+        return boxes
+
+    def __call__(self, clip):
+        clip = np.asarray(clip)
+        if clip.shape[0] == 0:
+            return np.empty((0,) + self.size + (3,), dtype=np.uint8)
+        return self.cropper.crop(clip, self.boxes(clip))
@@ -0,0 +1,112 @@
+import random
+
+from torch.utils.data import Sampler
+
+
+def padding_ratio(batches, lengths):
+    """
+    Fraction of the padded (batch, max_len) frame grid that is padding, over a list of batches.
+    """
+    total, padded = 0, 0
+    for batch in batches:
+        batch_lengths = [lengths[i] for i in batch]
+        total += sum(batch_lengths)
+        padded += max(batch_lengths) * len(batch_lengths)
+    return 1.0 - total / padded if padded > 0 else 0.0
+
+
+class BucketBatchSampler(Sampler):
+    """
+    Batch sampler that groups clips of similar length so collate_fn_ctc pads less.
+
+    Every epoch the indices are shuffled and cut into pools of batch_size * pool_batches
+    clips; each pool is sorted by length and split into batches, and the batches are
+    shuffled again. Batches keep the randomness of a shuffled loader while only mixing
+    clips of similar length.
+
+    Use as DataLoader(dataset, batch_sampler=BucketBatchSampler(dataset.clip_lengths(), 256), ...).
+    For distributed training every rank builds the same batches (same seed and epoch)
+    and keeps every num_replicas-th one, like DistributedSampler does for indices.
+    """
+    def __init__(self, lengths, batch_size, pool_batches=50, shuffle=True, drop_last=False, seed=0,
+                 num_replicas=1, rank=0):
+        """
+        :param lengths: clip length (frames) for every dataset index
+        :param batch_size: clips per batch
+        :param pool_batches: how many batches worth of clips are sorted together,
+                             larger pools pad less but are less random
+        :param shuffle: if False, batches are built over the whole dataset sorted by length
+        :param drop_last: drop the last incomplete batch of every pool
+        :param seed: base seed, combined with the epoch set through set_epoch
+        :param num_replicas: number of distributed processes sharing the batches
+        :param rank: this process' rank; batches are padded by repeating the first ones
+                     so every rank gets the same number of batches
+        """
+        if not 0 <= rank < num_replicas:
+            raise ValueError(f"rank must be in [0, {num_replicas}), got {rank}")
+        self.lengths = list(lengths)
+        self.batch_size = batch_size
+        self.pool_size = batch_size * pool_batches
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _make_batches(self):
+        indices = list(range(len(self.lengths)))
+        if not self.shuffle:
+            indices.sort(key=lambda i: self.lengths[i], reverse=True)
+            pools = [indices]
+        else:
+            rng = random.Random(self.seed + self.epoch)
+            rng.shuffle(indices)
+            pools = [indices[i:i + self.pool_size] for i in range(0, len(indices), self.pool_size)]
+
+        batches = []
+        for pool in pools:
+            pool = sorted(pool, key=lambda i: self.lengths[i], reverse=True)
+            for i in range(0, len(pool), self.batch_size):
+                batch = pool[i:i + self.batch_size]
+                if self.drop_last and len(batch) < self.batch_size:
+                    continue
+                batches.append(batch)
+
+        if self.shuffle:
+            rng.shuffle(batches)
+        return batches
+
+    def _rank_batches(self):
+        batches = self._make_batches()
+        if self.num_replicas == 1:
+            return batches
+        padded_len = -(-len(batches) // self.num_replicas) * self.num_replicas
+        batches += batches[:padded_len - len(batches)]
+        return batches[self.rank::self.num_replicas]
+
+    def padding_ratio(self):
+        """
+        Padding fraction of the current epoch's batches (1 - real frames / padded frames).
+        """
+        return padding_ratio(self._rank_batches(), self.lengths)
+
+    def __iter__(self):
+        return iter(self._rank_batches())
+
+    def __len__(self):
+        return -(-self._num_batches() // self.num_replicas)
+
+    def _num_batches(self):
+        if not self.shuffle:
+            n = len(self.lengths)
+            return n // self.batch_size if self.drop_last else -(-n // self.batch_size)
+
+        num_batches = 0
+        for start in range(0, len(self.lengths), self.pool_size):
+            n = min(self.pool_size, len(self.lengths) - start)
+            num_batches += n // self.batch_size if self.drop_last else -(-n // self.batch_size)
+        return num_batches
@@ -0,0 +1,77 @@
+import cv2
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+class ClipTransform:
+    """
+    Whole-clip replacement for T.Compose([ToPILImage(), Resize(size), ToTensor()]).
+
+    Takes a (T, H, W, C) uint8 clip (numpy array or tensor) and returns a
+    (T, C, height, width) float tensor in [0, 1]. The resize runs once over the whole
+    clip on uint8 data (antialiased bilinear, within 1/255 of PIL's Resize), followed
+    by a single conversion to float.
+
+    The permuted (T, C, H, W) view of a (T, H, W, C) clip is channels-last in memory,
+    which is what torch's uint8 antialiased resize kernel is vectorized for.
+    """
+    def __init__(self, size=(50, 100), crop=None):
+        """
+        :param size: output (height, width)
+        :param crop: optional callable run on the (T, H, W, C) uint8 clip before the resize,
+                     e.g. a MouthCropper; its output is resized to size (a no-op if it matches)
+        """
+        self.size = tuple(size)
+        self.crop = crop
+
+    def resize(self, clip):
+        """
+        Resizes a (T, H, W, C) uint8 clip to a (T, C, height, width) uint8 tensor.
+        """
+        if self.crop is not None:
+            clip = self.crop(clip)
+        clip = torch.as_tensor(clip).permute(0, 3, 1, 2)  # (T, C, H, W) view
+        if tuple(clip.shape[-2:]) == self.size:
+            return clip
+        return F.interpolate(clip, size=self.size, mode='bilinear', antialias=True, align_corners=False)
+
+    def __call__(self, clip):
+        return self.resize(clip).float().div_(255.0)
+
+
+def read_clip(cap, max_frames=None):
+    """
+    Decodes frames from an opened cv2.VideoCapture straight into a preallocated
+    (T, H, W, 3) uint8 RGB array, sized from the capture's frame count.
+    Falls back to growing the array if the container under-reports its frame count.
+    """
+    num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    if max_frames is not None:
+        num_frames = min(num_frames, max_frames)
+
+    clip = np.empty((max(num_frames, 1), height, width, 3), dtype=np.uint8)
+    scratch = None
+    count = 0
+    while max_frames is None or count < max_frames:
+        if count < clip.shape[0]:
+            frame = clip[count]
+        else:
+            # Buffer full: the next read is usually just EOF, so probe into a scratch frame
+            # and only grow the buffer once a frame was actually decoded
+            if scratch is None:
+                scratch = np.empty(clip.shape[1:], dtype=np.uint8)
+            frame = scratch
+        ret, _ = cap.read(frame)
+        if not ret:
+            break
+        if frame is scratch:
+            # Frame count was an underestimate, double the buffer
+            clip = np.concatenate([clip, np.empty_like(clip)], axis=0)
+            clip[count] = scratch
+        # Convert BGR -> RGB in place
+        cv2.cvtColor(clip[count], cv2.COLOR_BGR2RGB, dst=clip[count])
+        count += 1
+    return clip[:count]
@@ -1,14 +1,20 @@
+import torch
 import torch.nn as nn
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
 from .stcnn import STCNN
 
 class LipNet(nn.Module):
     """
     Full lipreading model: STCNN + BiGRU + FC, trained with CTC.
     """
-    def __init__(self, output_size=28, hidden_size=256, num_layers=2):
+    def __init__(self, output_size=28, hidden_size=256, num_layers=2, checkpoint_stcnn=False):
+        """
+        checkpoint_stcnn: activation checkpointing for each STCNN conv block during training,
+                          trading one extra STCNN forward per step for much lower peak memory
+        """
         super(LipNet, self).__init__()
         # Use STCNN as the feature extractor
-        self.stcnn = STCNN()
+        self.stcnn = STCNN(checkpoint_blocks=checkpoint_stcnn)
 
         self.gru_hidden_size = hidden_size
         self.num_layers = num_layers
@@ -25,17 +31,54 @@ class LipNet(nn.Module):
         # final linear layer
         self.fc = nn.Linear(hidden_size * 2, output_size)
 
-    def forward(self, x):
+    def forward(self, x, lengths=None):
         """
         x: shape (batch, 3, T, H, W)
+        lengths: optional (batch,) number of valid frames per clip of a padded batch
         returns: (batch, T, output_size)
         """
         # 1) stcnn => (batch, T, feature_dim)
         feats = self.stcnn(x)  # => shape (B, T, 1728)
 
+        return self.forward_sequence(feats, lengths)
+
+    def forward_sequence(self, feats, lengths=None):
+        """
+        Runs the BiGRU + FC head on precomputed STCNN features,
+        e.g. features cached by streaming inference.
+        feats: shape (batch, T, feature_dim)
+        lengths: optional (batch,) valid lengths; padding is then packed away so the
+                 backward GRU direction starts at each clip's real last frame
+        returns: (batch, T, output_size)
+        """
         # 2) BiGRU => shape (B, T, 2*hidden_size)
-        out, _ = self.gru(feats)
+        if lengths is not None:
+            packed = pack_padded_sequence(feats, lengths.cpu(), batch_first=True, enforce_sorted=False)
+            out, _ = self.gru(packed)
+            out, _ = pad_packed_sequence(out, batch_first=True, total_length=feats.size(1))
+        else:
+            out, _ = self.gru(feats)
 
         # 3) final projection
         logits = self.fc(out)  # => (B, T, output_size)
-        return logits
\ No newline at end of file
+        return logits
+
+
+def forward_by_length(forward, x, lengths):
+    """
+    Runs forward(clips) -> (b, t, vocab_size) separately on each group of equal-length
+    clips of a padded batch, without their padding. For exported models (ONNX, TorchScript)
+    that can't pack sequences; the result matches running each clip on its own.
+    x: (batch, 3, T, H, W)
+    lengths: (batch,) valid frames per clip
+    returns: (batch, T, vocab_size), zero past each clip's length
+    """
+    lengths = torch.as_tensor(lengths).cpu()
+    logits = None
+    for length in lengths.unique().tolist():
+        rows = (lengths == length).nonzero().flatten()
+        group = forward(x[rows.to(x.device), :, :length])
+        if logits is None:
+            logits = group.new_zeros((x.shape[0], x.shape[2], group.shape[2]))
+        logits[rows.to(logits.device), :length] = group
+    return logits
@@ -0,0 +1,134 @@
+import copy
+import warnings
+from contextlib import contextmanager
+
+import torch
+import torch.nn as nn
+import torch.ao.quantization as tq
+
+from .lipnet import LipNet
+
+
+class QuantizableSTCNN(nn.Module):
+    """
+    STCNN rewired for eager-mode static quantization: quant/dequant stubs around the
+    conv stack and ReLU as modules so each Conv3d + ReLU can be fused. Dropout is left
+    out (inference only). Same input and output as STCNN.
+    """
+    def __init__(self, stcnn):
+        super(QuantizableSTCNN, self).__init__()
+        self.feature_dim = stcnn.feature_dim
+        self.temporal_context = stcnn.temporal_context
+
+        self.quant = tq.QuantStub()
+        self.conv1, self.relu1, self.pool1 = stcnn.conv1, nn.ReLU(), stcnn.pool1
+        self.conv2, self.relu2, self.pool2 = stcnn.conv2, nn.ReLU(), stcnn.pool2
+        self.conv3, self.relu3, self.pool3 = stcnn.conv3, nn.ReLU(), stcnn.pool3
+        self.dequant = tq.DeQuantStub()
+
+    def fuse(self):
+        tq.fuse_modules(self, [["conv1", "relu1"], ["conv2", "relu2"], ["conv3", "relu3"]], inplace=True)
+
+    def forward(self, x):
+        """
+        x shape: (batch, channels=3, frames, height=50, width=100)
+        returns shape: (batch, T, self.feature_dim)
+        """
+        x = self.quant(x)
+        x = self.pool1(self.relu1(self.conv1(x)))
+        x = self.pool2(self.relu2(self.conv2(x)))
+        x = self.pool3(self.relu3(self.conv3(x)))
+        x = self.dequant(x)
+
+        b, c, t, h, w = x.shape
+        return x.permute(0, 2, 1, 3, 4).reshape(b, t, self.feature_dim)
+
+
+@contextmanager
+def quantized_engine(engine):
+    """
+    Sets torch.backends.quantized.engine for the block and restores the previous engine after.
+    """
+    previous = torch.backends.quantized.engine
+    torch.backends.quantized.engine = engine
+    try:
+        yield
+    finally:
+        torch.backends.quantized.engine = previous
+
+
+def quantize_lipnet(model, dynamic=True, static_stcnn=True, calibration_batches=None, engine="x86"):
+    """
+    int8 post-training quantization of a LipNet for CPU inference. Returns a quantized
+    copy in eval mode; the original model is left untouched.
+
+    :param dynamic: dynamic int8 quantization of the BiGRU and the FC layer
+                    (int8 weights, activations quantized on the fly)
+    :param static_stcnn: static int8 quantization of the Conv3d stack, with activation
+                         ranges calibrated on calibration_batches
+    :param calibration_batches: iterable of (B, 3, T, H, W) float inputs, iterated once (a generator
+                                keeps just one batch in memory); without it the
+                                quantized layout is built with placeholder ranges, which
+                                is what loading a saved quantized state dict needs
+    :param engine: quantized backend ("x86", "fbgemm" or "qnnpack" for ARM)
+    """
+    model = copy.deepcopy(model).cpu().eval()
+
+    # The process-wide engine is only switched while quantizing
+    with quantized_engine(engine):
+        if static_stcnn:
+            stcnn = QuantizableSTCNN(model.stcnn).eval()
+            stcnn.fuse()
+            stcnn.qconfig = tq.get_default_qconfig(engine)
+            tq.prepare(stcnn, inplace=True)
+            if calibration_batches is not None:
+                with torch.no_grad():
+                    for x in calibration_batches:
+                        stcnn(x)
+            with warnings.catch_warnings():
+                # Observers that saw no data warn; their ranges are overwritten on load
+                warnings.simplefilter("ignore")
+                tq.convert(stcnn, inplace=True)
+            model.stcnn = stcnn
+
+        if dynamic:
+            model = tq.quantize_dynamic(model, {nn.GRU, nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def save_quantized_lipnet(model, path, dynamic=True, static_stcnn=True, engine="x86", **extra):
+    """
+    Saves a quantize_lipnet() model with the settings needed to rebuild its layout on load.
+    """
+    torch.save({
+        "quantization": {"dynamic": dynamic, "static_stcnn": static_stcnn, "engine": engine},
+        "model_state_dict": model.state_dict(),
+        **extra
+    }, path)
+
+
+def load_checkpoint(path, mmap=False):
+    """
+    torch.load with weights_only=True that also accepts quantized checkpoints,
+    whose packed int8 weights are stored as torch.ScriptObjects.
+    """
+    with torch.serialization.safe_globals([torch.ScriptObject]):
+        return torch.load(path, map_location="cpu", weights_only=True, mmap=mmap)
+
+
+def is_quantized_checkpoint(checkpoint):
+    return isinstance(checkpoint, dict) and "quantization" in checkpoint
+
+
+def load_quantized_lipnet(checkpoint):
+    """
+    Rebuilds a quantized LipNet from save_quantized_lipnet() output (path or loaded dict).
+    Quantized models run on CPU only, with the quantized engine they were built for, so
+    loading one makes that engine the process's torch.backends.quantized.engine.
+    """
+    if not isinstance(checkpoint, dict):
+        checkpoint = load_checkpoint(checkpoint)
+    torch.backends.quantized.engine = checkpoint["quantization"]["engine"]
+    model = quantize_lipnet(LipNet(), **checkpoint["quantization"])
+    model.load_state_dict(checkpoint["model_state_dict"])
+    return model.eval()
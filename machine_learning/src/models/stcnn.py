@@ -1,5 +1,7 @@
+import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from torch.utils.checkpoint import checkpoint
 
 class STCNN(nn.Module):
     """
@@ -11,9 +13,14 @@ class STCNN(nn.Module):
                  img_w=100,
                  img_h=50,
                  frames_n=75,
+                 checkpoint_blocks=False,
                  ):
         super(STCNN, self).__init__()
 
+        # Recompute each conv block's activations in backward instead of keeping them
+        # (the 5-D conv outputs dominate training memory); see forward()
+        self.checkpoint_blocks = checkpoint_blocks
+
         # 3D Conv block #1
         self.conv1 = nn.Conv3d(in_channels=img_c,
                                out_channels=32,
@@ -53,28 +60,48 @@ class STCNN(nn.Module):
         # => flattened per frame => 96*3*6 = 1728
         self.feature_dim = 96*3*6 
 
-    def forward(self, x):
-        """
-        x shape: (batch, channels=3, frames=75, height=50, width=100)
-        returns shape: (batch, T, self.feature_dim)
-        """
-        # (1) 3D conv/pool #1
+        # Each conv sees 1 frame on either side in time (kernel 3, padding 1),
+        # so an output frame depends on 3 input frames on each side
+        self.temporal_context = 3
+
+    def _block1(self, x):
         x = self.conv1(x)  # => (batch, 32, frames, H/2, W/2)
         x = F.relu(x)
         x = self.pool1(x)  # => (batch, 32, frames, H/4, W/4)
-        x = self.drop1(x)
-        
-        # (2) 3D conv/pool #2
+        return self.drop1(x)
+
+    def _block2(self, x):
         x = self.conv2(x)  # => (batch, 64, frames, H/4, W/4)
         x = F.relu(x)
         x = self.pool2(x)  # => (batch, 64, frames, H/8, W/8)
-        x = self.drop2(x)
-        
-        # (3) 3D conv/pool #3
+        return self.drop2(x)
+
+    def _block3(self, x):
         x = self.conv3(x)  # => (batch, 96, frames, H/8, W/8)
         x = F.relu(x)
         x = self.pool3(x)  # => (batch, 96, frames, H/16, W/16)
-        x = self.drop3(x)
+        return self.drop3(x)
+
+    def _run_block(self, block, x):
+        # Only the block's input is kept for backward; conv/relu/pool outputs are recomputed.
+        # The RNG state is restored for the recompute, so dropout masks match.
+        if self.checkpoint_blocks and self.training and torch.is_grad_enabled():
+            return checkpoint(block, x, use_reentrant=False)
+        return block(x)
+
+    def forward(self, x):
+        """
+        x shape: (batch, channels=3, frames=75, height=50, width=100)
+        returns shape: (batch, T, self.feature_dim)
+        """
+        # (1) 3D conv/pool #1 => (batch, 32, frames, H/4, W/4)
+        x = self._run_block(self._block1, x)
+
+        # (2) 3D conv/pool #2 => (batch, 64, frames, H/8, W/8)
+        x = self._run_block(self._block2, x)
+
+        # (3) 3D conv/pool #3 => (batch, 96, frames, H/16, W/16)
+        x = self._run_block(self._block3, x)
 
         # Now flatten the spatial dims but keep the time dim
         # x shape => (batch, 96, T, 3, 6)
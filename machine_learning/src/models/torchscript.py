@@ -0,0 +1,103 @@
+import copy
+import json
+import time
+
+import torch
+import torch.nn as nn
+
+from .lipnet import forward_by_length
+
+METADATA_FILE = "lipnet.json"
+
+
+def _strip_dropout(module):
+    for name, child in module.named_children():
+        if isinstance(child, nn.Dropout):
+            setattr(module, name, nn.Identity())
+        else:
+            _strip_dropout(child)
+    return module
+
+
+def _trace(model, channels_last, example_frames, height, width):
+    model = copy.deepcopy(model)
+    x = torch.rand(1, 3, example_frames, height, width)
+    if channels_last:
+        model = model.to(memory_format=torch.channels_last_3d)
+        x = x.to(memory_format=torch.channels_last_3d)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, (x,), check_trace=False)
+    return torch.jit.freeze(traced)
+
+
+def _latency_ms(module, channels_last, num_frames, height, width, repeats=5):
+    module = TorchScriptLipNet(module, channels_last, device="cpu")
+    x = torch.rand(1, 3, num_frames, height, width)
+    module(x)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        module(x)
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def export_torchscript(model, output_path, channels_last="auto", example_frames=75, height=50, width=100):
+    """
+    Traces LipNet (without the lengths argument) into a frozen, self-contained TorchScript
+    artifact: Dropout is stripped, weights are inlined as constants and the graph no longer
+    needs the Python model classes to load. The time and batch axes stay dynamic.
+
+    :param channels_last: True/False to force the channels_last_3d memory format, or "auto"
+                          to time both on CPU and keep the faster one
+    Returns the memory format decision and the CPU latencies measured for "auto".
+    """
+    model = _strip_dropout(copy.deepcopy(model).cpu().eval())
+
+    latencies = {}
+    if channels_last == "auto":
+        for option in (False, True):
+            latencies[option] = _latency_ms(_trace(model, option, example_frames, height, width),
+                                            option, example_frames, height, width)
+        channels_last = min(latencies, key=latencies.get)
+
+    frozen = _trace(model, channels_last, example_frames, height, width)
+    metadata = {"channels_last": bool(channels_last), "height": height, "width": width}
+    torch.jit.save(frozen, output_path, _extra_files={METADATA_FILE: json.dumps(metadata)})
+    return {"channels_last": bool(channels_last), "latency_ms": {str(k): v for k, v in latencies.items()}}
+
+
+class TorchScriptLipNet:
+    """
+    A LipNet artifact written by export_torchscript(). Called like the PyTorch model:
+    (B, 3, T, H, W) input, optional lengths, (B, T, vocab_size) logits out.
+    On CPU the frozen graph is further optimized for inference at load time
+    (oneDNN convolutions with constant prepacked weights), which can't be serialized.
+    """
+    def __init__(self, module, channels_last=False, device="cpu"):
+        self.channels_last = channels_last
+        self.device = device
+        if device == "cpu":
+            module = torch.jit.optimize_for_inference(module)
+        self.module = module
+
+    @classmethod
+    def load(cls, path, device="cpu"):
+        extra_files = {METADATA_FILE: ""}
+        module = torch.jit.load(path, map_location=device, _extra_files=extra_files)
+        metadata = json.loads(extra_files[METADATA_FILE] or "{}")
+        return cls(module, metadata.get("channels_last", False), str(device))
+
+    def eval(self):
+        # Inference only; lets TorchScriptLipNet stand in for LipNet in run_inference_single
+        return self
+
+    def _forward(self, x):
+        if self.channels_last:
+            x = x.contiguous(memory_format=torch.channels_last_3d)
+        return self.module(x)
+
+    @torch.no_grad()
+    def __call__(self, x, lengths=None):
+        x = x.to(self.device)
+        if lengths is None:
+            return self._forward(x)
+        return forward_by_length(self._forward, x, lengths)
@@ -0,0 +1,158 @@
+import json
+import os
+import queue
+import random
+import threading
+
+import numpy as np
+import torch
+
+INDEX_FILE = "checkpoints.json"
+
+
+def _read_index(checkpoint_dir):
+    path = os.path.join(checkpoint_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {int(epoch): metric for epoch, metric in json.load(f).items()}
+
+
+def latest_checkpoint(checkpoint_dir, prefix="lipnet_epoch_"):
+    """
+    Path of the most recent checkpoint an AsyncCheckpointer wrote to checkpoint_dir, or None.
+    """
+    index = _read_index(checkpoint_dir)
+    return os.path.join(checkpoint_dir, f"{prefix}{max(index)}.pth") if index else None
+
+
+def snapshot_state(state):
+    """
+    Copy of a (nested) state dict with every tensor copied to CPU, so it can be written
+    to disk while training keeps updating the live tensors.
+    """
+    if isinstance(state, torch.Tensor):
+        return state.detach().to("cpu", copy=True)
+    if isinstance(state, dict):
+        return {k: snapshot_state(v) for k, v in state.items()}
+    if isinstance(state, (list, tuple)):
+        return type(state)(snapshot_state(v) for v in state)
+    return state
+
+
+def get_rng_state():
+    # numpy's key array is stored as a list so the checkpoint still loads with weights_only=True
+    np_state = np.random.get_state()
+    return {
+        "python": random.getstate(),
+        "numpy": (np_state[0], np_state[1].tolist(), *np_state[2:]),
+        "torch": torch.get_rng_state(),
+        "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else [],
+    }
+
+
+def set_rng_state(state):
+    random.setstate(state["python"])
+    name, keys, *rest = state["numpy"]
+    np.random.set_state((name, np.array(keys, dtype=np.uint32), *rest))
+    torch.set_rng_state(state["torch"])
+    if state["cuda"] and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+
+class AsyncCheckpointer:
+    """
+    Writes checkpoints from a background thread with a keep-last-N / keep-best retention policy.
+
+    save() takes a CPU snapshot of the state (the only part that blocks training) and hands
+    it to the writer thread, which writes to a temporary file, renames it into place and
+    deletes the checkpoints that fall out of the policy. At most one snapshot waits behind the
+    one being written, so a slow disk throttles training instead of piling up copies in memory.
+
+    The saved epochs and their metrics are tracked in checkpoints.json next to the checkpoints,
+    so retention and latest() keep working across restarts.
+    """
+    def __init__(self, checkpoint_dir, keep_last=3, keep_best=1, prefix="lipnet_epoch_"):
+        """
+        :param keep_last: most recent checkpoints kept (0 keeps all)
+        :param keep_best: checkpoints with the lowest metric kept on top of those
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.prefix = prefix
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        self._index_path = os.path.join(checkpoint_dir, INDEX_FILE)
+        self._index = _read_index(checkpoint_dir)
+
+        self._queue = queue.Queue(maxsize=1)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def path(self, epoch):
+        return os.path.join(self.checkpoint_dir, f"{self.prefix}{epoch}.pth")
+
+    def save(self, epoch, state, metric=None):
+        """
+        Snapshots state to CPU and queues it to be written as <prefix><epoch>.pth.
+        metric: lower is better, used by keep_best (e.g. the epoch's average loss)
+        """
+        self._raise_error()
+        self._queue.put((epoch, snapshot_state(state), metric))
+
+    def wait(self):
+        """
+        Blocks until every queued checkpoint is on disk; re-raises a failed write.
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Writing a checkpoint failed") from error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, epoch, state, metric):
+        path = self.path(epoch)
+        tmp_path = path + ".tmp"
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, path)
+
+        self._index[epoch] = metric
+        for old_epoch in self._expired():
+            del self._index[old_epoch]
+            if os.path.exists(self.path(old_epoch)):
+                os.remove(self.path(old_epoch))
+
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _expired(self):
+        if self.keep_last <= 0:
+            return []
+        epochs = sorted(self._index)
+        keep = set(epochs[-self.keep_last:])
+        scored = [epoch for epoch in epochs if self._index[epoch] is not None]
+        keep.update(sorted(scored, key=self._index.get)[:self.keep_best])
+        return [epoch for epoch in epochs if epoch not in keep]
@@ -0,0 +1,83 @@
+import os
+
+import torch
+import torch.distributed as dist
+
+
+def is_distributed():
+    return dist.is_available() and dist.is_initialized()
+
+
+def get_rank():
+    return dist.get_rank() if is_distributed() else 0
+
+
+def get_world_size():
+    return dist.get_world_size() if is_distributed() else 1
+
+
+def is_main_process():
+    # Rank 0 saves checkpoints and logs to wandb
+    return get_rank() == 0
+
+
+def launched_with_torchrun():
+    return "WORLD_SIZE" in os.environ and "RANK" in os.environ
+
+
+def init_distributed(backend=None):
+    """
+    Joins the process group set up by torchrun (RANK, WORLD_SIZE, LOCAL_RANK, MASTER_ADDR/PORT
+    environment variables) and picks this process' device.
+
+    :param backend: "nccl" (one GPU per process) or "gloo" (CPU-only machines);
+                    defaults to nccl when CUDA is available
+    returns: (rank, world_size, device)
+    """
+    if backend is None:
+        backend = "nccl" if torch.cuda.is_available() else "gloo"
+    local_rank = int(os.environ.get("LOCAL_RANK", 0))
+
+    if backend == "nccl":
+        torch.cuda.set_device(local_rank)
+        device = torch.device("cuda", local_rank)
+    else:
+        device = torch.device("cpu")
+
+    dist.init_process_group(backend=backend)
+    return dist.get_rank(), dist.get_world_size(), device
+
+
+def cleanup_distributed():
+    if is_distributed():
+        dist.destroy_process_group()
+
+
+def unwrap_model(model):
+    """
+    The LipNet inside a DistributedDataParallel / DataParallel wrapper, so checkpoints
+    are saved without the "module." prefix.
+    """
+    return model.module if hasattr(model, "module") else model
+
+
+def all_reduce_sum(*values, device="cpu"):
+    """
+    Sums python numbers over all ranks (returns them unchanged outside distributed training).
+    """
+    if not is_distributed():
+        return values
+    tensor = torch.tensor(values, dtype=torch.float64, device=device)
+    dist.all_reduce(tensor)
+    return tuple(tensor.tolist())
+
+
+def all_gather_objects(obj):
+    """
+    Picklable object from every rank, in rank order ([obj] outside distributed training).
+    """
+    if not is_distributed():
+        return [obj]
+    gathered = [None] * get_world_size()
+    dist.all_gather_object(gathered, obj)
+    return gathered
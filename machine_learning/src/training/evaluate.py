@@ -0,0 +1,173 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+import torch
+from torch.utils.data import DataLoader, Dataset, Subset
+from tqdm import tqdm
+
+from src.dataset.BBC_dataset import collate_fn_ctc
+from src.dataset.sampler import BucketBatchSampler
+from src.training.distributed import all_gather_objects, is_main_process, unwrap_model
+from src.training.precision import autocast
+from src.utils.ctc_beam_search import ctc_prefix_beam_search
+from src.utils.ctc_decode import greedy_decode_ctc
+from src.utils.metrics import error_rates
+from src.utils.tokenizer import int_to_text_sequence
+
+
+class _IndexedDataset(Dataset):
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, idx):
+        frames, transcript = self.dataset[idx]
+        return frames, transcript, idx
+
+
+def _collate_with_indices(batch):
+    # Same (stable) length sort as collate_fn_ctc, so the indices line up with its output
+    batch.sort(key=lambda x: x[0].shape[0], reverse=True)
+    indices = torch.tensor([idx for _, _, idx in batch], dtype=torch.long)
+    return (*collate_fn_ctc([(frames, transcript) for frames, transcript, _ in batch]), indices)
+
+
+def _clip_lengths(dataset):
+    if isinstance(dataset, Subset):
+        lengths = _clip_lengths(dataset.dataset)
+        return None if lengths is None else [lengths[i] for i in dataset.indices]
+    return dataset.clip_lengths() if hasattr(dataset, "clip_lengths") else None
+
+
+def make_eval_loader(dataset, batch_size=32, num_workers=4, num_replicas=1, rank=0):
+    """
+    DataLoader over a whole split (or a Subset of it) in length-sorted batches (least padding)
+    when the dataset knows its clip lengths (manifest or clip cache), in dataset order otherwise.
+    Batches are (frames, targets, input_lengths, target_lengths, dataset indices).
+
+    With num_replicas > 1 every rank gets every num_replicas-th batch, without the padding
+    the training samplers add, so evaluate() counts each utterance exactly once.
+    """
+    lengths = _clip_lengths(dataset)
+    if lengths is not None:
+        batches = list(BucketBatchSampler(lengths, batch_size, shuffle=False))
+    else:
+        batches = [list(range(start, min(start + batch_size, len(dataset))))
+                   for start in range(0, len(dataset), batch_size)]
+    return DataLoader(_IndexedDataset(dataset), batch_sampler=batches[rank::num_replicas],
+                      collate_fn=_collate_with_indices, num_workers=num_workers)
+
+
+def _decode_batch(logits, input_lengths, targets, target_lengths, beam_width, lm, lm_alpha, blank):
+    # Runs in the decode pool; returns (reference ids, hypothesis ids) per utterance
+    if beam_width > 1:
+        hyps = ctc_prefix_beam_search(logits, beam_width=beam_width, blank=blank, input_lengths=input_lengths,
+                                      lm=lm, lm_alpha=lm_alpha)
+    else:
+        hyps = greedy_decode_ctc(logits, blank=blank, input_lengths=input_lengths)
+    refs = [seq.tolist() for seq in torch.split(targets, target_lengths.tolist())]
+    return refs, hyps
+
+
+def _utterance_id(dataset, idx):
+    while isinstance(dataset, Subset):
+        dataset, idx = dataset.dataset, dataset.indices[idx]
+    data = getattr(dataset, "data", None)
+    if data is None:
+        return str(idx)
+    root_dir = getattr(dataset, "root_dir", None)
+    video_path = data[idx][0]
+    return os.path.relpath(video_path, root_dir) if root_dir else video_path
+
+
+def evaluate(model, dataloader, device="cpu", precision="fp32", beam_width=1, lm=None, lm_alpha=0.5,
+             blank=0, decode_workers=2, decode_processes=False, output_path=None, max_batches=None):
+    """
+    Batched evaluation of a LipNet over a dataset split.
+
+    The forward pass runs under torch.no_grad on padded, packed batches (lengths are passed
+    to the model); the logits are handed to a pool of decode workers so greedy / beam search
+    decoding of batch i overlaps with the forward pass of batch i + 1.
+
+    :param dataloader: from make_eval_loader (batches carry the dataset indices)
+    :param beam_width: 1 for greedy decoding, > 1 for CTC prefix beam search (with lm)
+    :param decode_workers: size of the decode pool
+    :param decode_processes: decode in worker processes instead of threads; worth it for
+                             beam search, whose Python loop holds the GIL
+    :param output_path: optional JSON file for the aggregate and per-utterance results
+    :param max_batches: only evaluate the first max_batches batches (of this rank's shard)
+    returns: {"cer", "wer", "num_utterances", "utterances": [...]} where every utterance has
+             its id, reference, hypothesis and character / word edit counts
+
+    Under distributed training every rank has to call this with its own shard of the split
+    (make_eval_loader(num_replicas=..., rank=...)): the utterances are gathered from all ranks,
+    so each one returns the results of the whole split, and only rank 0 writes output_path.
+    """
+    model_was_training = getattr(model, "training", False)
+    model = unwrap_model(model)
+    model.eval()
+
+    if decode_processes:
+        pool = ProcessPoolExecutor(decode_workers, mp_context=get_context("spawn"))
+    else:
+        pool = ThreadPoolExecutor(decode_workers)
+
+    futures, indices = [], []
+    try:
+        with torch.no_grad():
+            for i, (frames, targets, input_lengths, target_lengths, batch_indices) in enumerate(
+                    tqdm(dataloader, desc="Evaluating", dynamic_ncols=True)):
+                if max_batches is not None and i >= max_batches:
+                    break
+                # (B, T, C, H, W) => (B, C, T, H, W)
+                frames = frames.to(device).permute(0, 2, 1, 3, 4)
+                with autocast(device, precision):
+                    logits = model(frames, input_lengths)
+                futures.append(pool.submit(_decode_batch, logits.float().cpu(), input_lengths, targets,
+                                           target_lengths, beam_width, lm, lm_alpha, blank))
+                indices.extend(batch_indices.tolist())
+
+        refs, hyps = [], []
+        for future in futures:
+            batch_refs, batch_hyps = future.result()
+            refs.extend(batch_refs)
+            hyps.extend(batch_hyps)
+    finally:
+        pool.shutdown()
+        if model_was_training:
+            model.train()
+
+    rates = error_rates(refs, hyps)
+    dataset = getattr(dataloader, "dataset", None)
+    dataset = getattr(dataset, "dataset", dataset)
+    utterances = [{
+        "id": _utterance_id(dataset, idx),
+        "reference": int_to_text_sequence(ref),
+        "hypothesis": int_to_text_sequence(hyp),
+        "char_errors": rates["char_distances"][n],
+        "ref_chars": rates["ref_chars"][n],
+        "word_errors": rates["word_distances"][n],
+        "ref_words": rates["ref_words"][n],
+    } for n, (idx, ref, hyp) in enumerate(zip(indices, refs, hyps))]
+    # Corpus-level rates over every rank's utterances (total edits / total reference length)
+    utterances = [utterance for shard in all_gather_objects(utterances) for utterance in shard]
+    ref_chars = sum(utterance["ref_chars"] for utterance in utterances)
+    ref_words = sum(utterance["ref_words"] for utterance in utterances)
+    results = {
+        "cer": sum(utterance["char_errors"] for utterance in utterances) / ref_chars if ref_chars > 0 else 0.0,
+        "wer": sum(utterance["word_errors"] for utterance in utterances) / ref_words if ref_words > 0 else 0.0,
+        "num_utterances": len(utterances),
+        "utterances": utterances,
+    }
+
+    if output_path is not None and is_main_process():
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
@@ -1,7 +1,10 @@
 import torch
+from src.training.precision import autocast
+from src.utils.ctc_beam_search import ctc_prefix_beam_search
 from src.utils.ctc_decode import greedy_decode_ctc
 
-def run_inference_single(model, frames, idx2char=None, blank_idx=0, device='cuda'):
+def run_inference_single(model, frames, idx2char=None, blank_idx=0, device='cuda',
+                         beam_width=1, lm=None, lm_alpha=0.5, precision="fp32"):
     """
     Args:
       model: your LipNet model (or DataParallel version).
@@ -10,6 +13,10 @@ def run_inference_single(model, frames, idx2char=None, blank_idx=0, device='cuda
       idx2char: dict mapping token_id -> character
       blank_idx: integer for the blank token
       device: 'cuda' or 'cpu'
+      beam_width: 1 for greedy decoding, > 1 for CTC prefix beam search
+      lm: optional CharNGramLM used by the beam search
+      lm_alpha: weight of the LM score in the beam search
+      precision: "fp32", "bf16" or "fp16" autocast for the forward pass
 
     Returns:
       A list of predicted sequences (list of IDs or strings).
@@ -25,11 +32,16 @@ def run_inference_single(model, frames, idx2char=None, blank_idx=0, device='cuda
     frames = frames.to(device)
     frames = frames.permute(0, 2, 1, 3, 4)
 
-    with torch.no_grad():
+    with torch.no_grad(), autocast(device, precision):
         logits = model(frames)  # => (B, T, vocab_size)
+    logits = logits.float()
 
-    # Greedy decode
-    decoded_ids_batch = greedy_decode_ctc(logits, blank=blank_idx)
+    if beam_width > 1:
+        decoded_ids_batch = ctc_prefix_beam_search(logits, beam_width=beam_width, blank=blank_idx,
+                                                   lm=lm, lm_alpha=lm_alpha)
+    else:
+        # Greedy decode
+        decoded_ids_batch = greedy_decode_ctc(logits, blank=blank_idx)
 
     # Convert IDs to strings
     decoded_strs = []
@@ -0,0 +1,117 @@
+import cv2
+import numpy as np
+import torch
+
+from src.dataset.transforms import ClipTransform
+from src.training.precision import autocast
+
+
+def iter_chunks(cap, chunk_size=75, overlap=24, transform=None):
+    """
+    Streams a cv2.VideoCapture as overlapping chunks of model input, holding at most one
+    chunk of frames in memory whatever the video length.
+
+    Every chunk after the first starts with the last `overlap` frames of the previous one.
+    Yields (first frame index, (T, 3, H, W) float tensor), T <= chunk_size (the last chunk may be shorter).
+    """
+    if not 0 <= overlap < chunk_size:
+        raise ValueError(f"overlap must be in [0, chunk_size), got {overlap} for chunk_size {chunk_size}")
+    transform = transform if transform is not None else ClipTransform((50, 100))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+
+    # Raw frames of the current chunk, decoded into one reused buffer
+    raw = np.empty((chunk_size, height, width, 3), dtype=np.uint8)
+    tail = None  # transformed last `overlap` frames of the previous chunk
+    start = 0
+    while True:
+        num_new = chunk_size if tail is None else chunk_size - overlap
+        count = 0
+        while count < num_new:
+            ret, _ = cap.read(raw[count])
+            if not ret:
+                break
+            cv2.cvtColor(raw[count], cv2.COLOR_BGR2RGB, dst=raw[count])
+            count += 1
+        if count == 0:
+            return
+
+        new = transform(raw[:count])
+        chunk = new if tail is None else torch.cat([tail, new])
+        yield start, chunk
+
+        if count < num_new:
+            return  # end of the video
+        start += chunk_size - overlap
+        tail = chunk[chunk_size - overlap:]
+
+
+class GreedyCTCStitcher:
+    """
+    Merges the per-frame outputs of overlapping chunks into one greedy CTC transcript.
+
+    Of each chunk only its core is kept: the overlap is split in half, so every kept frame
+    saw at least overlap // 2 frames of context on both sides (except at the video's ends).
+    The cores tile the video exactly once, and CTC collapsing runs over the concatenated
+    best paths, so a character held across a chunk boundary is emitted once. Only the
+    previous frame's label is carried between chunks.
+    """
+    def __init__(self, overlap, blank=0):
+        self.overlap = overlap
+        self.blank = blank
+        self.ids = []
+        self.frames = []  # frame index where each emitted token starts
+        self._prev = blank
+        self._next_frame = 0
+
+    def add(self, start, logits, last=False):
+        """
+        start: index of the chunk's first frame; logits: (T, vocab_size) for that chunk
+        last: the chunk ends the video, keep everything up to its end
+        """
+        best_path = logits.argmax(dim=-1).tolist()
+        end = len(best_path) if last else len(best_path) - self.overlap // 2
+        for t in range(self._next_frame - start, end):
+            label = best_path[t]
+            if label != self.blank and label != self._prev:
+                self.ids.append(label)
+                self.frames.append(start + t)
+            self._prev = label
+        self._next_frame = start + end
+
+
+@torch.no_grad()
+def transcribe_long_video(model, source, chunk_size=75, overlap=24, device="cpu", precision="fp32",
+                          transform=None, blank=0, return_frames=False):
+    """
+    Greedy transcript of a video of any length with constant memory: the video is decoded
+    and run through the model in overlapping chunks (see iter_chunks) and the chunk outputs
+    are stitched into one CTC path (see GreedyCTCStitcher).
+
+    :param model: LipNet, OnnxLipNet, TorchScriptLipNet or a quantized LipNet
+    :param source: video path or an opened cv2.VideoCapture
+    :param chunk_size: frames per forward pass (75 = the training clip length)
+    :param overlap: frames shared by consecutive chunks, giving boundary frames context
+    returns: list of token ids, plus the frame index of each token if return_frames
+    """
+    model.eval()
+    cap = cv2.VideoCapture(source) if isinstance(source, str) else source
+    stitcher = GreedyCTCStitcher(overlap, blank)
+    try:
+        pending = None
+        for start, chunk in iter_chunks(cap, chunk_size, overlap, transform):
+            # One chunk behind, so we know whether a chunk is the last one
+            if pending is not None:
+                stitcher.add(*pending)
+            # (T, C, H, W) => (1, C, T, H, W)
+            with autocast(device, precision):
+                logits = model(chunk.permute(1, 0, 2, 3).unsqueeze(0).to(device))
+            pending = (start, logits[0].float().cpu())
+        if pending is not None:
+            stitcher.add(*pending, last=True)
+    finally:
+        if isinstance(source, str):
+            cap.release()
+    if return_frames:
+        return stitcher.ids, stitcher.frames
+    return stitcher.ids
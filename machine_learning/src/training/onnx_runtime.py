@@ -0,0 +1,141 @@
+from collections import OrderedDict
+
+import numpy as np
+import torch
+
+from src.models.lipnet import forward_by_length
+
+GRAPH_OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
+
+
+def export_onnx(model, output_path, opset_version=17, height=50, width=100, example_frames=75):
+    """
+    Exports LipNet to ONNX with dynamic batch and time axes.
+    input: (batch_size, 3, time, height, width) float32, output: (batch_size, time, vocab_size)
+    """
+    model.eval()
+    dummy_input = torch.randn(1, 3, example_frames, height, width)
+    torch.onnx.export(
+        model,
+        (dummy_input,),
+        output_path,
+        export_params=True,
+        opset_version=opset_version,
+        input_names=["input"],
+        output_names=["output"],
+        dynamic_axes={
+            "input": {0: "batch_size", 2: "time"},
+            "output": {0: "batch_size", 1: "time"}
+        },
+        dynamo=False
+    )
+
+
+def check_onnx_parity(model, onnx_model, lengths=(20, 50, 75, 100), batch_size=2, atol=1e-4, seed=0):
+    """
+    Runs the PyTorch model and the exported ONNX model on random clips of each length.
+    onnx_model: path to the .onnx file or an OnnxLipNet
+    Returns {length: max abs difference of the logits}; raises AssertionError above atol.
+    """
+    if not isinstance(onnx_model, OnnxLipNet):
+        onnx_model = OnnxLipNet(onnx_model)
+    generator = torch.Generator().manual_seed(seed)
+    model.eval()
+
+    diffs = {}
+    for length in lengths:
+        x = torch.rand(batch_size, 3, length, onnx_model.height, onnx_model.width, generator=generator)
+        with torch.no_grad():
+            expected = model(x)
+        diffs[length] = (onnx_model(x) - expected).abs().max().item()
+
+    failed = {length: diff for length, diff in diffs.items() if diff > atol}
+    assert not failed, f"ONNX output differs from PyTorch by more than {atol}: {failed}"
+    return diffs
+
+
+class OnnxLipNet:
+    """
+    LipNet exported by export_onnx, run with ONNX Runtime on CPU.
+
+    Called like the PyTorch model: (B, 3, T, H, W) float input, optional lengths,
+    (B, T, vocab_size) torch logits out. Input and output buffers are preallocated
+    and bound to the session once per (batch size, length) shape, so repeated calls
+    copy the frames in and run without any allocations on the ONNX Runtime side.
+    """
+    def __init__(self, model_path, intra_op_threads=0, inter_op_threads=0, graph_optimization_level="all",
+                 max_cached_shapes=16):
+        """
+        :param model_path: .onnx file written by export_onnx
+        :param intra_op_threads: threads used inside an op (0 = ONNX Runtime's default)
+        :param inter_op_threads: threads used across ops (0 = ONNX Runtime's default)
+        :param graph_optimization_level: one of GRAPH_OPTIMIZATION_LEVELS
+        :param max_cached_shapes: number of (batch size, length) IO bindings kept around
+        """
+        import onnxruntime as ort
+
+        if graph_optimization_level not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(f"Unknown graph optimization level {graph_optimization_level!r}, "
+                             f"expected one of {GRAPH_OPTIMIZATION_LEVELS}")
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = {
+            "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }[graph_optimization_level]
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._ort = ort
+
+        model_input = self.session.get_inputs()[0]
+        model_output = self.session.get_outputs()[0]
+        self.input_name = model_input.name
+        self.output_name = model_output.name
+        _, self.channels, _, self.height, self.width = model_input.shape
+        self.vocab_size = model_output.shape[2]
+        self.max_cached_shapes = max_cached_shapes
+        self._bindings = OrderedDict()
+
+    def eval(self):
+        # Inference only; lets OnnxLipNet stand in for LipNet in run_inference_single
+        return self
+
+    def _binding(self, batch_size, length):
+        key = (batch_size, length)
+        if key in self._bindings:
+            self._bindings.move_to_end(key)
+            return self._bindings[key]
+
+        inputs = np.empty((batch_size, self.channels, length, self.height, self.width), dtype=np.float32)
+        outputs = np.empty((batch_size, length, self.vocab_size), dtype=np.float32)
+        binding = self.session.io_binding()
+        binding.bind_ortvalue_input(self.input_name, self._ort.OrtValue.ortvalue_from_numpy(inputs))
+        binding.bind_ortvalue_output(self.output_name, self._ort.OrtValue.ortvalue_from_numpy(outputs))
+
+        self._bindings[key] = (binding, inputs, outputs)
+        if len(self._bindings) > self.max_cached_shapes:
+            self._bindings.popitem(last=False)
+        return self._bindings[key]
+
+    def _run(self, x):
+        binding, inputs, outputs = self._binding(x.shape[0], x.shape[2])
+        inputs[...] = x
+        self.session.run_with_iobinding(binding)
+        return outputs
+
+    def __call__(self, x, lengths=None):
+        """
+        x: (B, 3, T, H, W) float tensor or array
+        lengths: optional (B,) valid frames per clip of a padded batch. The exported graph
+                 has no packing, so clips are run grouped by length without their padding,
+                 the same as running each clip on its own. Logits past a clip's length are zero.
+        returns: (B, T, vocab_size) float32 tensor
+        """
+        if lengths is None:
+            x = x.detach().cpu().numpy() if isinstance(x, torch.Tensor) else x
+            return torch.from_numpy(self._run(x).copy())
+        # _run returns the bound output buffer, forward_by_length copies it out per group
+        return forward_by_length(lambda clips: torch.from_numpy(self._run(clips.numpy())),
+                                 torch.as_tensor(x).detach().cpu(), lengths)
@@ -0,0 +1,29 @@
+import torch
+
+# fp16 is meant for CUDA: CPUs have no fast fp16 kernels for Conv3d (orders of magnitude slower)
+PRECISIONS = ("fp32", "bf16", "fp16")
+
+_DTYPES = {"bf16": torch.bfloat16, "fp16": torch.float16}
+
+
+def device_type(device):
+    return torch.device(device).type
+
+
+def autocast(device, precision="fp32"):
+    """
+    Autocast context for the forward pass: convs, matmuls and the GRU run in bf16/fp16,
+    precision-sensitive ops stay in fp32. A no-op for "fp32".
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}, expected one of {PRECISIONS}")
+    return torch.autocast(device_type(device), dtype=_DTYPES.get(precision, torch.bfloat16),
+                          enabled=precision != "fp32")
+
+
+def grad_scaler(device, precision="fp32"):
+    """
+    Loss scaler keeping small fp16 gradients from underflowing. Only enabled for fp16;
+    bf16 has fp32's exponent range and needs none. A disabled scaler passes everything through.
+    """
+    return torch.amp.GradScaler(device_type(device), enabled=precision == "fp16")
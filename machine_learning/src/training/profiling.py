@@ -0,0 +1,124 @@
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import torch
+
+from src.utils.memory import peak_memory_mb, reset_peak_memory
+
+PHASES = ("to_device", "forward", "backward", "optimizer", "metrics")
+
+
+class StepTimer:
+    """
+    Low-overhead throughput instrumentation for a training loop.
+
+    Every step records only host timestamps: the time spent waiting for the DataLoader
+    and the wall time of the step, which give samples/sec, frames/sec and the data-wait
+    fraction. Every sample_every-th step additionally times each phase (to_device, forward,
+    backward, optimizer, metrics), synchronizing the GPU around each one so queued kernels
+    are attributed to the right phase; the other steps never synchronize.
+
+        timer.start_epoch()
+        for batch in loader:
+            timer.data_ready()
+            with timer.phase("forward"):
+                ...
+            timer.end_step(num_samples, num_frames)
+        summary = timer.summary()
+    """
+    def __init__(self, device="cpu", sample_every=50, clock=time.perf_counter):
+        """
+        clock: seconds as a float, time.perf_counter unless a test drives the timer
+        """
+        self.device = torch.device(device)
+        self.sample_every = max(1, sample_every)
+        self.clock = clock
+        self.start_epoch()
+
+    def start_epoch(self):
+        reset_peak_memory(self.device)
+        self.steps = 0
+        self.samples = 0
+        self.frames = 0
+        self.data_wait = 0.0
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+        self.sampled_steps = 0
+        self._sampled = False
+        self._epoch_start = self._step_end = self.clock()
+
+    def _sync(self):
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+
+    def data_ready(self):
+        # Called as soon as the batch is available: everything since the last step ended was data loading
+        now = self.clock()
+        self.data_wait += now - self._step_end
+        self._sampled = self.steps % self.sample_every == 0
+        if self._sampled:
+            self.sampled_steps += 1
+
+    @contextmanager
+    def phase(self, name):
+        if not self._sampled:
+            yield
+            return
+        self._sync()
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self._sync()
+            self.phase_time[name] += self.clock() - start
+
+    def end_step(self, num_samples, num_frames):
+        self.steps += 1
+        self.samples += num_samples
+        self.frames += num_frames
+        self._step_end = self.clock()
+
+    def summary(self, total_samples=None, total_frames=None):
+        """
+        Epoch statistics. total_samples/total_frames override this process' counts, e.g. with
+        the sums over all ranks for the global throughput of distributed training.
+        """
+        self._sync()
+        wall = max(self.clock() - self._epoch_start, 1e-9)
+        samples = self.samples if total_samples is None else total_samples
+        frames = self.frames if total_frames is None else total_frames
+        sampled = max(self.sampled_steps, 1)
+        summary = {
+            "steps": self.steps,
+            "wall_s": wall,
+            "samples_per_s": samples / wall,
+            "frames_per_s": frames / wall,
+            "data_wait_fraction": self.data_wait / wall,
+            "step_ms": 1000.0 * (wall - self.data_wait) / max(self.steps, 1),
+            "peak_memory_mb": peak_memory_mb(self.device),
+        }
+        for name in PHASES:
+            summary[f"{name}_ms"] = 1000.0 * self.phase_time[name] / sampled
+        return summary
+
+
+def append_record(path, record):
+    """
+    Appends a flat dict to a local log: a CSV row if path ends in .csv (header written
+    with the first row), a JSON line otherwise.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith(".csv"):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(record))
+            if new_file:
+                writer.writeheader()
+            writer.writerow(record)
+    else:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
@@ -0,0 +1,120 @@
+import torch
+
+from src.dataset.transforms import ClipTransform
+from src.training.precision import autocast
+from src.utils.ctc_decode import greedy_decode_ctc
+from src.utils.tokenizer import int_to_text_sequence
+
+
+class StreamingLipNet:
+    """
+    Incremental LipNet inference over a live stream of frames.
+
+    Frames are pushed as they arrive. Every `hop` frames a transcript is decoded over
+    the last `window` frames. STCNN features are cached per stream: once a frame has
+    STCNN's full temporal context on both sides its feature is final and is never
+    recomputed, so each emit only runs the convs over the frames added since the last
+    one (plus the few frames of context around them). Only the BiGRU + FC head, which
+    is cheap next to the Conv3d stack, is rerun over the whole window.
+
+    One instance holds the state of one stream; create one per client. A transform
+    cropping with a MouthCropper gets its own streaming cropper here, so the mouth box
+    is tracked and smoothed across pushes instead of within each chunk.
+    """
+    def __init__(self, model, window=75, hop=10, device='cpu', transform=None, blank_idx=0, precision="fp32"):
+        """
+        :param model: LipNet (eval mode is set here)
+        :param window: number of most recent frames decoded at every emit
+        :param hop: emit a transcript every `hop` pushed frames
+        :param device: device the model lives on
+        :param transform: ClipTransform turning (T, H, W, 3) uint8 RGB frames into model input;
+                          may be shared between streams
+        :param blank_idx: CTC blank token
+        :param precision: "fp32", "bf16" or "fp16" autocast for the model
+        """
+        self.model = model.eval()
+        self.window = window
+        self.hop = hop
+        self.device = device
+        transform = transform if transform is not None else ClipTransform((50, 100))
+        crop = getattr(transform, "crop", None)
+        if hasattr(crop, "stream"):
+            transform = ClipTransform(transform.size, crop=crop.stream())
+        self.transform = transform
+        self.blank_idx = blank_idx
+        self.precision = precision
+        self.context = model.stcnn.temporal_context
+        self.reset()
+
+    def reset(self):
+        crop = getattr(self.transform, "crop", None)
+        if hasattr(crop, "reset"):
+            crop.reset()
+        # Preprocessed frames from absolute index self._tail_start onward
+        self._tail = []
+        self._tail_start = 0
+        # Final STCNN features of the last `window` finalized frames, ending at self._finalized
+        self._features = []
+        self._finalized = 0
+        self._received = 0
+        self._since_emit = 0
+
+    @property
+    def frames_until_emit(self):
+        return self.hop - self._since_emit
+
+    def push(self, frames):
+        """
+        Adds frames to the stream.
+        frames: (T, H, W, 3) uint8 RGB array, or a single (H, W, 3) frame
+        Returns the transcript of the current window if this push completed a hop, else None.
+        """
+        if frames.ndim == 3:
+            frames = frames[None]
+        clip = self.transform(frames)  # (T, 3, 50, 100)
+        self._tail.extend(clip.unbind(0))
+        self._received += clip.shape[0]
+        self._since_emit += clip.shape[0]
+
+        if self._since_emit < self.hop:
+            return None
+        # Keep the remainder so emits stay on a `hop` grid whatever the push sizes
+        self._since_emit %= self.hop
+        return self.decode()
+
+    @torch.no_grad()
+    def decode(self):
+        """
+        Decodes the last `window` frames, updating the feature cache on the way.
+        """
+        if self._received == 0:
+            return ""
+
+        # STCNN over the not yet finalized frames plus their left context
+        x = torch.stack(self._tail, dim=1).unsqueeze(0).to(self.device)  # (1, 3, N, H, W)
+        with autocast(self.device, self.precision):
+            feats = self.model.stcnn(x)[0]  # (N, feature_dim)
+
+        # Frames with full context on both sides are final. The last `context` frames
+        # are provisional: they are computed as if the clip ended here.
+        first = self._finalized - self._tail_start
+        final_end = max(self._received - self.context, self._finalized)
+        last = final_end - self._tail_start
+        self._features.extend(feats[first:last].unbind(0))
+        self._features = self._features[-self.window:]
+        provisional = list(feats[last:].unbind(0))
+
+        # Raw frames are only kept as left context for the next provisional frames
+        self._finalized = final_end
+        new_start = max(self._finalized - self.context, 0)
+        self._tail = self._tail[new_start - self._tail_start:]
+        self._tail_start = new_start
+
+        keep = self.window - len(provisional)
+        window_feats = self._features[-keep:] if keep > 0 else []
+        window_feats = torch.stack(window_feats + provisional, dim=0).unsqueeze(0)
+
+        with autocast(self.device, self.precision):
+            logits = self.model.forward_sequence(window_feats)  # (1, W, vocab_size)
+        decoded_ids = greedy_decode_ctc(logits.float(), blank=self.blank_idx)[0]
+        return int_to_text_sequence(decoded_ids)
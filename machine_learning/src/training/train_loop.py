@@ -1,13 +1,20 @@
+from contextlib import nullcontext
+import os
+
 from src.utils.metrics import compute_accuracy
 import torch
 import wandb
 from torch.optim import Optimizer
 from torch.utils.data import DataLoader
 from tqdm import tqdm
-import os
 
 from src.utils.ctc_loss import Criterion
 from src.models.lipnet import LipNet
+from src.training.checkpointing import AsyncCheckpointer, get_rng_state, latest_checkpoint, set_rng_state
+from src.training.distributed import all_reduce_sum, is_main_process, unwrap_model
+from src.training.evaluate import evaluate
+from src.training.precision import autocast, grad_scaler
+from src.training.profiling import StepTimer, append_record
 
 
 def train_one_epoch(
@@ -17,61 +24,132 @@ def train_one_epoch(
         criterion: Criterion,
         epoch: int,
         device: torch.device = 'cuda',
-        log_accuracy: bool = False
+        log_accuracy: bool = False,
+        precision: str = "fp32",
+        scaler: torch.amp.GradScaler = None,
+        accumulation_steps: int = 1,
+        timer: StepTimer = None,
+        perf_log_path: str = None
     ) -> None:
     """
     Args:
-        model: LipNet model
+        model: LipNet model, or LipNet wrapped in DistributedDataParallel
         optimizer: Optimizer
         train_dataloader: DataLoader yielding (frames, targets, input_lengths, target_lengths)
         Criterion: Loss function
         device: Device to train on
+        precision: "fp32", "bf16" or "fp16" autocast for the forward pass (the loss stays fp32)
+        scaler: GradScaler for fp16, created if not given
+        accumulation_steps: Batches whose gradients are summed per optimizer step, for an effective
+                            batch of accumulation_steps * batch_size at the memory cost of one batch
+        timer: StepTimer for the throughput / per-phase timings, created if not given
+        perf_log_path: .csv or .jsonl file the epoch's throughput summary is appended to
     """
+    if accumulation_steps < 1:
+        raise ValueError(f"accumulation_steps must be >= 1, got {accumulation_steps}")
+    if scaler is None:
+        scaler = grad_scaler(device, precision)
 
     model.train()
     total_loss = 0.0
     total_accuracy = 0.0
     num_samples = 0
+    total_frames = 0
+    padded_frames = 0
+    num_batches = len(train_dataloader)
 
-    for batch in tqdm(train_dataloader, desc=f"Training (Epoch {epoch})", dynamic_ncols=True):
+    main_process = is_main_process()
+    if timer is None:
+        timer = StepTimer(device)
+    timer.start_epoch()
+
+    optimizer.zero_grad()
+    for step, batch in enumerate(tqdm(train_dataloader, desc=f"Training (Epoch {epoch})", dynamic_ncols=True,
+                                      disable=not main_process)):
+        timer.data_ready()
         frames, targets, input_lengths, target_lengths = batch
 
-        # Send the inputs and targets to the training device
-        frames = frames.to(device)
-        targets = targets.to(device)
+        # Share of the padded batch the model spends on padding frames
+        batch_frames = frames.size(0) * frames.size(1)
+        real_frames = input_lengths.sum().item()
+        padding = 1.0 - real_frames / batch_frames
+        total_frames += real_frames
+        padded_frames += batch_frames
+
+        with timer.phase("to_device"):
+            # Send the inputs and targets to the training device
+            frames = frames.to(device)
+            targets = targets.to(device)
 
-        # (batch_size, num_frames, num_channels, height, width) => (batch_size, num_channels, num_frames, height, width)
-        frames = frames.permute(0, 2, 1, 3, 4)
+            # (batch_size, num_frames, num_channels, height, width) => (batch_size, num_channels, num_frames, height, width)
+            frames = frames.permute(0, 2, 1, 3, 4)
         
-        # (batch_size, num_frames, num_classes)
-        logits = model(frames)
+        with timer.phase("forward"), autocast(device, precision):
+            # (batch_size, num_frames, num_classes)
+            logits = model(frames)
 
-        losses = criterion((logits, input_lengths), (targets, target_lengths))
+            losses = criterion((logits, input_lengths), (targets, target_lengths))
 
         loss = losses["overall"]
 
-        loss.backward()
+        # Average the loss over the batches of this optimizer step (the last group of the epoch may be shorter)
+        group_start = step - step % accumulation_steps
+        group_size = min(accumulation_steps, num_batches - group_start)
+
+        optimizer_step = step + 1 == group_start + group_size
+
+        # DDP only all-reduces the gradients on the batch that ends an accumulation group
+        sync = nullcontext() if optimizer_step or not hasattr(model, "no_sync") else model.no_sync()
+        with timer.phase("backward"), sync:
+            # Loss scaling is a pass-through unless training in fp16
+            scaler.scale(loss / group_size).backward()
+
+        with timer.phase("optimizer"):
+            if optimizer_step:
+                scaler.step(optimizer)
+                scaler.update()
+                optimizer.zero_grad()
+
+        with timer.phase("metrics"):
+            # For average loss
+            batch_size = frames.size(0)
+            total_loss += loss.item() * batch_size
+            num_samples += batch_size
+
+            if log_accuracy:
+                accuracy = compute_accuracy(logits, targets, input_lengths, target_lengths)
+                total_accuracy += accuracy * batch_size
+
+            # Per-batch values of rank 0's shard
+            if main_process:
+                if log_accuracy:
+                    wandb.log({
+                        "Train": {
+                            "Loss": loss.item(),
+                            "Accuracy": accuracy,
+                            "Padding": padding
+                        }
+                    })
+                else:
+                    wandb.log({"Train": {"Loss": loss.item(), "Padding": padding}})
+
+        timer.end_step(batch_size, real_frames)
+
+    # Epoch averages over every rank's shard
+    total_loss, total_accuracy, num_samples, total_frames, padded_frames = all_reduce_sum(
+        total_loss, total_accuracy, num_samples, total_frames, padded_frames, device=device)
+
+    # Throughput over all ranks; phase timings, data wait and peak memory are rank 0's
+    perf = timer.summary(total_samples=num_samples, total_frames=total_frames)
+    if main_process:
+        if padded_frames > 0:
+            print(f"Epoch {epoch} padding ratio: {1.0 - total_frames / padded_frames:.3f}")
+        print(f"Epoch {epoch} throughput: {perf['samples_per_s']:.1f} samples/s, {perf['frames_per_s']:.0f} frames/s, "
+              f"data wait {perf['data_wait_fraction']:.1%}")
+        wandb.log({"Perf": perf})
+        if perf_log_path is not None:
+            append_record(perf_log_path, {"epoch": epoch, **perf})
 
-        optimizer.step()
-        optimizer.zero_grad()
-        
-        # For average loss
-        batch_size = frames.size(0)
-        total_loss += loss.item() * batch_size
-        num_samples += batch_size
-        
-        if log_accuracy:
-            accuracy = compute_accuracy(logits, targets, input_lengths, target_lengths)
-            total_accuracy += accuracy * batch_size
-            wandb.log({
-                "Train": {
-                    "Loss": loss.item(),
-                    "Accuracy": accuracy
-                }
-            })
-        else:
-            wandb.log({"Train": {"Loss": loss.item()}})
-        
     avg_loss = total_loss / num_samples if num_samples > 0 else 0.0
     avg_accuracy = 0.0
     if log_accuracy and num_samples > 0:
@@ -86,34 +164,106 @@ def train(
         num_epochs: int = 10, 
         device: torch.device = 'cuda',
         checkpoint_dir: str = "machine_learning/checkpoints",
-        log_accuracy: bool = False
+        log_accuracy: bool = False,
+        precision: str = "fp32",
+        accumulation_steps: int = 1,
+        keep_last: int = 3,
+        keep_best: int = 1,
+        resume_from: str = None,
+        profile_every: int = 50,
+        perf_log_path: str = None,
+        eval_dataloader: DataLoader = None,
+        eval_every: int = 0,
+        eval_max_batches: int = 50
     ) -> None:
     """
     Args:
         model: LipNet model
         optimizer: Optimizer
-        train_dataloader: DataLoader yielding (frames, targets, input_lengths, target_lengths)
+        train_dataloader: DataLoader yielding (frames, targets, input_lengths, target_lengths);
+                          for distributed training, sharded with a DistributedSampler or a
+                          BucketBatchSampler(num_replicas=..., rank=...)
         Criterion: Loss function
         num_epochs: Number of epochs to train for
         device: Device to train on
+        precision: "fp32", "bf16" or "fp16" autocast (fp16 with loss scaling, meant for CUDA)
+        accumulation_steps: Batches accumulated per optimizer step
+        keep_last: Most recent epoch checkpoints kept on disk (0 keeps all)
+        keep_best: Checkpoints with the lowest average train loss kept on top of those
+        resume_from: Checkpoint to continue a run from (model, optimizer, loss scaler, epoch and RNG state),
+                     or "latest" for the newest one in checkpoint_dir (a fresh start if there is none)
+        profile_every: Steps between the per-phase timings (which synchronize the GPU)
+        perf_log_path: .csv or .jsonl file for the per-epoch throughput summaries (also logged to wandb)
+        eval_dataloader: held-out split from make_eval_loader, evaluated (greedy CER/WER) by every rank;
+                         for distributed training, sharded with make_eval_loader(num_replicas=..., rank=...)
+        eval_every: Epochs between evaluations (0 = never); per-utterance results are written
+                    to checkpoint_dir/eval_epoch_N.json
+        eval_max_batches: Batches evaluated per rank, so an evaluation stays short next to an epoch
+                          (None evaluates the whole split)
+
+    Checkpoints are written by a background thread from a CPU snapshot, so training only waits
+    for the copy. Only rank 0 saves checkpoints and prints; the other ranks train and evaluate.
     """
-    os.makedirs(checkpoint_dir, exist_ok=True)
+    main_process = is_main_process()
     model.to(device)
-    
-    for epoch in range(num_epochs):
-        avg_loss, avg_acc = train_one_epoch(model, optimizer, train_dataloader, criterion, epoch, device, log_accuracy)
-
-        if log_accuracy:
-            print(f"Epoch [{epoch+1}/{num_epochs}] - Avg Train Loss: {avg_loss:.4f}, Avg Acc: {avg_acc:.4f}")
-        else:
-            print(f"Epoch [{epoch+1}/{num_epochs}] - Avg Train Loss: {avg_loss:.4f}")
-
-        # Save model checkpoint after each epoch
-        checkpoint_path = os.path.join(checkpoint_dir, f"lipnet_epoch_{epoch+1}.pth")
-        torch.save({
-            "epoch": epoch,
-            "model_state_dict": model.state_dict(),
-            "optimizer_state_dict": optimizer.state_dict(),
-            "loss": avg_loss
-        }, checkpoint_path)
-        print(f"Model checkpoint saved to {checkpoint_path}")
+    scaler = grad_scaler(device, precision)
+
+    start_epoch = 0
+    if resume_from == "latest":
+        resume_from = latest_checkpoint(checkpoint_dir)
+        if resume_from is None and main_process:
+            print(f"No checkpoint found in {checkpoint_dir}, starting from scratch")
+    if resume_from is not None:
+        checkpoint = torch.load(resume_from, map_location="cpu", weights_only=True)
+        unwrap_model(model).load_state_dict(checkpoint["model_state_dict"])
+        optimizer.load_state_dict(checkpoint["optimizer_state_dict"])
+        if "scaler_state_dict" in checkpoint:
+            scaler.load_state_dict(checkpoint["scaler_state_dict"])
+        if "rng_state" in checkpoint:
+            set_rng_state(checkpoint["rng_state"])
+        start_epoch = checkpoint["epoch"] + 1
+        if main_process:
+            print(f"Resumed from {resume_from} at epoch {start_epoch + 1}/{num_epochs}")
+
+    checkpointer = AsyncCheckpointer(checkpoint_dir, keep_last, keep_best) if main_process else None
+    timer = StepTimer(device, sample_every=profile_every)
+    try:
+        for epoch in range(start_epoch, num_epochs):
+            # Reshuffle bucketed batches every epoch
+            if hasattr(train_dataloader.batch_sampler, "set_epoch"):
+                train_dataloader.batch_sampler.set_epoch(epoch)
+            if hasattr(train_dataloader.sampler, "set_epoch"):
+                train_dataloader.sampler.set_epoch(epoch)
+
+            avg_loss, avg_acc = train_one_epoch(model, optimizer, train_dataloader, criterion, epoch, device, log_accuracy,
+                                                precision, scaler, accumulation_steps, timer, perf_log_path)
+
+            if checkpointer is not None:
+                if log_accuracy:
+                    print(f"Epoch [{epoch+1}/{num_epochs}] - Avg Train Loss: {avg_loss:.4f}, Avg Acc: {avg_acc:.4f}")
+                else:
+                    print(f"Epoch [{epoch+1}/{num_epochs}] - Avg Train Loss: {avg_loss:.4f}")
+
+                # Save model checkpoint after each epoch (written in the background)
+                checkpointer.save(epoch + 1, {
+                    "epoch": epoch,
+                    "model_state_dict": unwrap_model(model).state_dict(),
+                    "optimizer_state_dict": optimizer.state_dict(),
+                    "scaler_state_dict": scaler.state_dict(),
+                    "rng_state": get_rng_state(),
+                    "precision": precision,
+                    "loss": avg_loss
+                }, metric=avg_loss)
+                print(f"Saving model checkpoint to {checkpointer.path(epoch + 1)}")
+
+            # Every rank evaluates its own shard of the held-out split, so none of them sits in the
+            # next gradient all-reduce (and runs into the process group timeout) while rank 0 evaluates
+            if eval_dataloader is not None and eval_every > 0 and (epoch + 1) % eval_every == 0:
+                results = evaluate(model, eval_dataloader, device, precision, max_batches=eval_max_batches,
+                                   output_path=os.path.join(checkpoint_dir, f"eval_epoch_{epoch+1}.json"))
+                if main_process:
+                    print(f"Epoch [{epoch+1}/{num_epochs}] - Eval CER: {results['cer']:.4f}, WER: {results['wer']:.4f}")
+                    wandb.log({"Eval": {"CER": results["cer"], "WER": results["wer"]}})
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
@@ -0,0 +1,66 @@
+import numpy as np
+
+from src.utils.tokenizer import ALPHABET, text_to_int_sequence
+
+
+class CharNGramLM:
+    """
+    Character n-gram language model over the tokenizer's ids, stored as one dense array.
+
+    Symbols are the tokenizer ids 1..len(ALPHABET); id 0 (the CTC blank) doubles as the
+    start-of-sentence padding in contexts. A context of (order - 1) symbols is encoded as a
+    base-vocab_size integer, so log_probs has shape (vocab_size ** (order - 1), vocab_size)
+    and a lookup is a single array index. Moving to the next context is
+    (context * vocab_size + token) % num_contexts.
+    """
+    def __init__(self, log_probs, order):
+        self.log_probs = np.ascontiguousarray(log_probs, dtype=np.float32)
+        self.order = order
+        self.vocab_size = self.log_probs.shape[1]
+        self.num_contexts = self.log_probs.shape[0]
+
+    @classmethod
+    def train(cls, texts, order=3, smoothing=0.1):
+        """
+        Counts n-grams over an iterable of transcripts and returns an add-k smoothed model.
+        """
+        vocab_size = len(ALPHABET) + 1
+        num_contexts = vocab_size ** (order - 1)
+        counts = np.zeros((num_contexts, vocab_size), dtype=np.float64)
+
+        for text in texts:
+            context = 0
+            for token in text_to_int_sequence(text):
+                counts[context, token] += 1
+                context = (context * vocab_size + token) % num_contexts
+
+        counts[:, 1:] += smoothing
+        # Blank is never emitted by the LM
+        counts[:, 0] = 0.0
+        with np.errstate(divide='ignore'):
+            log_probs = np.log(counts / counts.sum(axis=1, keepdims=True))
+        return cls(log_probs, order)
+
+    def initial_context(self):
+        return 0
+
+    def next_context(self, context, token):
+        return (context * self.vocab_size + token) % self.num_contexts
+
+    def score_sequence(self, tokens):
+        """
+        Total log probability of a token id sequence.
+        """
+        total, context = 0.0, self.initial_context()
+        for token in tokens:
+            total += float(self.log_probs[context, token])
+            context = self.next_context(context, token)
+        return total
+
+    def save(self, path):
+        np.savez(path, log_probs=self.log_probs, order=self.order)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["log_probs"], int(data["order"]))
@@ -0,0 +1,137 @@
+import math
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+def _prefix_beam_search(log_probs, beam_width, blank, top_k, log_threshold, lm, lm_alpha, lm_beta):
+    """
+    CTC prefix beam search over one utterance.
+    log_probs: (T, vocab_size) numpy array of log-softmax outputs.
+
+    Beams are kept as parallel arrays so every timestep scores all (beam, token)
+    extensions with a handful of array ops; only the surviving extensions are merged
+    into prefixes in Python.
+    """
+    prefixes = [()]
+    p_blank = np.array([0.0])              # log prob of the prefix ending in blank
+    p_nonblank = np.array([-np.inf])       # log prob of the prefix ending in its last token
+    last = np.array([-1])                  # last token of each prefix (-1 for empty)
+    lm_ctx = np.array([lm.initial_context() if lm is not None else 0])
+
+    for t in range(log_probs.shape[0]):
+        lp = log_probs[t]
+
+        # Per-timestep pruning: top_k non-blank tokens above the probability threshold
+        lp_tokens = lp.copy()
+        lp_tokens[blank] = -np.inf
+        k = min(top_k, lp_tokens.shape[0] - 1)
+        candidates = np.argpartition(lp_tokens, -k)[-k:]
+        candidates = candidates[lp_tokens[candidates] >= log_threshold]
+
+        p_total = np.logaddexp(p_blank, p_nonblank)
+
+        # Prefixes that stay the same: emit blank, or repeat the last token
+        stay_blank = p_total + lp[blank]
+        stay_nonblank = np.where(last >= 0, p_nonblank + lp[np.maximum(last, 0)], -np.inf)
+
+        # Prefixes extended by a candidate token, shape (beams, candidates).
+        # Repeating the last token only extends paths that went through a blank.
+        ext = np.where(candidates[None, :] == last[:, None], p_blank[:, None], p_total[:, None])
+        ext = ext + lp[candidates][None, :]
+        if lm is not None and len(candidates) > 0:
+            ext = ext + lm_alpha * lm.log_probs[lm_ctx][:, candidates] + lm_beta
+
+        # Only the best beam_width extensions can survive the final prune
+        flat = ext.ravel()
+        if flat.shape[0] > beam_width:
+            keep = np.argpartition(flat, -beam_width)[-beam_width:]
+        else:
+            keep = np.arange(flat.shape[0])
+        keep = keep[np.isfinite(flat[keep])]
+
+        # Merge extensions into prefixes
+        new_prefixes = list(prefixes)
+        index = {prefix: i for i, prefix in enumerate(prefixes)}
+        new_blank = list(stay_blank)
+        new_nonblank = list(stay_nonblank)
+        new_last = list(last)
+        new_ctx = list(lm_ctx)
+        for flat_idx in keep:
+            beam, cand = divmod(int(flat_idx), len(candidates))
+            token = int(candidates[cand])
+            prefix = prefixes[beam] + (token,)
+            score = float(flat[flat_idx])
+            i = index.get(prefix)
+            if i is None:
+                index[prefix] = len(new_prefixes)
+                new_prefixes.append(prefix)
+                new_blank.append(-np.inf)
+                new_nonblank.append(score)
+                new_last.append(token)
+                new_ctx.append(lm.next_context(int(lm_ctx[beam]), token) if lm is not None else 0)
+            else:
+                new_nonblank[i] = np.logaddexp(new_nonblank[i], score)
+
+        # Keep the beam_width best prefixes
+        p_blank = np.array(new_blank)
+        p_nonblank = np.array(new_nonblank)
+        scores = np.logaddexp(p_blank, p_nonblank)
+        if scores.shape[0] > beam_width:
+            best = np.argpartition(scores, -beam_width)[-beam_width:]
+        else:
+            best = np.arange(scores.shape[0])
+        prefixes = [new_prefixes[i] for i in best]
+        p_blank = p_blank[best]
+        p_nonblank = p_nonblank[best]
+        last = np.array(new_last)[best]
+        lm_ctx = np.array(new_ctx)[best]
+
+    scores = np.logaddexp(p_blank, p_nonblank)
+    best = int(np.argmax(scores))
+    return list(prefixes[best]), float(scores[best])
+
+
+def ctc_prefix_beam_search(logits,
+                           beam_width=10,
+                           blank=0,
+                           input_lengths=None,
+                           top_k=8,
+                           prune_threshold=1e-3,
+                           lm=None,
+                           lm_alpha=0.5,
+                           lm_beta=0.0,
+                           return_scores=False):
+    """
+    CTC prefix beam search for a batch of samples.
+    logits shape: (batch, time, vocab_size)
+      (e.g., from LipNet forward pass).
+    beam_width: number of prefixes kept per timestep
+    input_lengths: optional (batch,) number of valid frames per sample
+    top_k, prune_threshold: per timestep only the top_k tokens with probability
+      >= prune_threshold are considered for extending prefixes
+    lm: optional CharNGramLM, added to extensions as lm_alpha * log P_lm(token) + lm_beta
+    Returns: a list of lists of decoded token IDs (and the list of log scores if return_scores).
+    """
+    # One softmax and one device->host copy for the whole batch
+    log_probs = F.log_softmax(logits.detach().float(), dim=2).cpu().numpy()
+    if input_lengths is None:
+        input_lengths = [log_probs.shape[1]] * log_probs.shape[0]
+    elif isinstance(input_lengths, torch.Tensor):
+        input_lengths = input_lengths.tolist()
+
+    log_threshold = math.log(prune_threshold) if prune_threshold > 0 else -np.inf
+
+    decoded, scores = [], []
+    for b in range(log_probs.shape[0]):
+        seq, score = _prefix_beam_search(
+            log_probs[b, :int(input_lengths[b])],
+            beam_width, blank, top_k, log_threshold, lm, lm_alpha, lm_beta
+        )
+        decoded.append(seq)
+        scores.append(score)
+
+    if return_scores:
+        return decoded, scores
+    return decoded
@@ -1,22 +1,53 @@
-def greedy_decode_ctc(logits, blank=0):
+import torch
+
+
+def greedy_decode_ctc_packed(logits, blank=0, input_lengths=None):
     """
-    Greedy decodes the model's output for a batch of samples.
+    Greedy decodes the model's output for a batch of samples without leaving the device.
     logits shape: (batch, time, vocab_size)
       (e.g., from LipNet forward pass).
-    Returns: a list of lists, where each sub-list is the decoded token IDs for that sample.
+    input_lengths: optional (batch,) number of valid frames per sample,
+      frames past a sample's length (padding) are ignored.
+    Returns: (ids, offsets) where ids is a 1D tensor of all decoded token IDs in the batch,
+      and sample b's tokens are ids[offsets[b]:offsets[b + 1]].
     """
     # Argmax over the vocab dimension => shape (batch, time)
     argmax_ids = logits.argmax(dim=2)
+    batch_size, num_frames = argmax_ids.shape
+
+    # Keep a frame if it is not blank and differs from the previous frame
+    keep = argmax_ids != blank
+    keep[:, 1:] &= argmax_ids[:, 1:] != argmax_ids[:, :-1]
+
+    if input_lengths is not None:
+        input_lengths = torch.as_tensor(input_lengths, device=argmax_ids.device)
+        frame_idx = torch.arange(num_frames, device=argmax_ids.device)
+        keep &= frame_idx.unsqueeze(0) < input_lengths.unsqueeze(1)
+
+    # Boolean indexing walks the batch row by row, so ids come out grouped per sample
+    ids = argmax_ids[keep]
+    offsets = torch.zeros(batch_size + 1, dtype=torch.long, device=argmax_ids.device)
+    offsets[1:] = keep.sum(dim=1).cumsum(dim=0)
+    return ids, offsets
+
+
+def unpack_sequences(ids, offsets):
+    """
+    Splits packed (ids, offsets) into a list of lists of token IDs, one per sample.
+    """
+    ids = ids.tolist()
+    offsets = offsets.tolist()
+    return [ids[offsets[b]:offsets[b + 1]] for b in range(len(offsets) - 1)]
+
 
-    decoded_sequences = []
-    for b in range(argmax_ids.size(0)):
-        seq_ids = argmax_ids[b].tolist()
-
-        filtered = []
-        prev = None
-        for token_id in seq_ids:
-            if token_id != blank and token_id != prev:
-                filtered.append(token_id)
-            prev = token_id
-        decoded_sequences.append(filtered)
-    return decoded_sequences
+def greedy_decode_ctc(logits, blank=0, input_lengths=None):
+    """
+    Greedy decodes the model's output for a batch of samples.
+    logits shape: (batch, time, vocab_size)
+      (e.g., from LipNet forward pass).
+    input_lengths: optional (batch,) number of valid frames per sample.
+    Returns: a list of lists, where each sub-list is the decoded token IDs for that sample.
+    Use greedy_decode_ctc_packed to keep the result as tensors.
+    """
+    ids, offsets = greedy_decode_ctc_packed(logits, blank=blank, input_lengths=input_lengths)
+    return unpack_sequences(ids, offsets)
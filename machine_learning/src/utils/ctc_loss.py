@@ -33,14 +33,16 @@ class Criterion(nn.Module):
     def _get_ctc_loss(self, predictions: Tuple[Tensor, Tensor], targets: Tuple[Tensor, Tensor]) -> Tensor:
         prediction_logits, input_lengths = predictions
 
-        log_probabilities = F.log_softmax(prediction_logits, dim=2)
+        targets, target_lengths = targets
 
-        # Pytorch expects predictions to be (T, B, C)
-        log_probabilities = log_probabilities.permute(1, 0, 2)
+        # Log-softmax and CTC always run in fp32, also under bf16/fp16 autocast
+        with torch.autocast(prediction_logits.device.type, enabled=False):
+            log_probabilities = F.log_softmax(prediction_logits.float(), dim=2)
 
-        targets, target_lengths = targets
+            # Pytorch expects predictions to be (T, B, C)
+            log_probabilities = log_probabilities.permute(1, 0, 2)
 
-        ctc_loss = self.ctc_loss(log_probabilities, targets, input_lengths, target_lengths)
+            ctc_loss = self.ctc_loss(log_probabilities, targets, input_lengths, target_lengths)
 
         return ctc_loss
     
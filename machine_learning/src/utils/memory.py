@@ -0,0 +1,52 @@
+import re
+
+import torch
+
+
+def _is_cuda(device):
+    return torch.device(device).type == "cuda"
+
+
+def _proc_status_mb(field):
+    try:
+        with open("/proc/self/status") as f:
+            match = re.search(rf"{field}:\s+(\d+) kB", f.read())
+    except OSError:
+        return None
+    return int(match.group(1)) / 2**10 if match else None
+
+
+def memory_mb(device):
+    """
+    Memory in use right now: tensors allocated on the GPU, or the process' resident memory on CPU.
+    """
+    if _is_cuda(device):
+        return torch.cuda.memory_allocated(device) / 2**20
+    return _proc_status_mb("VmRSS")
+
+
+def reset_peak_memory(device):
+    """
+    Starts a new peak memory measurement. On CUDA this resets the allocator's peak;
+    on CPU it resets the process' peak resident set size (Linux only, a no-op elsewhere).
+    """
+    if _is_cuda(device):
+        torch.cuda.synchronize(device)
+        torch.cuda.reset_peak_memory_stats(device)
+        return
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_memory_mb(device):
+    """
+    Peak memory since the last reset_peak_memory(device): tensors allocated on the GPU,
+    or the whole process' resident memory on CPU. None if it can't be measured.
+    """
+    if _is_cuda(device):
+        torch.cuda.synchronize(device)
+        return torch.cuda.max_memory_allocated(device) / 2**20
+    return _proc_status_mb("VmHWM")
@@ -1,4 +1,9 @@
-from src.utils.ctc_decode import greedy_decode_ctc
+import torch
+
+from src.utils.ctc_decode import greedy_decode_ctc_packed
+from src.utils.tokenizer import char2idx
+
+SPACE_ID = char2idx[" "]
 
 def levenshtein_distance(ref, hyp):
     """
@@ -6,77 +11,162 @@ def levenshtein_distance(ref, hyp):
     ref: list of int (ground truth)
     hyp: list of int (predicted)
     """
-    # We'll build a 2D DP array where dp[i][j] represents the edit distance
-    # between ref[:i] and hyp[:j].
-    
-    # lengths
+    # dp row i holds the edit distance between ref[:i] and hyp[:j] for every j.
+    # Only the previous row is needed, so memory is O(len(hyp)).
     m, n = len(ref), len(hyp)
-    
-    # Create a matrix (m+1) x (n+1)
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-    
-    # If one sequence is empty, distance = length of the other
-    for i in range(m + 1):
-        dp[i][0] = i
-    for j in range(n + 1):
-        dp[0][j] = j
-    
-    # Fill in the DP table
+
+    # If ref is empty, distance = length of hyp prefix
+    prev = list(range(n + 1))
     for i in range(1, m + 1):
+        curr = [i] + [0] * n
         for j in range(1, n + 1):
             if ref[i - 1] == hyp[j - 1]:
-                dp[i][j] = dp[i - 1][j - 1]  # same char => no additional edit
+                curr[j] = prev[j - 1]  # same char => no additional edit
             else:
-                dp[i][j] = 1 + min(
-                    dp[i - 1][j],    # deletion
-                    dp[i][j - 1],    # insertion
-                    dp[i - 1][j - 1] # substitution
+                curr[j] = 1 + min(
+                    prev[j],      # deletion
+                    curr[j - 1],  # insertion
+                    prev[j - 1]   # substitution
                 )
-    return dp[m][n]
+        prev = curr
+    return prev[n]
+
+def pad_packed(ids, lengths, pad_value):
+    """
+    Turns a 1D tensor of concatenated sequences plus their lengths into a
+    (batch, max_length) tensor padded with pad_value.
+    """
+    lengths = torch.as_tensor(lengths, dtype=torch.long, device=ids.device)
+    max_length = int(lengths.max()) if lengths.numel() > 0 else 0
+    padded = torch.full((lengths.numel(), max_length), pad_value, dtype=ids.dtype, device=ids.device)
+    mask = torch.arange(max_length, device=ids.device).unsqueeze(0) < lengths.unsqueeze(1)
+    padded[mask] = ids
+    return padded
 
-def compute_accuracy(logits, targets, input_lengths, target_lengths, blank=0):
+def pad_sequences(sequences, pad_value):
+    """
+    Turns a list of int lists into a padded (batch, max_length) tensor and their lengths.
+    """
+    lengths = torch.tensor([len(seq) for seq in sequences], dtype=torch.long)
+    ids = torch.tensor([token for seq in sequences for token in seq], dtype=torch.long)
+    return pad_packed(ids, lengths, pad_value), lengths
+
+def batch_edit_distance(refs, ref_lengths, hyps, hyp_lengths):
+    """
+    Levenshtein distance of every (ref, hyp) pair in a batch at once.
+    refs: (B, M) padded reference ids, ref_lengths: (B,)
+    hyps: (B, N) padded hypothesis ids, hyp_lengths: (B,)
+    Returns a (B,) long tensor, identical to levenshtein_distance on each pair.
+
+    Runs the usual row recurrence one reference position at a time, vectorized over
+    the batch and over the hypothesis. Within a row the insertion term
+    row[j] = min_k(tmp[k] + (j - k)) is a cumulative minimum of tmp[k] - k,
+    so no per-column loop is needed. Memory is O(B * N).
+    """
+    batch_size, max_ref = refs.shape
+    max_hyp = hyps.shape[1]
+    device = refs.device
+    ref_lengths = torch.as_tensor(ref_lengths, dtype=torch.long, device=device)
+    hyp_lengths = torch.as_tensor(hyp_lengths, dtype=torch.long, device=device)
+
+    cols = torch.arange(max_hyp + 1, device=device)
+    row = cols.unsqueeze(0).repeat(batch_size, 1)  # dp[0][j] = j
+    batch_idx = torch.arange(batch_size, device=device)
+
+    # Empty references: distance = hypothesis length
+    distances = hyp_lengths.clone()
+
+    for i in range(1, max_ref + 1):
+        # 0 where ref[i-1] == hyp[j-1], else 1 (substitution cost)
+        cost = (refs[:, i - 1:i] != hyps).long()
+        tmp = torch.minimum(row[:, 1:] + 1, row[:, :-1] + cost)   # deletion / substitution
+        tmp = torch.cat([torch.full((batch_size, 1), i, dtype=row.dtype, device=device), tmp], dim=1)
+        row = torch.cummin(tmp - cols, dim=1).values + cols      # insertion
+
+        done = ref_lengths == i
+        if done.any():
+            distances[done] = row[batch_idx[done], hyp_lengths[done]]
+    return distances
+
+def _words_to_ids(sequences, vocab, space_id=SPACE_ID):
+    # Map every space-separated word (tuple of char ids) to a word id
+    word_sequences = []
+    for seq in sequences:
+        words, word = [], []
+        for token in seq + [space_id]:
+            if token == space_id:
+                if word:
+                    words.append(vocab.setdefault(tuple(word), len(vocab)))
+                word = []
+            else:
+                word.append(token)
+        word_sequences.append(words)
+    return word_sequences
+
+def error_rates(refs, hyps, space_id=SPACE_ID):
+    """
+    Character and word error rates for a batch of (reference, hypothesis) id sequences.
+    refs, hyps: lists of int lists (tokenizer ids, words separated by space_id)
+    Returns a dict with the corpus-level "cer" and "wer" (total edits / total reference
+    length), and per-sample "char_distances", "ref_chars", "word_distances", "ref_words".
+    """
+    ref_pad, ref_lengths = pad_sequences(refs, -1)
+    hyp_pad, hyp_lengths = pad_sequences(hyps, -2)
+    char_distances = batch_edit_distance(ref_pad, ref_lengths, hyp_pad, hyp_lengths)
+
+    vocab = {}
+    ref_words = _words_to_ids(refs, vocab, space_id)
+    hyp_words = _words_to_ids(hyps, vocab, space_id)
+    ref_pad, ref_word_lengths = pad_sequences(ref_words, -1)
+    hyp_pad, hyp_word_lengths = pad_sequences(hyp_words, -2)
+    word_distances = batch_edit_distance(ref_pad, ref_word_lengths, hyp_pad, hyp_word_lengths)
+
+    total_chars = int(ref_lengths.sum())
+    total_words = int(ref_word_lengths.sum())
+    return {
+        "cer": int(char_distances.sum()) / total_chars if total_chars > 0 else 0.0,
+        "wer": int(word_distances.sum()) / total_words if total_words > 0 else 0.0,
+        "char_distances": char_distances.tolist(),
+        "ref_chars": ref_lengths.tolist(),
+        "word_distances": word_distances.tolist(),
+        "ref_words": ref_word_lengths.tolist(),
+    }
+
+def compute_accuracy(logits, targets, input_lengths, target_lengths, blank=0, return_details=False):
     """
     Computes accuracy = 1 - (Character Error Rate),
     where CER is (LevenshteinDistance / reference_length).
-    
+
     logits: (B, T, vocab_size)
     targets: 1D Tensor of size (total_target_tokens_in_batch,)
     input_lengths: length of each sequence in frames (list/tensor, shape [B])
     target_lengths: length of each transcript (list/tensor, shape [B])
     blank: index for blank symbol (default=0)
+    return_details: also return the per-sample character distances
     """
-    batch_size = len(input_lengths)
-    
-    # 1) Greedy decode
-    decoded_preds = greedy_decode_ctc(logits, blank=blank)  # list of lists
-    
-    # 2) Reconstruct each target sequence from the 1D 'targets'
-    target_splits = []
-    idx = 0
-    for length in target_lengths:
-        seq = targets[idx:idx + length].tolist()
-        target_splits.append(seq)
-        idx += length
-    
-    # We'll accumulate total distance and total chars
-    total_distance = 0
-    total_chars = 0
-    
-    # 3) For each pair, compute the Levenshtein distance
-    for i in range(batch_size):
-        ref_seq = target_splits[i]
-        hyp_seq = decoded_preds[i]
-        
-        distance = levenshtein_distance(ref_seq, hyp_seq)
-        total_distance += distance
-        total_chars += len(ref_seq)  # normalizing by length of reference
-    
+    # 1) Greedy decode, ignoring padded frames, packed as (ids, offsets)
+    hyp_ids, hyp_offsets = greedy_decode_ctc_packed(logits.detach(), blank=blank, input_lengths=input_lengths)
+    hyp_ids, hyp_offsets = hyp_ids.cpu(), hyp_offsets.cpu()
+
+    # 2) Pad hypotheses and targets straight from their packed form
+    # (different pad values so padding never counts as a match)
+    target_lengths = torch.as_tensor(target_lengths, dtype=torch.long).cpu()
+    refs = pad_packed(targets.detach().cpu().long(), target_lengths, -1)
+    hyp_lengths = hyp_offsets[1:] - hyp_offsets[:-1]
+    hyps = pad_packed(hyp_ids, hyp_lengths, -2)
+
+    # 3) Edit distance of every pair at once
+    distances = batch_edit_distance(refs, target_lengths, hyps, hyp_lengths)
+    total_distance = int(distances.sum())
+    total_chars = int(target_lengths.sum())  # normalizing by length of reference
+
     # Avoid divide by zero
     if total_chars == 0:
-        return 1.0  # if there's literally no ground-truth chars, treat as 100% (or do something else)
-    
-    # CER (Character Error Rate) = total_distance / total_chars
-    cer = total_distance / total_chars
-    accuracy = 1.0 - cer
-    
+        accuracy = 1.0  # if there's literally no ground-truth chars, treat as 100% (or do something else)
+    else:
+        # CER (Character Error Rate) = total_distance / total_chars
+        accuracy = 1.0 - total_distance / total_chars
+
+    if return_details:
+        return accuracy, distances.tolist()
     return accuracy
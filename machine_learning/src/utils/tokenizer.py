@@ -1,6 +1,16 @@
+import hashlib
+import json
+
 ALPHABET = " ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 char2idx = {character: i + 1 for i, character in enumerate(ALPHABET)} # Leave one blank token for CTC
 
+def tokenizer_fingerprint():
+    """
+    Short hash of the character -> id mapping, stored next to pre-tokenized targets
+    (e.g. in a manifest) to tell whether they are still valid.
+    """
+    return hashlib.sha1(json.dumps(char2idx, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
 def text_to_int_sequence(text):
     text = text.upper()
     sequence = []
@@ -0,0 +1,42 @@
+import os
+
+import cv2
+import numpy as np
+
+WORDS = ["HELLO", "WORLD", "GOOD", "EVENING", "LIP", "READING", "THE", "NEWS", "AT", "SIX",
+         "TONIGHT", "WEATHER", "PRIME", "MINISTER", "SAID", "PEOPLE", "THINK", "ABOUT", "THAT", "WHICH"]
+
+
+def write_clip(folder, name, num_frames, text, size=(160, 120), rng=None):
+    # Small mvlrs-style mp4/txt pair. Frames are flat gray levels, or noise when an rng is given
+    # (noise is much harder on the decoder, closer to real footage)
+    os.makedirs(folder, exist_ok=True)
+    width, height = size
+    writer = cv2.VideoWriter(os.path.join(folder, f"{name}.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 25, (width, height))
+    for i in range(num_frames):
+        if rng is None:
+            writer.write(np.full((height, width, 3), (i * 10) % 255, dtype=np.uint8))
+        else:
+            writer.write(rng.integers(0, 255, (height, width, 3), dtype=np.uint8))
+    writer.release()
+    with open(os.path.join(folder, f"{name}.txt"), "w", encoding="utf-8") as f:
+        f.write(f"Text:  {text}\nConf:  4\n")
+
+
+def write_mvlrs_tree(root, mode="main", num_speakers=2, clips_per_speaker=2, num_frames=(40, 75),
+                     size=(160, 160), seed=0):
+    """
+    Synthetic data/mvlrs_v1-style tree: root/mode/<speaker>/<nnnnn>.{mp4,txt} with random
+    noise frames, clip lengths drawn from num_frames=(min, max) and 2-6 word transcripts.
+    Returns the clip paths (without extension).
+    """
+    rng = np.random.default_rng(seed)
+    paths = []
+    for speaker in range(num_speakers):
+        folder = os.path.join(root, mode, f"{speaker:019d}")
+        for clip in range(1, clips_per_speaker + 1):
+            length = int(rng.integers(num_frames[0], num_frames[1] + 1))
+            text = " ".join(rng.choice(WORDS, int(rng.integers(2, 7))))
+            write_clip(folder, f"{clip:05d}", length, text, size=size, rng=rng)
+            paths.append(os.path.join(folder, f"{clip:05d}"))
+    return paths
@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+import pytest
+import torch
+
+from src.dataset.BBC_dataset import BBCNewsVideoDataset
+from src.dataset.clip_cache import build_clip_cache, resize_clip
+from src.dataset.transforms import read_clip
+from tests.fixtures import write_clip
+
+
+def test_cached_dataset_matches_decoded(tmp_path):
+    root = tmp_path / "mvlrs_v1"
+    write_clip(str(root / "main" / "spk1"), "00001", 12, "HELLO WORLD")
+    write_clip(str(root / "main" / "spk2"), "00001", 7, "LIP READING")
+
+    dataset = BBCNewsVideoDataset(str(root), mode="main")
+    # Tiny shard size forces one clip per shard
+    index = build_clip_cache(dataset, str(tmp_path / "cache"), shard_size_mb=0)
+    assert len(index["shards"]) == 2
+
+    cached = BBCNewsVideoDataset(str(root), mode="main", cache_dir=str(tmp_path / "cache"))
+    assert len(cached) == len(dataset)
+
+    for idx in range(len(dataset)):
+        frames, transcript = cached[idx]
+        expected = resize_clip(dataset.read_video_array(dataset.data[idx][0]))
+        expected = torch.from_numpy(expected).permute(0, 3, 1, 2).float() / 255.0
+
+        assert transcript == dataset.parse_transcript(dataset.data[idx][1])
+        assert frames.shape == (expected.shape[0], 3, 50, 100)
+        assert torch.allclose(frames, expected)
+
+    # The cache only serves the split it was built from
+    with pytest.raises(ValueError, match="'main' clips, not 'pretrain'"):
+        BBCNewsVideoDataset(str(root), mode="pretrain", cache_dir=str(tmp_path / "cache"))
+    with pytest.raises(ValueError, match="was built from"):
+        BBCNewsVideoDataset(str(tmp_path / "elsewhere"), mode="main", cache_dir=str(tmp_path / "cache"))
+
+
+class UnderReportingCapture:
+    # cv2.VideoCapture stand-in whose container header claims fewer frames than it has
+    def __init__(self, num_frames, reported):
+        self.frames = [np.full((4, 6, 3), i, dtype=np.uint8) for i in range(num_frames)]
+        self.reported = reported
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_COUNT: self.reported, cv2.CAP_PROP_FRAME_HEIGHT: 4,
+                cv2.CAP_PROP_FRAME_WIDTH: 6}[prop]
+
+    def read(self, image):
+        if not self.frames:
+            return False, None
+        image[...] = self.frames.pop(0)
+        return True, image
+
+
+def test_read_clip_only_grows_the_buffer_for_extra_frames(tmp_path, monkeypatch):
+    concatenate_calls = []
+    real_concatenate = np.concatenate
+    monkeypatch.setattr(np, "concatenate", lambda *a, **kw: concatenate_calls.append(1) or real_concatenate(*a, **kw))
+
+    write_clip(str(tmp_path), "00001", 12, "HELLO")
+    for max_frames in (75, None):
+        cap = cv2.VideoCapture(str(tmp_path / "00001.mp4"))
+        assert read_clip(cap, max_frames).shape[0] == 12
+        cap.release()
+    assert not concatenate_calls  # hitting EOF doesn't copy the clip
+
+    clip = read_clip(UnderReportingCapture(num_frames=7, reported=3))
+    assert clip[:, 0, 0, 0].tolist() == list(range(7))
+    assert concatenate_calls
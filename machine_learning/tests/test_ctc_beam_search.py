@@ -0,0 +1,53 @@
+import itertools
+import math
+
+import torch
+
+from src.utils.char_lm import CharNGramLM
+from src.utils.ctc_beam_search import ctc_prefix_beam_search
+from src.utils.ctc_decode import greedy_decode_ctc
+
+
+def exact_best_sequence(log_probs, blank=0):
+    # Sum every alignment's probability into its collapsed label sequence
+    totals = {}
+    num_frames, vocab_size = log_probs.shape
+    for path in itertools.product(range(vocab_size), repeat=num_frames):
+        labels, prev = [], None
+        for token in path:
+            if token != blank and token != prev:
+                labels.append(token)
+            prev = token
+        p = math.exp(sum(log_probs[t, token].item() for t, token in enumerate(path)))
+        totals[tuple(labels)] = totals.get(tuple(labels), 0.0) + p
+    best = max(totals, key=totals.get)
+    return list(best), math.log(totals[best])
+
+
+def test_beam_search_is_exact_with_wide_beam():
+    torch.manual_seed(0)
+    logits = torch.randn(3, 5, 4)
+    decoded, scores = ctc_prefix_beam_search(logits, beam_width=64, top_k=4, prune_threshold=0, return_scores=True)
+    for b in range(3):
+        best, score = exact_best_sequence(torch.log_softmax(logits[b], dim=1))
+        assert decoded[b] == best
+        assert abs(scores[b] - score) < 1e-4
+
+
+def test_beam_search_respects_lengths_and_peaked_outputs():
+    # Confident outputs decode the same as greedy
+    argmax = torch.randint(0, 28, (4, 30))
+    logits = torch.nn.functional.one_hot(argmax, num_classes=28).float() * 20
+    input_lengths = torch.tensor([30, 20, 10, 1])
+    assert ctc_prefix_beam_search(logits, beam_width=8, input_lengths=input_lengths) == \
+        greedy_decode_ctc(logits, input_lengths=input_lengths)
+
+
+def test_char_lm_round_trip(tmp_path):
+    lm = CharNGramLM.train(["HELLO WORLD", "HELLO THERE"], order=3)
+    assert lm.log_probs.shape == (28 * 28, 28)
+    path = str(tmp_path / "lm.npz")
+    lm.save(path)
+    loaded = CharNGramLM.load(path)
+    assert loaded.order == 3
+    assert loaded.score_sequence([8, 5, 12]) == lm.score_sequence([8, 5, 12])
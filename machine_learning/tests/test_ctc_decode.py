@@ -0,0 +1,40 @@
+import torch
+
+from src.utils.ctc_decode import greedy_decode_ctc, greedy_decode_ctc_packed
+
+
+def reference_greedy_decode(logits, blank=0, input_lengths=None):
+    # The original per-timestep Python loop
+    argmax_ids = logits.argmax(dim=2)
+    decoded_sequences = []
+    for b in range(argmax_ids.size(0)):
+        seq_ids = argmax_ids[b].tolist()
+        if input_lengths is not None:
+            seq_ids = seq_ids[:int(input_lengths[b])]
+        filtered = []
+        prev = None
+        for token_id in seq_ids:
+            if token_id != blank and token_id != prev:
+                filtered.append(token_id)
+            prev = token_id
+        decoded_sequences.append(filtered)
+    return decoded_sequences
+
+
+def test_greedy_decode_matches_reference():
+    torch.manual_seed(0)
+    # Few classes so repeats and blanks are frequent
+    logits = torch.randn(16, 40, 4)
+    assert greedy_decode_ctc(logits) == reference_greedy_decode(logits)
+
+    input_lengths = torch.randint(0, 41, (16,))
+    assert greedy_decode_ctc(logits, input_lengths=input_lengths) == reference_greedy_decode(logits, input_lengths=input_lengths)
+
+
+def test_greedy_decode_packed_offsets():
+    # blank=0; sample 0 => [1, 2, 1], sample 1 => [3]
+    argmax = torch.tensor([[1, 1, 0, 2, 2, 0, 1], [0, 3, 3, 3, 0, 0, 0]])
+    logits = torch.nn.functional.one_hot(argmax, num_classes=4).float()
+    ids, offsets = greedy_decode_ctc_packed(logits)
+    assert ids.tolist() == [1, 2, 1, 3]
+    assert offsets.tolist() == [0, 3, 4]
@@ -1,15 +1,11 @@
 from torch.utils.data import DataLoader
-import torchvision.transforms as T
 
 from src.dataset.BBC_dataset import BBCNewsVideoDataset, collate_fn_ctc
+from src.dataset.transforms import ClipTransform
 
 root_dir = "data/mvlrs_v1"
 
-transform = T.Compose([
-    T.ToPILImage(),
-    T.Resize((50,100)),  # (H, W)
-    T.ToTensor()
-])
+transform = ClipTransform((50, 100))  # (H, W)
 
 # Create a dataset for the 'pretrain' directory
 pretrain_dataset = BBCNewsVideoDataset(root_dir, mode='pretrain', transform=transform)
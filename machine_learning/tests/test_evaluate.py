@@ -0,0 +1,103 @@
+import json
+
+import pytest
+import torch
+from torch.utils.data import Dataset, Subset
+
+from src.models.lipnet import LipNet
+from src.training.evaluate import evaluate, make_eval_loader
+
+
+class FakeSplit(Dataset):
+    # Mimics BBCNewsVideoDataset: (T, C, H, W) frames + transcript, clip lengths known up front
+    def __init__(self, lengths):
+        g = torch.Generator().manual_seed(0)
+        self.root_dir = "split"
+        self.lengths = lengths
+        self.data = [(f"split/spk/{i:05d}.mp4", f"split/spk/{i:05d}.txt") for i in range(len(lengths))]
+        self.clips = [torch.rand(t, 3, 50, 100, generator=g) for t in lengths]
+        self.transcripts = [f"WORD {chr(65 + i)}" for i in range(len(lengths))]
+
+    def __len__(self):
+        return len(self.clips)
+
+    def clip_lengths(self):
+        return self.lengths
+
+    def __getitem__(self, idx):
+        return self.clips[idx], self.transcripts[idx]
+
+
+def test_evaluate_writes_per_utterance_results(tmp_path):
+    torch.manual_seed(0)
+    dataset = FakeSplit([6, 11, 8, 11, 5, 9])
+    loader = make_eval_loader(Subset(dataset, [5, 0, 1, 2, 3]), batch_size=2, num_workers=0)
+    # Length-sorted batches
+    assert [batch[2].tolist() for batch in loader] == [[11, 11], [9, 8], [6]]
+
+    model = LipNet().train()
+    output_path = str(tmp_path / "eval.json")
+    results = evaluate(model, loader, "cpu", output_path=output_path)
+    assert model.training  # restored for training
+
+    assert results["num_utterances"] == 5
+    by_id = {u["id"]: u for u in results["utterances"]}
+    assert sorted(by_id) == ["spk/00000.mp4", "spk/00001.mp4", "spk/00002.mp4", "spk/00003.mp4", "spk/00005.mp4"]
+    for i in (0, 1, 2, 3, 5):
+        assert by_id[f"spk/{i:05d}.mp4"]["reference"] == dataset.transcripts[i]
+
+    total_chars = sum(u["ref_chars"] for u in results["utterances"])
+    assert results["cer"] == sum(u["char_errors"] for u in results["utterances"]) / total_chars
+    with open(output_path) as f:
+        assert json.load(f)["cer"] == results["cer"]
+
+
+def test_sharded_eval_loaders_split_the_batches_without_padding():
+    dataset = FakeSplit([6, 11, 8, 11, 5, 9, 7])
+    shards = [[batch[4].tolist() for batch in make_eval_loader(dataset, batch_size=2, num_workers=0,
+                                                               num_replicas=3, rank=rank)]
+              for rank in range(3)]
+    whole = [batch[4].tolist() for batch in make_eval_loader(dataset, batch_size=2, num_workers=0)]
+    # Every rank takes every third batch; no utterance is repeated to even out the shards
+    assert shards == [whole[0::3], whole[1::3], whole[2::3]]
+    assert sorted(idx for shard in shards for batch in shard for idx in batch) == list(range(7))
+
+
+def test_evaluate_max_batches():
+    torch.manual_seed(0)
+    loader = make_eval_loader(FakeSplit([6, 11, 8, 11, 5]), batch_size=2, num_workers=0)
+    results = evaluate(LipNet(), loader, "cpu", max_batches=2)
+    assert results["num_utterances"] == 4
+
+
+def _evaluate_shard(rank, world_size, init_file, output_path, results_path):
+    torch.distributed.init_process_group("gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size)
+    try:
+        torch.manual_seed(0)
+        loader = make_eval_loader(FakeSplit([6, 11, 8, 11, 5, 9]), batch_size=2, num_workers=0,
+                                  num_replicas=world_size, rank=rank)
+        results = evaluate(LipNet(), loader, "cpu", output_path=output_path)
+        with open(f"{results_path}.{rank}", "w") as f:
+            json.dump(results, f)
+    finally:
+        torch.distributed.destroy_process_group()
+
+
+def test_distributed_evaluate_gathers_every_shard(tmp_path):
+    torch.manual_seed(0)
+    loader = make_eval_loader(FakeSplit([6, 11, 8, 11, 5, 9]), batch_size=2, num_workers=0)
+    expected = evaluate(LipNet(), loader, "cpu")
+
+    output_path, results_path = str(tmp_path / "eval.json"), str(tmp_path / "results")
+    torch.multiprocessing.spawn(_evaluate_shard, args=(2, str(tmp_path / "init"), output_path, results_path),
+                                nprocs=2)
+    for rank in range(2):
+        with open(f"{results_path}.{rank}") as f:
+            results = json.load(f)
+        # Both ranks see the whole split (two batches from rank 0, one from rank 1)
+        assert results["num_utterances"] == 6
+        assert sorted(u["id"] for u in results["utterances"]) == sorted(u["id"] for u in expected["utterances"])
+        assert results["cer"] == pytest.approx(expected["cer"])
+        assert results["wer"] == pytest.approx(expected["wer"])
+    with open(output_path) as f:
+        assert json.load(f)["num_utterances"] == 6
@@ -0,0 +1,14 @@
+from src.dataset.BBC_dataset import BBCNewsVideoDataset, collate_fn_ctc
+from src.dataset.transforms import ClipTransform
+from tests.fixtures import write_mvlrs_tree
+
+
+def test_synthetic_mvlrs_tree_loads_like_the_real_one(tmp_path):
+    paths = write_mvlrs_tree(str(tmp_path), num_speakers=2, clips_per_speaker=2, num_frames=(10, 20))
+    dataset = BBCNewsVideoDataset(str(tmp_path), mode="main", transform=ClipTransform((50, 100)))
+    assert [video_path[:-4] for video_path, _ in dataset.data] == sorted(paths)
+
+    items = [dataset[idx] for idx in range(len(dataset))]
+    assert all(10 <= frames.shape[0] <= 20 and frames.shape[1:] == (3, 50, 100) for frames, _ in items)
+    frames, targets, input_lengths, target_lengths = collate_fn_ctc(items)
+    assert frames.shape[0] == 4 and targets.numel() == target_lengths.sum()
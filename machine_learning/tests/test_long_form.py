@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+import torch
+
+from src.training.long_form import iter_chunks, transcribe_long_video
+
+
+def write_video(path, labels):
+    # Frame t is a flat gray level encoding its label
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (100, 50))
+    for label in labels:
+        writer.write(np.full((50, 100, 3), label * 9, dtype=np.uint8))
+    writer.release()
+
+
+class FrameLabelModel:
+    # Per-frame "model": logits peak at the label encoded in each frame's brightness
+    def eval(self):
+        return self
+
+    def __call__(self, x):
+        labels = (x.mean(dim=(1, 3, 4)) * 255 / 9).round().long()  # (B, T)
+        return torch.nn.functional.one_hot(labels, 28).float()
+
+
+def test_chunks_overlap_and_cover_the_video(tmp_path):
+    path = str(tmp_path / "long.avi")
+    write_video(path, [0] * 110)
+    cap = cv2.VideoCapture(path)
+    chunks = [(start, chunk.shape[0]) for start, chunk in iter_chunks(cap, chunk_size=40, overlap=10)]
+    cap.release()
+    assert chunks == [(0, 40), (30, 40), (60, 40), (90, 20)]
+
+
+def test_stitched_transcript_matches_the_whole_video(tmp_path):
+    # Repeated labels straddle chunk boundaries; blanks (0) separate the double letters
+    rng = np.random.default_rng(0)
+    labels = np.repeat(rng.integers(0, 28, 60), rng.integers(1, 6, 60)).tolist()
+    path = str(tmp_path / "long.avi")
+    write_video(path, labels)
+
+    expected = [label for t, label in enumerate(labels) if label != 0 and (t == 0 or labels[t - 1] != label)]
+    for chunk_size, overlap in ((30, 8), (25, 0), (64, 21)):
+        ids, frames = transcribe_long_video(FrameLabelModel(), path, chunk_size=chunk_size, overlap=overlap,
+                                            return_frames=True)
+        assert ids == expected
+        assert [labels[t] for t in frames] == ids
@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from src.dataset.BBC_dataset import BBCNewsVideoDataset
+from src.dataset.manifest import build_manifest
+from src.utils.tokenizer import text_to_int_sequence, tokenizer_fingerprint
+from tests.fixtures import write_clip
+
+
+def test_manifest_incremental_refresh(tmp_path):
+    root = tmp_path / "mvlrs_v1"
+    manifest_path = str(tmp_path / "main_manifest.json")
+    write_clip(str(root / "main" / "spk1"), "00001", 12, "HELLO WORLD")
+    write_clip(str(root / "main" / "spk1"), "00002", 9, "GOOD EVENING")
+
+    manifest = build_manifest(str(root), "main", manifest_path, num_workers=2)
+    assert [clip["num_frames"] for clip in manifest["clips"]] == [12, 9]
+    assert manifest["clips"][0]["width"] == 160 and manifest["clips"][0]["height"] == 120
+
+    # One clip changes, one is added, one is removed
+    write_clip(str(root / "main" / "spk1"), "00002", 5, "GOOD NIGHT")
+    write_clip(str(root / "main" / "spk2"), "00001", 6, "NEW SPEAKER")
+    os.remove(str(root / "main" / "spk1" / "00001.txt"))
+
+    manifest = build_manifest(str(root), "main", manifest_path, num_workers=2)
+    assert [clip["video"] for clip in manifest["clips"]] == [os.path.join("spk1", "00002.mp4"), os.path.join("spk2", "00001.mp4")]
+    assert manifest["clips"][0]["transcript"] == "GOOD NIGHT"
+
+    scanned = BBCNewsVideoDataset(str(root), mode="main")
+    from_manifest = BBCNewsVideoDataset(str(root), mode="main", manifest_path=manifest_path)
+    assert from_manifest.data == scanned.data
+    for idx in range(len(scanned)):
+        assert from_manifest[idx][1] == scanned[idx][1]
+        assert from_manifest.num_frames[idx] == scanned[idx][0].shape[0]
+
+
+def test_manifest_target_ids_follow_the_tokenizer(tmp_path):
+    root = tmp_path / "mvlrs_v1"
+    manifest_path = str(tmp_path / "main_manifest.json")
+    write_clip(str(root / "main" / "spk1"), "00001", 6, "HELLO WORLD")
+    manifest = build_manifest(str(root), "main", manifest_path, num_workers=1)
+    assert manifest["tokenizer"] == tokenizer_fingerprint()
+    assert manifest["clips"][0]["target_ids"] == text_to_int_sequence("HELLO WORLD")
+
+    dataset = BBCNewsVideoDataset(str(root), mode="main", manifest_path=manifest_path, tokenized=True)
+    assert dataset[0][1] == text_to_int_sequence("HELLO WORLD")
+    assert BBCNewsVideoDataset(str(root), mode="main", tokenized=True)[0][1] == dataset[0][1]
+
+    # Ids written by another tokenizer are rebuilt, by the dataset and by the next refresh
+    manifest["tokenizer"] = "stale"
+    manifest["clips"][0]["target_ids"] = [1, 2, 3]
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    dataset = BBCNewsVideoDataset(str(root), mode="main", manifest_path=manifest_path, tokenized=True)
+    assert dataset[0][1] == text_to_int_sequence("HELLO WORLD")
+    manifest = build_manifest(str(root), "main", manifest_path, num_workers=1)
+    assert manifest["clips"][0]["target_ids"] == text_to_int_sequence("HELLO WORLD")
+
+
+def test_manifest_of_another_split_is_rejected(tmp_path):
+    root = tmp_path / "mvlrs_v1"
+    manifest_path = str(tmp_path / "pretrain_manifest.json")
+    write_clip(str(root / "pretrain" / "spk1"), "00001", 6, "HELLO WORLD")
+    build_manifest(str(root), "pretrain", manifest_path, num_workers=1)
+    with pytest.raises(ValueError, match="'pretrain' clips, not 'main'"):
+        BBCNewsVideoDataset(str(root), mode="main", manifest_path=manifest_path)
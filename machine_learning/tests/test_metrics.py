@@ -0,0 +1,63 @@
+import random
+
+import torch
+
+from src.utils.ctc_decode import greedy_decode_ctc
+from src.utils.metrics import batch_edit_distance, compute_accuracy, error_rates, levenshtein_distance, pad_sequences
+
+
+def reference_levenshtein(ref, hyp):
+    # The original full-table implementation
+    m, n = len(ref), len(hyp)
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    for i in range(m + 1):
+        dp[i][0] = i
+    for j in range(n + 1):
+        dp[0][j] = j
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            if ref[i - 1] == hyp[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1]
+            else:
+                dp[i][j] = 1 + min(dp[i - 1][j], dp[i][j - 1], dp[i - 1][j - 1])
+    return dp[m][n]
+
+
+def random_batch(batch_size, seed):
+    rng = random.Random(seed)
+    refs = [[rng.randint(1, 5) for _ in range(rng.randint(0, 20))] for _ in range(batch_size)]
+    hyps = [[rng.randint(1, 5) for _ in range(rng.randint(0, 20))] for _ in range(batch_size)]
+    return refs, hyps
+
+
+def test_batch_edit_distance_matches_reference():
+    refs, hyps = random_batch(200, seed=0)
+    ref_pad, ref_lengths = pad_sequences(refs, -1)
+    hyp_pad, hyp_lengths = pad_sequences(hyps, -2)
+    distances = batch_edit_distance(ref_pad, ref_lengths, hyp_pad, hyp_lengths).tolist()
+    expected = [reference_levenshtein(r, h) for r, h in zip(refs, hyps)]
+    assert distances == expected
+    assert [levenshtein_distance(r, h) for r, h in zip(refs, hyps)] == expected
+
+
+def test_error_rates_words():
+    # "AB CD" vs "AB CE X": one substituted word and one inserted word
+    space = 1
+    ref = [2, 3, space, 4, 5]
+    hyp = [2, 3, space, 4, 6, space, 7]
+    rates = error_rates([ref], [hyp])
+    assert rates["word_distances"] == [2] and rates["ref_words"] == [2]
+    assert rates["char_distances"] == [3] and rates["wer"] == 1.0
+
+
+def test_compute_accuracy_matches_per_sample_loop():
+    torch.manual_seed(0)
+    logits = torch.randn(8, 30, 6)
+    input_lengths = torch.randint(1, 31, (8,))
+    target_lengths = torch.randint(0, 12, (8,))
+    targets = torch.randint(1, 6, (int(target_lengths.sum()),))
+
+    hyps = greedy_decode_ctc(logits, input_lengths=input_lengths)
+    refs = torch.split(targets, target_lengths.tolist())
+    total = sum(reference_levenshtein(r.tolist(), h) for r, h in zip(refs, hyps))
+    assert compute_accuracy(logits, targets, input_lengths, target_lengths) == 1.0 - total / int(target_lengths.sum())
@@ -0,0 +1,85 @@
+import numpy as np
+import torch
+
+from src.dataset.BBC_dataset import BBCNewsVideoDataset
+from src.dataset.clip_cache import build_clip_cache
+from src.dataset.mouth_crop import MouthCropper
+from src.dataset.transforms import ClipTransform
+from tests.fixtures import write_clip
+
+
+class BrightSpotDetector:
+    # Stand-in for the face detector: the mouth is the brightest pixel, 40 px wide
+    def __call__(self, frame):
+        if frame.max() == frame.min():
+            return None
+        y, x = np.unravel_index(frame.max(axis=2).argmax(), frame.shape[:2])
+        return float(x), float(y), 40.0
+
+
+def moving_spot_clip(num_frames=10, jitter=(0, 6)):
+    clip = np.zeros((num_frames, 120, 160, 3), dtype=np.uint8)
+    for t in range(num_frames):
+        clip[t, 60, 50 + 4 * t + jitter[t % 2]] = 255
+    return clip
+
+
+def test_mouth_cropper_smooths_and_interpolates_boxes():
+    clip = moving_spot_clip()
+    clip[3] = 0  # missed detection
+    cropper = MouthCropper(size=(50, 100), smoothing_window=3, detector=BrightSpotDetector())
+
+    boxes = cropper.boxes(clip)
+    assert boxes.shape == (10, 3)
+    assert np.allclose(boxes[:, 1], 60) and np.allclose(boxes[:, 2], 40)
+    # Jitter of the raw detections (6 px every other frame) is averaged out
+    assert np.abs(np.diff(boxes[1:-1, 0]) - 4).max() < 2.5
+
+    crops = cropper(clip)
+    assert crops.shape == (10, 50, 100, 3) and crops.dtype == np.uint8
+
+
+def test_mouth_cropper_falls_back_to_a_fixed_box():
+    clip = np.zeros((4, 120, 160, 3), dtype=np.uint8)
+    cropper = MouthCropper(detector=BrightSpotDetector(), fallback=(0.5, 0.75, 0.5))
+    assert np.allclose(cropper.boxes(clip), [[80, 90, 80]] * 4)
+
+
+def test_cropped_cache_matches_on_the_fly_crop(tmp_path):
+    root = tmp_path / "mvlrs_v1"
+    write_clip(str(root / "main" / "spk1"), "00001", 9, "HELLO WORLD")
+    write_clip(str(root / "main" / "spk2"), "00001", 6, "LIP READING")
+    cropper = MouthCropper(detector=BrightSpotDetector())
+
+    dataset = BBCNewsVideoDataset(str(root), mode="main")
+    index = build_clip_cache(dataset, str(tmp_path / "cache"), crop=cropper, num_workers=2)
+    assert index["crop"] == "MouthCropper"
+
+    cached = BBCNewsVideoDataset(str(root), mode="main", cache_dir=str(tmp_path / "cache"),
+                                 transform=ClipTransform((50, 100)))
+    on_the_fly = BBCNewsVideoDataset(str(root), mode="main", transform=ClipTransform((50, 100), crop=cropper))
+    for idx in range(len(dataset)):
+        assert torch.equal(cached[idx][0], on_the_fly[idx][0])
+
+
+def test_streaming_cropper_smooths_across_chunks():
+    clip = moving_spot_clip(12)
+    clip[:2] = 0  # no face yet
+    cropper = MouthCropper(size=(50, 100), smoothing_window=3, detect_every=2, detector=BrightSpotDetector())
+
+    whole = cropper.stream().boxes(clip)
+    stream = cropper.stream()
+    chunked = np.concatenate([stream.boxes(clip[i:i + 5]) for i in range(0, 12, 5)])
+    # Chunk boundaries don't change the boxes: the detection grid and the history carry over
+    assert np.allclose(chunked, whole)
+
+    assert np.allclose(whole[:2], [[80, 86.4, 80]] * 2)  # default fallback box
+    raw = [50 + 4 * t + (0, 6)[t % 2] for t in range(12)]
+    # Detections at even frames, held in between, trailing mean over 3 frames
+    held = [raw[t - t % 2] for t in range(2, 12)]
+    expected = [np.mean(held[max(0, i - 2):i + 1]) for i in range(10)]
+    assert np.allclose(whole[2:, 0], expected)
+
+    stream.reset()
+    assert np.allclose(stream.boxes(clip), whole)
+    assert stream(clip[:4]).shape == (4, 50, 100, 3)
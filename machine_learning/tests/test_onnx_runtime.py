@@ -0,0 +1,31 @@
+import pytest
+import torch
+
+from src.models.lipnet import LipNet
+from src.training.onnx_runtime import OnnxLipNet, check_onnx_parity, export_onnx
+
+pytest.importorskip("onnxruntime")
+
+
+def test_onnx_export_matches_pytorch_on_dynamic_lengths(tmp_path):
+    torch.manual_seed(0)
+    model = LipNet().eval()
+    path = str(tmp_path / "lipnet.onnx")
+    export_onnx(model, path)
+
+    onnx_model = OnnxLipNet(path, intra_op_threads=1)
+    diffs = check_onnx_parity(model, onnx_model, lengths=(12, 40), batch_size=2)
+    assert set(diffs) == {12, 40}
+
+    # Padded batch with lengths: each clip's logits match running it on its own, unpadded
+    x = torch.rand(3, 3, 30, 50, 100)
+    lengths = torch.tensor([30, 18, 30])
+    logits = onnx_model(x, lengths)
+    assert logits.shape == (3, 30, 28)
+    for i, length in enumerate(lengths.tolist()):
+        with torch.no_grad():
+            expected = model(x[i:i + 1, :, :length])[0]
+        assert torch.allclose(logits[i, :length], expected, atol=1e-4)
+        assert not logits[i, length:].any()
+    # IO bindings are reused per (batch size, length)
+    assert set(onnx_model._bindings) >= {(2, 30), (1, 18)}
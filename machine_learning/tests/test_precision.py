@@ -0,0 +1,33 @@
+import pytest
+import torch
+
+from src.models.lipnet import LipNet
+from src.training.precision import autocast, grad_scaler
+from src.utils.ctc_loss import Criterion
+
+
+def test_bf16_training_step_keeps_loss_in_fp32():
+    torch.manual_seed(0)
+    model = LipNet().train()
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-4)
+    scaler = grad_scaler("cpu", "bf16")
+    assert not scaler.is_enabled()
+
+    frames = torch.rand(2, 3, 12, 50, 100)
+    targets = torch.randint(1, 28, (8,))
+    input_lengths, target_lengths = torch.tensor([12, 12]), torch.tensor([4, 4])
+    with autocast("cpu", "bf16"):
+        logits = model(frames)
+        loss = Criterion()((logits, input_lengths), (targets, target_lengths))["overall"]
+    assert logits.dtype == torch.bfloat16
+    assert loss.dtype == torch.float32 and torch.isfinite(loss)
+
+    scaler.scale(loss).backward()
+    scaler.step(optimizer)
+    scaler.update()
+    assert all(p.dtype == torch.float32 for p in model.parameters())
+
+
+def test_unknown_precision_is_rejected():
+    with pytest.raises(ValueError):
+        autocast("cpu", "int8")
@@ -0,0 +1,51 @@
+import csv
+import json
+
+import pytest
+
+from src.training.profiling import StepTimer, append_record
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def test_step_timer_splits_data_wait_and_samples_phases():
+    clock = FakeClock()
+    timer = StepTimer("cpu", sample_every=2, clock=clock)
+    for step in range(4):
+        clock.advance(0.5)  # waiting on the DataLoader
+        timer.data_ready()
+        with timer.phase("forward"):
+            clock.advance(0.25 if step % 2 == 0 else 10.0)  # only steps 0 and 2 are sampled
+        clock.advance(0.25)
+        timer.end_step(num_samples=8, num_frames=600)
+
+    summary = timer.summary()
+    assert timer.sampled_steps == 2
+    assert summary["steps"] == 4
+    assert summary["wall_s"] == 23.5
+    assert summary["data_wait_fraction"] == 2.0 / 23.5
+    assert summary["forward_ms"] == 250.0
+    assert summary["step_ms"] == 1000.0 * 21.5 / 4
+    assert summary["samples_per_s"] == pytest.approx(32 / 23.5)
+    assert summary["frames_per_s"] == pytest.approx(summary["samples_per_s"] * 75)
+
+
+def test_append_record_writes_csv_and_json_lines(tmp_path):
+    for name in ("perf.csv", "perf.jsonl"):
+        path = str(tmp_path / name)
+        append_record(path, {"epoch": 0, "samples_per_s": 1.5})
+        append_record(path, {"epoch": 1, "samples_per_s": 2.5})
+
+    with open(tmp_path / "perf.csv", newline="") as f:
+        assert [row["samples_per_s"] for row in csv.DictReader(f)] == ["1.5", "2.5"]
+    with open(tmp_path / "perf.jsonl") as f:
+        assert [json.loads(line)["epoch"] for line in f] == [0, 1]
@@ -0,0 +1,35 @@
+import torch
+
+from src.models.lipnet import LipNet
+from src.models.quantization import load_quantized_lipnet, quantize_lipnet, save_quantized_lipnet
+
+
+def test_quantized_lipnet_round_trips_through_checkpoint(tmp_path):
+    torch.manual_seed(0)
+    model = LipNet().eval()
+    # Streamed like the calibration DataLoader in scripts/quantize_lipnet.py
+    calibration = (torch.rand(2, 3, 20, 50, 100) for _ in range(3))
+    quantized = quantize_lipnet(model, dynamic=True, static_stcnn=True, calibration_batches=calibration)
+
+    x = torch.rand(2, 3, 24, 50, 100)
+    lengths = torch.tensor([24, 15])
+    with torch.no_grad():
+        expected = model(x, lengths)
+        out = quantized(x, lengths)
+    assert out.shape == expected.shape
+    # int8 error stays small next to the logits themselves
+    assert (out - expected).abs().max() < 0.1 * expected.abs().max() + 0.05
+    assert quantized.stcnn.temporal_context == model.stcnn.temporal_context
+
+    path = tmp_path / "lipnet_int8.pth"
+    save_quantized_lipnet(quantized, path, dynamic=True, static_stcnn=True)
+    loaded = load_quantized_lipnet(str(path))
+    with torch.no_grad():
+        assert torch.equal(loaded(x, lengths), out)
+
+
+def test_quantize_lipnet_leaves_the_process_engine_alone():
+    engine = torch.backends.quantized.engine
+    other = "fbgemm" if engine != "fbgemm" else "x86"
+    quantize_lipnet(LipNet().eval(), dynamic=True, static_stcnn=False, engine=other)
+    assert torch.backends.quantized.engine == engine
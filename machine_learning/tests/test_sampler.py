@@ -0,0 +1,46 @@
+import torch
+
+from src.dataset.BBC_dataset import collate_fn_ctc
+from src.dataset.sampler import BucketBatchSampler, padding_ratio
+
+
+def test_bucket_sampler_covers_dataset_and_pads_less():
+    g = torch.Generator().manual_seed(0)
+    lengths = torch.randint(10, 76, (1000,), generator=g).tolist()
+    sampler = BucketBatchSampler(lengths, batch_size=32, pool_batches=10)
+
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+
+    random_batches = [list(range(i, min(i + 32, 1000))) for i in range(0, 1000, 32)]
+    assert sampler.padding_ratio() < padding_ratio(random_batches, lengths)
+
+    # Different epochs give different batches
+    sampler.set_epoch(1)
+    assert list(sampler) != batches
+
+
+def test_collate_matches_pad_and_stack():
+    batch = [(torch.rand(t, 3, 5, 10), "AB C") for t in (4, 9, 6)]
+    frames, targets, input_lengths, target_lengths = collate_fn_ctc(list(batch))
+
+    assert frames.shape == (3, 9, 3, 5, 10)
+    assert input_lengths.tolist() == [9, 6, 4]
+    assert target_lengths.tolist() == [4, 4, 4]
+    for i, (video, _) in enumerate(sorted(batch, key=lambda x: x[0].shape[0], reverse=True)):
+        padded = torch.nn.functional.pad(video, (0, 0, 0, 0, 0, 0, 0, 9 - video.shape[0]))
+        assert torch.equal(frames[i], padded)
+
+
+def test_bucket_sampler_shards_batches_across_ranks():
+    lengths = torch.randint(10, 76, (1000,), generator=torch.Generator().manual_seed(0)).tolist()
+    full = list(BucketBatchSampler(lengths, batch_size=32, pool_batches=10))
+    shards = [BucketBatchSampler(lengths, batch_size=32, pool_batches=10, num_replicas=3, rank=rank)
+              for rank in range(3)]
+
+    # Equal number of batches per rank, together covering every batch of the single-process sampler
+    assert all(len(list(shard)) == len(shard) == len(shards[0]) for shard in shards)
+    sharded = [batch for shard in shards for batch in shard]
+    assert all(batch in sharded for batch in full)
+    assert len(sharded) == len(shards[0]) * 3 >= len(full)
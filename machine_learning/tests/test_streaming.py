@@ -0,0 +1,53 @@
+import numpy as np
+import torch
+
+from src.dataset.transforms import ClipTransform
+from src.models.lipnet import LipNet
+from src.training.streaming import StreamingLipNet
+
+
+def test_streaming_features_match_offline_pass():
+    torch.manual_seed(0)
+    model = LipNet().eval()
+    frames = np.random.default_rng(0).integers(0, 255, (40, 60, 120, 3), dtype=np.uint8)
+
+    with torch.no_grad():
+        clip = ClipTransform((50, 100))(frames)  # (T, 3, H, W)
+        offline = model.stcnn(clip.permute(1, 0, 2, 3).unsqueeze(0))[0]
+
+    stream = StreamingLipNet(model, window=20, hop=7)
+    emitted = 0
+    for i in range(0, 40, 5):
+        if stream.push(frames[i:i + 5]) is not None:
+            emitted += 1
+            cached = torch.stack(stream._features)
+            end = stream._finalized
+            assert torch.allclose(cached, offline[end - cached.shape[0]:end], atol=1e-4)
+    assert emitted == 5
+    assert len(stream._tail) <= 2 * stream.context + stream.hop
+
+
+def test_streams_keep_their_own_mouth_crop_state():
+    class CountingCrop:
+        def __init__(self):
+            self.frames = 0
+
+        def stream(self):
+            return CountingCrop()
+
+        def reset(self):
+            self.frames = 0
+
+        def __call__(self, clip):
+            self.frames += clip.shape[0]
+            return clip
+
+    shared = ClipTransform((50, 100), crop=CountingCrop())
+    model = LipNet().eval()
+    first, second = StreamingLipNet(model, transform=shared), StreamingLipNet(model, transform=shared)
+    first.push(np.zeros((3, 50, 100, 3), dtype=np.uint8))
+    assert first.transform.crop.frames == 3 and second.transform.crop.frames == 0
+    assert shared.crop.frames == 0
+
+    first.reset()
+    assert first.transform.crop.frames == 0
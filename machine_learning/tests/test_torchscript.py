@@ -0,0 +1,30 @@
+import torch
+
+from src.models.lipnet import LipNet
+from src.models.torchscript import TorchScriptLipNet, export_torchscript
+
+
+def test_torchscript_artifact_matches_eager_model(tmp_path):
+    torch.manual_seed(0)
+    model = LipNet().eval()
+    path = str(tmp_path / "lipnet_ts.pt")
+    result = export_torchscript(model, path, channels_last=False, example_frames=20)
+    assert result["channels_last"] is False
+
+    scripted = TorchScriptLipNet.load(path)
+    assert not any(n.kind() == "aten::dropout" for n in scripted.module.graph.nodes())
+
+    # Dynamic time axis
+    for length in (12, 33):
+        x = torch.rand(2, 3, length, 50, 100)
+        with torch.no_grad():
+            assert torch.allclose(scripted(x), model(x), atol=1e-4)
+
+    # Padded batch: each clip matches running it on its own
+    x = torch.rand(2, 3, 25, 50, 100)
+    lengths = torch.tensor([25, 14])
+    logits = scripted(x, lengths)
+    with torch.no_grad():
+        expected = model(x[1:, :, :14])[0]
+    assert torch.allclose(logits[1, :14], expected, atol=1e-4)
+    assert not logits[1, 14:].any()
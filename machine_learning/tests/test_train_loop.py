@@ -0,0 +1,57 @@
+import torch
+import wandb
+
+from src.models.lipnet import LipNet
+from src.training.train_loop import train_one_epoch
+from src.utils.ctc_loss import Criterion
+
+
+def _batch(batch_size, num_frames=12, target_length=4, seed=0):
+    g = torch.Generator().manual_seed(seed)
+    return (
+        torch.rand(batch_size, num_frames, 3, 50, 100, generator=g),
+        torch.randint(1, 28, (batch_size * target_length,), generator=g),
+        torch.full((batch_size,), num_frames, dtype=torch.long),
+        torch.full((batch_size,), target_length, dtype=torch.long),
+    )
+
+
+def _without_dropout(model):
+    for module in (model.stcnn.drop1, model.stcnn.drop2, model.stcnn.drop3):
+        module.p = 0.0
+    return model
+
+
+def test_activation_checkpointing_gives_the_same_gradients():
+    torch.manual_seed(0)
+    model = LipNet().train()
+    checkpointed = LipNet(checkpoint_stcnn=True).train()
+    checkpointed.load_state_dict(model.state_dict())
+    x = torch.rand(2, 3, 10, 50, 100)
+
+    for m in (model, checkpointed):
+        # Same dropout masks: the recompute restores the RNG state
+        torch.manual_seed(1)
+        m(x).square().mean().backward()
+    for (name, p), q in zip(model.named_parameters(), checkpointed.parameters()):
+        assert torch.allclose(p.grad, q.grad, atol=1e-6), name
+
+
+def test_gradient_accumulation_matches_one_large_batch():
+    wandb.init(mode="disabled")
+    torch.manual_seed(0)
+    model = _without_dropout(LipNet())
+    accumulated = _without_dropout(LipNet())
+    accumulated.load_state_dict(model.state_dict())
+
+    frames, targets, input_lengths, target_lengths = _batch(4)
+    halves = [(frames[i:i + 2], targets[i * 4:(i + 2) * 4], input_lengths[i:i + 2], target_lengths[i:i + 2])
+              for i in (0, 2)]
+
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1)
+    train_one_epoch(model, optimizer, [(frames, targets, input_lengths, target_lengths)], Criterion(), 0, "cpu")
+    optimizer = torch.optim.SGD(accumulated.parameters(), lr=0.1)
+    train_one_epoch(accumulated, optimizer, halves, Criterion(), 0, "cpu", accumulation_steps=2)
+
+    for (name, p), q in zip(model.named_parameters(), accumulated.parameters()):
+        assert torch.allclose(p, q, atol=1e-5), name